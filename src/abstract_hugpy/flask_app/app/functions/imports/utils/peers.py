@@ -120,4 +120,10 @@ def execute(**kwargs):
     if delegated:
         kwargs["_force_local"] = True      # loop guard, consumed by resolve()
     result = execute_prompt(**kwargs)
+    if getattr(result, "arrays", None):
+        # binary/npy: send the arrays as a frame, not per-float JSON.
+        from flask import Response
+        from abstract_hugpy.imports import ARRAYS_MIMETYPE, pack_embed_result
+
+        return Response(pack_embed_result(result), mimetype=ARRAYS_MIMETYPE)
     return result.model_dump() if hasattr(result, "model_dump") else result
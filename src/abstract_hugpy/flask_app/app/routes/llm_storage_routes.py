@@ -8,12 +8,22 @@ for name in ("httpx", "httpcore", "huggingface_hub", "filelock", "urllib3"):
 # ──────────────────────────────────────────────────────────────────────────
 # Routes
 # ──────────────────────────────────────────────────────────────────────────
+def _warmup() -> dict:
+    try:
+        from abstract_hugpy.managers.warmup import warmup_status
+
+        return warmup_status()
+    except Exception:
+        return {}
+
+
 @llm_bp.route("/health", methods=["GET"])
 def health():
     return jsonify({
         "ok": True,
         "storage_root": str(settings.storage_root),
         "manifest_path": str(settings.manifest_path),
+        "warmup": _warmup(),
     })
 
 
@@ -1,7 +1,16 @@
+import logging
+
 from .app import *
 from .app import routes as routes
 def get_hugpy_flask(name=None,allowed_origins=None,debug=False):
     name = name or "hugpy_flask"
+    # Preload shared models (HUGPY_WARMUP) while the app starts serving.
+    try:
+        from abstract_hugpy.managers.warmup import start_warmup
+
+        start_warmup()
+    except Exception as exc:
+        logging.getLogger(__name__).warning("warm-up not started: %s", exc)
     return get_Flask_app(
         name=name,
         routes=routes,
@@ -5,3 +5,5 @@ from .chunking import *
 from .schemas import *
 from .utils import *
 from .except_utils import *
+from .streaming import *
+from .frame_hash import *
@@ -1,7 +1,11 @@
-from .init_imports import List, Optional,re
+from .init_imports import List, Optional, Tuple, re, dataclass
 from .module_imports import get_tiktoken
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
 def get_encoder(model_name: str = "gpt-4", encoding_name: Optional[str] = None):
-    """Return a tiktoken encoder for your model or encoding."""
+    """Return a tiktoken encoder for your model or encoding (built once per name)."""
     tiktoken = get_tiktoken()
     if encoding_name:
         return tiktoken.get_encoding(encoding_name)
@@ -11,6 +15,145 @@ def count_tokens(text: str, encoder) -> int:
     """Count how many tokens `text` encodes to."""
     return len(encoder.encode(str(text)))
 
+
+# from big (paragraphs) to small (words)
+DEFAULT_SEPARATORS = ["\n\n", "\n", r"(?<=[\.\?\!])\s", ", ", " "]
+
+
+@dataclass(frozen=True)
+class TextChunk:
+    """One chunk plus where it came from: [char_start, char_end) of the
+    source text and [token_start, token_end) of its token stream."""
+    text: str
+    char_start: int
+    char_end: int
+    token_start: int
+    token_end: int
+
+    @property
+    def n_tokens(self) -> int:
+        return self.token_end - self.token_start
+
+
+def _token_char_starts(text: str, tokens: List[int], encoder) -> List[int]:
+    """Char offset where each token starts, plus len(text) as a sentinel."""
+    decode_with_offsets = getattr(encoder, "decode_with_offsets", None)
+    if decode_with_offsets is not None:
+        decoded, starts = decode_with_offsets(tokens)
+        if decoded == text:
+            return list(starts) + [len(text)]
+    # Byte offsets -> char offsets. Tokens can end mid-character; those
+    # round down to the character they fall inside.
+    char_of_byte: List[int] = []
+    for i, ch in enumerate(text):
+        char_of_byte.extend([i] * len(ch.encode("utf-8")))
+    char_of_byte.append(len(text))
+    starts, pos = [], 0
+    for tok in tokens:
+        starts.append(char_of_byte[min(pos, len(char_of_byte) - 1)])
+        pos += len(encoder.decode_single_token_bytes(tok))
+    return starts + [len(text)]
+
+
+def _boundary_levels(text: str, separators: List[str], char_starts: List[int]) -> List[List[int]]:
+    """Per separator level, sorted token indices a chunk may end at.
+
+    Level i also contains every boundary of coarser levels (< i): a
+    paragraph break is a valid sentence break too.
+    """
+    best: dict = {}
+    for level, sep in enumerate(separators):
+        pattern = re.compile(sep if sep.startswith("(?") else re.escape(sep))
+        for m in pattern.finditer(text):
+            # End the chunk *before* the separator: tokenizers glue leading
+            # whitespace onto the next word, so that's where tokens start.
+            tok = bisect_left(char_starts, m.start())
+            if 0 < tok < len(char_starts) - 1 and best.get(tok, level + 1) > level:
+                best[tok] = level
+    ordered = sorted(best.items())
+    return [[tok for tok, lvl in ordered if lvl <= level] for level in range(len(separators))]
+
+
+def chunk_text(
+    text: str,
+    desired_tokens: int,
+    model_name: str = "gpt-4",
+    separators: Optional[List[str]] = None,
+    overlap: int = 0,
+    encoder=None,
+) -> List[TextChunk]:
+    """Split `text` into chunks of at most `desired_tokens` tokens.
+
+    The text is tokenized once. Each chunk ends at the last boundary that
+    fits, trying separators from largest to smallest logical unit (a level
+    is skipped if its last fitting boundary would leave the chunk under half
+    full), and only cuts between arbitrary tokens when no boundary of any
+    kind fits. Each
+    chunk after the first starts `overlap` tokens before the previous one
+    ended, snapped forward to a word boundary when one lies in that window.
+    """
+    encoder = encoder or get_encoder(model_name)
+    if separators is None:
+        separators = DEFAULT_SEPARATORS
+    desired_tokens = max(1, int(desired_tokens))
+    overlap = max(0, min(int(overlap), desired_tokens - 1))
+
+    tokens = encoder.encode(text)
+    n = len(tokens)
+    if n <= desired_tokens:
+        return [TextChunk(text, 0, len(text), 0, n)]
+
+    char_starts = _token_char_starts(text, tokens, encoder)
+    levels = _boundary_levels(text, separators, char_starts)
+    finest = levels[-1] if levels else []
+    min_fill = max(1, desired_tokens // 2)
+
+    chunks: List[TextChunk] = []
+    start = prev_end = 0
+    while start < n:
+        limit = start + desired_tokens
+        if limit >= n:
+            end = n
+        else:
+            # Coarsest boundary that still fills at least half the chunk; else
+            # the last boundary of any kind; else a hard cut at the limit.
+            # Candidates must lie past prev_end, or an overlapped chunk could
+            # end where the previous one did and add nothing new.
+            floor = max(start, prev_end)
+            end = limit
+            fallback = None
+            for bounds in levels:
+                i = bisect_right(bounds, limit) - 1
+                if i < 0 or bounds[i] <= floor:
+                    continue
+                if bounds[i] - start >= min_fill:
+                    end = bounds[i]
+                    break
+                fallback = bounds[i]
+            else:
+                if fallback is not None:
+                    end = fallback
+        prev_end = end
+
+        raw = text[char_starts[start]:char_starts[end]]
+        stripped = raw.strip()
+        if stripped:
+            lead = len(raw) - len(raw.lstrip())
+            c0 = char_starts[start] + lead
+            chunks.append(TextChunk(stripped, c0, c0 + len(stripped), start, end))
+        if end >= n:
+            break
+
+        next_start = end
+        if overlap:
+            next_start = end - overlap
+            i = bisect_left(finest, next_start)
+            if i < len(finest) and finest[i] < end:
+                next_start = finest[i]
+        start = max(next_start, start + 1)
+    return chunks
+
+
 def recursive_chunk(
     text: str,
     desired_tokens: int,
@@ -22,71 +165,15 @@ def recursive_chunk(
     Split `text` into chunks as close to `desired_tokens` tokens as possible,
     preserving contiguous blocks via `separators`, and *only* splitting inside
     a block if it can’t possibly fit otherwise.
-    
+
+    Same contract as always; now a thin wrapper over chunk_text(), which
+    tokenizes the document once instead of once per separator level.
+
     Args:
         text: the full string to split
         desired_tokens: target token count per chunk (never exceed)
-        encoder: a tiktoken encoder
+        model_name: model whose tiktoken encoding counts the tokens
         separators: list of splitters, from largest to smallest logical unit
         overlap: how many tokens to overlap between adjacent chunks
     """
-    encoder = get_encoder(model_name)
-    if separators is None:
-        # from big (paragraphs) to small (words)
-        separators = ["\n\n", "\n", r"(?<=[\.\?\!])\s", ", ", " "]
-
-    # If it already fits, return it whole:
-    if count_tokens(text, encoder) <= desired_tokens:
-        return [text]
-
-    # Try splitting by each separator in turn
-    for sep in separators:
-        # use regex split when the separator is a lookbehind pattern
-        parts = re.split(sep, text) if sep.startswith("(?") else text.split(sep)
-        if len(parts) > 1:
-            chunks: List[str] = []
-            current = ""
-            current_tokens = 0
-
-            for part in parts:
-                part = part.strip()
-                if not part:
-                    continue
-                part_tokens = count_tokens(part, encoder)
-
-                # If this block alone is too big, recurse into it with the next-level separators
-                if part_tokens > desired_tokens:
-                    # flush current
-                    if current:
-                        chunks.extend(recursive_chunk(
-                            current, desired_tokens, model_name, separators[1:], overlap
-                        ))
-                        current, current_tokens = "", 0
-                    # now chunk the oversized block
-                    chunks.extend(recursive_chunk(
-                        part, desired_tokens, model_name, separators[1:], overlap
-                    ))
-                else:
-                    # can we add it to the current chunk?
-                    if current_tokens + part_tokens <= desired_tokens:
-                        # include the separator back in
-                        current = sep.join([current, part]) if current else part
-                        current_tokens += part_tokens
-                    else:
-                        # flush current, start new
-                        chunks.append(current)
-                        current, current_tokens = part, part_tokens
-
-            if current:
-                chunks.append(current)
-            return chunks
-
-    # Fallback: pure token sliding window (the only time we’ll split “inside” a block)
-    tokens = encoder.encode(text)
-    stride = desired_tokens - overlap
-    return [
-        encoder.decode(tokens[i : i + desired_tokens])
-        for i in range(0, len(tokens), stride)
-    ]
-
-
+    return [c.text for c in chunk_text(text, desired_tokens, model_name, separators, overlap)]
@@ -37,6 +37,13 @@ TORCH_HOME = get_env_value("TORCH_HOME") or os.path.join(HF_CACHE,"torch")
 
 PIP_CACHE_DIR = get_env_value("PIP_CACHE_DIR") or os.path.join(HF_CACHE,"pip")
 
+# Content-addressed embedding store (managers/embed/embed_cache.py). Created on
+# first write, not here — most boxes never run an embedding model.
+EMBED_CACHE_DIR = get_env_value("EMBED_CACHE_DIR") or os.path.join(HF_CACHE,"embeddings")
+
+# Summary result cache (managers/summarizers/summary_cache.py); same deal.
+SUMMARY_CACHE_DIR = get_env_value("SUMMARY_CACHE_DIR") or os.path.join(HF_CACHE,"summaries")
+
 PATHS = [
     MODELS_DIR,
     DATASETS_DIR,
@@ -0,0 +1,127 @@
+"""Perceptual frame hashing for near-duplicate detection.
+
+dHash: shrink the frame to (size+1) x size grayscale and record, per row,
+whether each pixel is brighter than its right neighbour. That's size*size
+bits (64 by default) that survive re-encoding, small scaling and noise,
+and move only a few bits for a mostly-unchanged picture — a talking head,
+a slide with a cursor on it. Two frames whose hashes differ in at most
+``threshold`` bits are treated as the same picture.
+
+    h = frame_dhash("frame_0001.jpg")
+    reps = cluster_near_duplicates([h0, h1, h2], threshold=6)   # -> [0, 0, 2]
+
+Hashes are stored as 16-char hex strings (frame_context "dhash") so they
+round-trip through JSON; parse_dhash() reads them back.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+__all__ = [
+    "DEFAULT_DEDUP_THRESHOLD",
+    "cluster_near_duplicates",
+    "format_dhash",
+    "frame_dhash",
+    "hamming_distance",
+    "parse_dhash",
+]
+
+# Out of 64 bits. Re-encodes of one frame land at 0-2; a slide with a
+# pointer moved, 3-6; a different slide in the same template, 10+.
+DEFAULT_DEDUP_THRESHOLD = 6
+
+
+def _np():
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
+
+
+def frame_dhash(image, hash_size: int = 8) -> int:
+    """dHash of an image path or PIL image, as an int of hash_size**2 bits."""
+    from PIL import Image
+
+    if not isinstance(image, Image.Image):
+        with Image.open(image) as im:
+            small = im.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+    else:
+        small = image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+
+    np = _np()
+    if np is not None:
+        px = np.asarray(small, dtype=np.int16)
+        bits = (px[:, 1:] > px[:, :-1]).ravel()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    px = list(small.getdata())
+    w = hash_size + 1
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            value = (value << 1) | (px[row * w + col + 1] > px[row * w + col])
+    return value
+
+
+def format_dhash(value: int, hash_size: int = 8) -> str:
+    return f"{value:0{(hash_size * hash_size + 3) // 4}x}"
+
+
+def parse_dhash(value) -> Optional[int]:
+    """An int from a stored hash (hex str or int); None if absent or malformed."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return int(value, 16)
+        except ValueError:
+            return None
+    return None
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def cluster_near_duplicates(
+    hashes: Sequence[Optional[int]],
+    threshold: int = DEFAULT_DEDUP_THRESHOLD,
+) -> List[int]:
+    """Representative index for every position in ``hashes``.
+
+    Walks in order: each hash joins the nearest existing representative
+    within ``threshold`` bits, or becomes a representative itself. So a
+    representative is always the first frame of its cluster, and a slide
+    that comes back later joins its earlier cluster. None (no hash) is
+    always its own representative.
+    """
+    reps: List[int] = []
+    rep_of: List[int] = []
+    np = _np()
+    # 64-bit hashes fit a uint64 array: XOR + popcount against every
+    # representative at once. Bigger hashes take the Python path.
+    vector = np is not None and all(h is None or h < 2**64 for h in hashes)
+    rep_hashes = np.zeros(len(hashes), dtype=np.uint64) if vector else None
+
+    for i, h in enumerate(hashes):
+        best = None
+        if h is not None and reps:
+            if vector:
+                x = rep_hashes[:len(reps)] ^ np.uint64(h)
+                dist = np.unpackbits(x.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+                j = int(dist.argmin())
+                if dist[j] <= threshold:
+                    best = reps[j]
+            else:
+                d, j = min((hamming_distance(h, hashes[r]), r) for r in reps)
+                if d <= threshold:
+                    best = j
+        if best is None:
+            if h is not None:
+                if vector:
+                    rep_hashes[len(reps)] = np.uint64(h)
+                reps.append(i)
+            best = i
+        rep_of.append(best)
+    return rep_of
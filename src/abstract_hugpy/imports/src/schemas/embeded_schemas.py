@@ -3,17 +3,29 @@
 One request type covers both tasks:
     - texts only                 -> embeddings only
     - texts + other_texts        -> embeddings + similarity matrix
+    - ... + top_k                -> embeddings + best top_k matches per text
 
 Keeps the runner free of branching on kwargs. The presence of
 `other_texts` is the entire dispatch signal inside the runner.
+
+`result_format` picks how arrays come back. "json" (default) is nested
+lists, as always. "binary" and "npy" skip the per-float Python objects
+entirely: each array is an ArrayPayload in EmbedResult.arrays carrying a
+raw little-endian buffer (or NPY file bytes) plus dtype and shape.
+
+The worker agent's /infer and the Flask app's delegated execute send
+those as a binary frame (pack_embed_result); the chat stream sends the
+result as text whatever the requested format.
 """
 
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+ResultFormat = Literal["json", "binary", "npy"]
+
 
 class EmbedRequest(BaseModel):
     """Input for feature-extraction and sentence-similarity tasks."""
@@ -36,13 +48,72 @@ class EmbedRequest(BaseModel):
     # Encoder batch size. Sentence-transformers handles padding per batch.
     batch_size: int = 32
 
+    # How arrays are returned; see module docstring.
+    result_format: ResultFormat = "json"
+
+    # Sentence-similarity only: return the top_k best other_texts per text
+    # (indices + scores) instead of the full len(texts) x len(other_texts)
+    # matrix. Computed in row blocks, so the full matrix never exists.
+    top_k: Optional[int] = Field(default=None, ge=1)
+
+
+class ArrayPayload(BaseModel):
+    """One numpy array, shipped as bytes instead of nested lists.
+
+    format "binary": `data` is the raw C-order buffer, dtype is a numpy
+    dtype string with explicit byte order ("<f4", "<i8"). format "npy":
+    `data` is a complete .npy file (dtype/shape also in its own header).
+    """
+    model_config = ConfigDict(frozen=True)
+
+    format: Literal["binary", "npy"]
+    dtype: str
+    shape: List[int]
+    data: bytes
+
+    @classmethod
+    def from_numpy(cls, array, format: str = "binary") -> "ArrayPayload":
+        import numpy as np
+
+        if array.dtype.kind == "f":
+            array = array.astype("<f4", copy=False)
+        elif array.dtype.kind in "iu":
+            array = array.astype("<i8", copy=False)
+        array = np.ascontiguousarray(array)
+        if format == "npy":
+            import io
+
+            buf = io.BytesIO()
+            np.save(buf, array, allow_pickle=False)
+            data = buf.getvalue()
+        else:
+            data = array.tobytes()
+        return cls(format=format, dtype=array.dtype.str,
+                   shape=list(array.shape), data=data)
+
+    def to_numpy(self):
+        """Read-only view over `data` for "binary" (no copy); parsed for "npy"."""
+        import numpy as np
+
+        if self.format == "npy":
+            import io
+
+            return np.load(io.BytesIO(self.data), allow_pickle=False)
+        return np.frombuffer(self.data, dtype=np.dtype(self.dtype)).reshape(self.shape)
+
 
 class EmbedResult(BaseModel):
     """Result for feature-extraction and sentence-similarity tasks.
 
     `embeddings` is always present on success — a list of vectors aligned
     with req.texts. `similarities` is present only when req.other_texts
-    was set; shape is len(texts) x len(other_texts).
+    was set; shape is len(texts) x len(other_texts). With req.top_k set,
+    `top_k_indices` / `top_k_scores` (len(texts) x top_k, best first)
+    replace `similarities`.
+
+    For result_format "binary"/"npy" the list fields stay None and the
+    same arrays are in `arrays`, keyed "embeddings", "similarities",
+    "top_k_indices", "top_k_scores".
     """
     model_config = ConfigDict(frozen=True)
 
@@ -52,5 +123,79 @@ class EmbedResult(BaseModel):
 
     embeddings: Optional[List[List[float]]] = None
     similarities: Optional[List[List[float]]] = None
+    top_k_indices: Optional[List[List[int]]] = None
+    top_k_scores: Optional[List[List[float]]] = None
+
+    arrays: Optional[Dict[str, ArrayPayload]] = None
 
     error: Optional[str] = None
+
+
+# ---------------------------------------------------------------------------
+# HTTP framing for binary/npy results
+#
+#   b"HGPA" | uint32 LE header length | JSON header | array buffers, in order
+#
+# The header is the EmbedResult minus the bytes, plus per-array
+# {format, dtype, shape, nbytes}. Servers send the chunks as-is (no join);
+# clients get numpy views straight over the response body.
+# ---------------------------------------------------------------------------
+
+ARRAYS_MIMETYPE = "application/x-hugpy-arrays"
+_FRAME_MAGIC = b"HGPA"
+
+
+def pack_embed_result(result: EmbedResult) -> List[bytes]:
+    """Frame a binary/npy EmbedResult for an HTTP body, as a list of chunks."""
+    import json
+    import struct
+
+    arrays = result.arrays or {}
+    header = result.model_dump(exclude={"arrays"}, exclude_none=True)
+    header["arrays"] = {
+        name: {"format": a.format, "dtype": a.dtype, "shape": a.shape, "nbytes": len(a.data)}
+        for name, a in arrays.items()
+    }
+    head = json.dumps(header).encode("utf-8")
+    return [_FRAME_MAGIC, struct.pack("<I", len(head)), head,
+            *(a.data for a in arrays.values())]
+
+
+def unpack_embed_result(body: bytes):
+    """(header dict, {name: numpy array}) from a packed body, without copying.
+
+    "binary" arrays are read-only views into `body`; "npy" ones are parsed.
+    """
+    import io
+    import json
+    import struct
+
+    import numpy as np
+
+    if body[:4] != _FRAME_MAGIC:
+        raise ValueError("not a hugpy array frame")
+    (head_len,) = struct.unpack_from("<I", body, 4)
+    offset = 8 + head_len
+    header = json.loads(bytes(body[8:offset]).decode("utf-8"))
+    out = {}
+    for name, meta in header.get("arrays", {}).items():
+        nbytes = meta["nbytes"]
+        if meta["format"] == "npy":
+            out[name] = np.load(io.BytesIO(body[offset:offset + nbytes]), allow_pickle=False)
+        else:
+            out[name] = np.frombuffer(body, dtype=np.dtype(meta["dtype"]),
+                                      count=nbytes // np.dtype(meta["dtype"]).itemsize,
+                                      offset=offset).reshape(meta["shape"])
+        offset += nbytes
+    return header, out
+
+
+def embed_result_from_frame(body: bytes) -> EmbedResult:
+    """Rebuild the EmbedResult a peer packed with pack_embed_result."""
+    header, arrays = unpack_embed_result(body)
+    formats = {name: meta["format"] for name, meta in header.pop("arrays", {}).items()}
+    return EmbedResult.model_validate({
+        **header,
+        "arrays": {name: ArrayPayload.from_numpy(a, format=formats[name])
+                   for name, a in arrays.items()},
+    })
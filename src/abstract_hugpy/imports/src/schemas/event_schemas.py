@@ -18,3 +18,21 @@ class ErrorEvent(BaseModel):
     type: Literal["error"] = "error"
     request_id: str
     message: str
+
+class ProgressEvent(BaseModel):
+    """Work-in-progress marker between tokens: stage `index` of `total` is done.
+
+    `text` optionally carries that step's partial output (e.g. one chunk's
+    summary). It is not part of the final answer — that still arrives as
+    TokenEvents — so clients that only append tokens can ignore these.
+    `data` is the step's structured output, when it has one (e.g. the
+    TranscribeSegments of one audio window).
+    """
+    model_config = ConfigDict(extra="forbid")
+    type: Literal["progress"] = "progress"
+    request_id: str
+    stage: str
+    index: int
+    total: int
+    text: Optional[str] = None
+    data: Optional[dict[str, Any]] = None
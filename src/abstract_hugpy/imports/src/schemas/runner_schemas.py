@@ -30,4 +30,4 @@ class Runner(Protocol):
         cancel_event,
     ) -> AsyncIterator: ...
     
-StreamEvent = Union[TokenEvent, DoneEvent, ErrorEvent]
+StreamEvent = Union[TokenEvent, ProgressEvent, DoneEvent, ErrorEvent]
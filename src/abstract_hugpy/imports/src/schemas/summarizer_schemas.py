@@ -92,6 +92,9 @@ class SummarizeRequest(TaskRequest):
     consolidation_max_length: Optional[int] = Field(default=None, gt=0)
     max_output_words: Optional[int] = Field(default=None, gt=0)
 
+    # False bypasses the summary result cache (no read, no write).
+    cache: bool = True
+
 
 # ---------------------------------------------------------------------------
 # Result
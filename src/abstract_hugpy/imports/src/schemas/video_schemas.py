@@ -1,4 +1,5 @@
 from .imports import *
+from ..frame_hash import DEFAULT_DEDUP_THRESHOLD
 class VideoAnalysisConfig(BaseModel):
     """How to analyze the frames produced by execute_prompt. Built once per run."""
     model_config = ConfigDict(frozen=True)
@@ -9,7 +10,19 @@ class VideoAnalysisConfig(BaseModel):
     min_tokens: int = Field(default=32, gt=0)
     resume: bool = True
     raise_on_frame_error: bool = False
+    # Checkpoint lines between fsyncs of analysis.jsonl (every line is
+    # written and flushed as its frame finishes either way).
     save_every: int = Field(default=1, ge=1)
+    # Frames per VisionRunner.run_batch call; 1 = one request per frame.
+    batch_size: int = Field(default=4, ge=1)
+    # Frames read + encoded ahead of the vision stage.
+    prefetch: int = Field(default=8, ge=1)
+    # run_batch calls in flight at once. None: the backend's
+    # concurrency_hint (http 4, in-process 1 — it batches instead).
+    concurrency: Optional[int] = Field(default=None, ge=1)
+    # Max dHash bit distance (of 64) for two frames to count as the same
+    # picture; only the first of each cluster is analyzed. None disables.
+    dedup_threshold: Optional[int] = Field(default=DEFAULT_DEDUP_THRESHOLD, ge=0, le=64)
 
 
 class FrameAnalysis(BaseModel):
@@ -26,6 +39,8 @@ class FrameAnalysis(BaseModel):
     model_key: str
     analysis_duration: float
     error: Optional[str] = None
+    # frame_index of the frame whose analysis this one reuses
+    duplicate_of: Optional[int] = None
 
 
 class VideoAnalysisSummary(BaseModel):
@@ -36,3 +51,4 @@ class VideoAnalysisSummary(BaseModel):
     frames_total: int
     frames_succeeded: int
     frames_failed: int
+    frames_deduplicated: int = 0
@@ -57,6 +57,13 @@ class TranscribeRequest(BaseModel):
     min_gap_seconds: float = 2.0
     long_segment_seconds: float = 8.0
 
+    # Split at pauses and transcribe windows in parallel. None: only for
+    # media at least HUGPY_WHISPER_LONG_FORM_MIN_S seconds long.
+    long_form: Optional[bool] = None
+    long_form_window_s: float = Field(default=120.0, gt=0)
+    long_form_overlap_s: float = Field(default=2.0, ge=0)
+    long_form_workers: Optional[int] = Field(default=None, ge=1)
+
     cleanup_extracted_audio: bool = False
 
     def to_dict(self) -> dict[str, Any]:
@@ -0,0 +1,107 @@
+"""Bridge a blocking, token-at-a-time producer onto the event loop.
+
+llama.cpp (and most in-process backends) expose generation as a blocking
+iterator. Iterating that on the event loop stalls every other coroutine in
+the process — heartbeats, other streams, cancel routes — for the whole
+generation. ``iter_in_thread`` runs the producer on its own thread and the
+loop only ever awaits an ``asyncio.Queue``:
+
+    async for item in iter_in_thread(produce, cancel_event=ev):
+        ...
+
+``produce(emit, should_stop)`` is a plain blocking function. It calls
+``emit(item)`` per item; emit blocks while the queue is full (backpressure:
+a slow consumer slows decoding instead of buffering the whole output) and
+returns False once the consumer is gone or ``cancel_event`` is set, at which
+point the producer should stop at the next token.
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, AsyncIterator, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["DEFAULT_STREAM_QUEUE_SIZE", "iter_in_thread"]
+
+# Items buffered between the producer thread and the consumer. Small on
+# purpose: it's a bridge, not a cache.
+DEFAULT_STREAM_QUEUE_SIZE = 64
+
+# How often a producer blocked on a full queue re-checks for cancellation.
+_EMIT_POLL_S = 0.25
+
+_DONE = object()
+
+Emit = Callable[[Any], bool]
+ShouldStop = Callable[[], bool]
+
+
+async def iter_in_thread(
+    produce: Callable[[Emit, ShouldStop], None],
+    *,
+    cancel_event: Optional[Any] = None,
+    maxsize: int = DEFAULT_STREAM_QUEUE_SIZE,
+    name: str = "stream-bridge",
+) -> AsyncIterator[Any]:
+    """Yield whatever ``produce`` emits, without ever blocking the loop.
+
+    ``cancel_event`` is anything with ``is_set()`` (asyncio.Event or
+    threading.Event). Exceptions raised by the producer are re-raised here
+    after the items emitted before them.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, maxsize))
+    stopped = threading.Event()
+    failure: list[BaseException] = []
+
+    def should_stop() -> bool:
+        return stopped.is_set() or (cancel_event is not None and cancel_event.is_set())
+
+    def emit(item: Any) -> bool:
+        if should_stop():
+            return False
+        try:
+            fut = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        except RuntimeError:            # loop already closed
+            return False
+        while True:
+            try:
+                fut.result(timeout=_EMIT_POLL_S)
+                return True
+            except concurrent.futures.TimeoutError:
+                if should_stop():
+                    fut.cancel()
+                    return False
+            except (concurrent.futures.CancelledError, RuntimeError):
+                return False
+
+    def worker() -> None:
+        try:
+            produce(emit, should_stop)
+        except BaseException as exc:
+            failure.append(exc)
+        finally:
+            try:
+                asyncio.run_coroutine_threadsafe(queue.put(_DONE), loop)
+            except RuntimeError:
+                pass
+
+    thread = threading.Thread(target=worker, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            yield item
+        if failure:
+            raise failure[0]
+    finally:
+        stopped.set()
+        # Unblock a producer parked on a full queue so it sees `stopped`.
+        while not queue.empty():
+            queue.get_nowait()
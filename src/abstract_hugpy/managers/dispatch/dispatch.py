@@ -33,6 +33,7 @@ import os
 import threading
 from typing import Any, Dict, List, Optional, Tuple
 from ..resolvers import resolve
+from ..residency import RESIDENCY
 from .imports import *
 
 logger = logging.getLogger(__name__)
@@ -211,9 +212,11 @@ def evict(model_key: str, task: Optional[str] = None) -> bool:
     If task is None, all task-variants for that model_key are dropped.
     Returns True if anything was evicted.
 
-    The underlying model may still be loaded if the inner singleton
-    (REGISTRY for DeepCoder, _LLAMA_INSTANCES for llama.cpp) holds it.
-    Eviction here only releases the runner wrapper.
+    With task=None the weights are unloaded too: every inner singleton
+    that registered with the residency manager (get_llama_runner, the
+    embed/summarizer/vision caches) drops the model and VRAM is flushed.
+    With a task, only that wrapper goes — another task may share the
+    weights. REGISTRY (DeepCoder) is not residency-managed.
     """
     with _INSTANCES_LOCK:
         if task is not None:
@@ -221,7 +224,13 @@ def evict(model_key: str, task: Optional[str] = None) -> bool:
         to_drop = [k for k in list(_INSTANCES) if k[0] == model_key]
         for k in to_drop:
             _INSTANCES.pop(k, None)
-        return bool(to_drop)
+    unloaded = RESIDENCY.evict_model(model_key)
+    return bool(to_drop or unloaded)
+
+
+def residency() -> dict:
+    """Resident models, their footprints, budgets and load/evict counters."""
+    return RESIDENCY.snapshot()
 
 
 def clear() -> None:
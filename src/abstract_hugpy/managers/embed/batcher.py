@@ -0,0 +1,221 @@
+"""Request-level micro-batching for embedding encodes.
+
+Without this, every EmbedRequest is its own SentenceTransformer.encode()
+call: 200 concurrent one-sentence requests are 200 forward passes of
+batch 1. EmbedMicroBatcher sits in front of one model's encode function
+and coalesces whatever arrives within a short window into one call:
+
+    batcher = EmbedMicroBatcher(encode, model_key="all-minilm-l6-v2")
+    vectors = await batcher.embed(texts, normalize=True, batch_size=32)
+
+The window closes after HUGPY_EMBED_BATCH_WINDOW_MS (default 5 ms) or as
+soon as HUGPY_EMBED_BATCH_MAX_TEXTS texts (default 256) are waiting. Each
+caller gets back exactly its own rows. Requests with a different
+``normalize`` flag are encoded in separate calls inside the same window.
+
+The collector is a plain thread fed by a queue.Queue, not an asyncio task,
+so one batcher serves every event loop in the process (dispatch runs
+requests from the worker's per-request loops and from Flask threads).
+A window of 0 disables batching: embed() then encodes inline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WINDOW_MS = 5.0
+DEFAULT_BATCH_MAX_TEXTS = 256
+
+
+def _env_number(name: str, default, cast):
+    raw = os.environ.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        logger.warning("bad %s=%r; using %s", name, raw, default)
+        return default
+
+
+def _resolve(fut: Future, result=None, exc: Optional[BaseException] = None) -> None:
+    """Settle ``fut`` unless its caller gave up (request cancelled). The
+    cancel can land from the event loop between the check and the set, so
+    losing that race is ignored too rather than killing the flush."""
+    if fut.done():
+        return
+    try:
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class _Pending:
+    __slots__ = ("texts", "normalize", "batch_size", "future", "enqueued")
+
+    def __init__(self, texts, normalize, batch_size):
+        self.texts = list(texts)
+        self.normalize = bool(normalize)
+        self.batch_size = int(batch_size)
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class EmbedMicroBatcher:
+    """Coalesces concurrent encode requests for one model into shared calls.
+
+    ``encode(texts, normalize, batch_size)`` is the blocking function that
+    returns an (n, dim) numpy array; it runs on the batcher's thread.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str], bool, int], Any],
+        *,
+        model_key: str,
+        window_ms: Optional[float] = None,
+        max_texts: Optional[int] = None,
+    ):
+        self.model_key = model_key
+        self._encode = encode
+        self.window_s = max(0.0, (
+            window_ms if window_ms is not None
+            else _env_number("HUGPY_EMBED_BATCH_WINDOW_MS", DEFAULT_BATCH_WINDOW_MS, float)
+        ) / 1000.0)
+        self.max_texts = max(1, (
+            max_texts if max_texts is not None
+            else _env_number("HUGPY_EMBED_BATCH_MAX_TEXTS", DEFAULT_BATCH_MAX_TEXTS, int)
+        ))
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, float] = {
+            "requests": 0,
+            "texts": 0,
+            "batches": 0,
+            "encode_calls": 0,
+            "errors": 0,
+            "encode_seconds": 0.0,
+            "queue_wait_seconds": 0.0,
+            "max_queue_wait_seconds": 0.0,
+            "max_batch_texts": 0,
+        }
+        self._thread: Optional[threading.Thread] = None
+        if self.window_s > 0:
+            self._thread = threading.Thread(
+                target=self._loop, name=f"embed-batcher-{model_key}", daemon=True,
+            )
+            self._thread.start()
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None
+
+    # --- caller side --------------------------------------------------------
+
+    def submit(self, texts, normalize: bool, batch_size: int) -> Future:
+        """Queue texts for the next batch; the Future resolves to their rows."""
+        item = _Pending(texts, normalize, batch_size)
+        if not self.enabled:
+            self._run_group([item])
+        else:
+            self._queue.put(item)
+        return item.future
+
+    async def embed(self, texts, normalize: bool, batch_size: int):
+        if not self.enabled:
+            return await asyncio.to_thread(
+                lambda: self.submit(texts, normalize, batch_size).result()
+            )
+        return await asyncio.wrap_future(self.submit(texts, normalize, batch_size))
+
+    # --- collector thread ---------------------------------------------------
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            n_texts = len(first.texts)
+            deadline = time.perf_counter() + self.window_s
+            while n_texts < self.max_texts:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n_texts += len(item.texts)
+
+            by_flag: Dict[bool, List[_Pending]] = {}
+            for item in batch:
+                by_flag.setdefault(item.normalize, []).append(item)
+            with self._stats_lock:
+                self._stats["batches"] += 1
+                self._stats["max_batch_texts"] = max(self._stats["max_batch_texts"], n_texts)
+            for group in by_flag.values():
+                self._run_group(group)
+
+    def _run_group(self, group: List[_Pending]) -> None:
+        started = time.perf_counter()
+        texts: List[str] = []
+        for item in group:
+            texts.extend(item.texts)
+        batch_size = max(item.batch_size for item in group)
+        try:
+            vectors = self._encode(texts, group[0].normalize, batch_size)
+        except Exception as exc:
+            with self._stats_lock:
+                self._stats["errors"] += len(group)
+            for item in group:
+                _resolve(item.future, exc=exc)
+            return
+        elapsed = time.perf_counter() - started
+
+        offset = 0
+        for item in group:
+            n = len(item.texts)
+            _resolve(item.future, vectors[offset:offset + n])
+            offset += n
+
+        with self._stats_lock:
+            s = self._stats
+            s["requests"] += len(group)
+            s["texts"] += len(texts)
+            s["encode_calls"] += 1
+            s["encode_seconds"] += elapsed
+            for item in group:
+                wait = started - item.enqueued
+                s["queue_wait_seconds"] += wait
+                s["max_queue_wait_seconds"] = max(s["max_queue_wait_seconds"], wait)
+
+    # --- introspection ------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            s = dict(self._stats)
+        s["model_key"] = self.model_key
+        s["window_ms"] = self.window_s * 1000.0
+        s["max_texts"] = self.max_texts
+        s["queue_depth"] = self._queue.qsize()
+        calls = s["encode_calls"]
+        s["mean_texts_per_call"] = round(s["texts"] / calls, 2) if calls else 0.0
+        s["mean_requests_per_call"] = round(s["requests"] / calls, 2) if calls else 0.0
+        s["mean_queue_wait_ms"] = (
+            round(1000.0 * s["queue_wait_seconds"] / s["requests"], 3) if s["requests"] else 0.0
+        )
+        secs = s["encode_seconds"]
+        s["texts_per_sec"] = round(s["texts"] / secs, 2) if secs else 0.0
+        return s
@@ -0,0 +1,268 @@
+"""Persistent, content-addressed embedding store.
+
+The SEO and PDF pipelines embed the same strings over and over — page
+boilerplate, recurring keyword candidates, a PDF analyzed twice. Each
+(model_key, normalize) pair gets an EmbeddingStore on disk, keyed by
+sha256(text), so a warm re-run only encodes what it has never seen:
+
+    <EMBED_CACHE_DIR>/<model_key>/<norm|raw>/
+        meta.json      dim, dtype, capacity
+        vectors.bin    (capacity, dim) float32|float16 memmap
+        keys.bin       (capacity, 32) uint8 memmap — sha256 per row, 0 = empty
+
+Both matrices are allocated at full capacity up front as sparse files, so
+the store never resizes. Capacity is HUGPY_EMBED_CACHE_MB (default 512)
+divided by the row size; when it's full the least-recently-used row is
+overwritten. Recency lives in memory only, so after a restart eviction
+starts out in row order. Changing the budget or dtype starts the store over.
+
+An evicted row's key is cleared on disk first, then the vector written,
+then the new key, so a crash mid-write leaves at worst an unreachable row,
+never a key pointing at another text's vector. One process
+owns a store directory (exclusive flock); any other process that opens it
+runs uncached rather than corrupting it.
+
+    HUGPY_EMBED_CACHE_MB     int     disk budget per store; 0 disables
+    HUGPY_EMBED_CACHE_DTYPE  str     float32 (default) | float16
+    EMBED_CACHE_DIR          path    root (default <HF_CACHE>/embeddings)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl  # POSIX advisory lock — one owning process per store dir.
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from .imports import EMBED_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBED_CACHE_MB = 512
+_KEY_BYTES = 32
+_DTYPES = ("float32", "float16")
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def _safe_name(model_key: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", model_key)
+
+
+class EmbeddingStore:
+    """Fixed-capacity memmapped vector table with an in-memory sha256 index."""
+
+    def __init__(self, path: str, *, dim: int, dtype: str, capacity: int):
+        import numpy as np
+
+        self.path = path
+        self.dim = int(dim)
+        self.dtype = dtype
+        self.capacity = int(capacity)
+        self._np = np
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        os.makedirs(path, exist_ok=True)
+        self._lock_fh = open(os.path.join(path, ".lock"), "a+")
+        if fcntl is not None:
+            # Non-blocking: a second process gets BlockingIOError and the
+            # caller falls back to uncached encodes.
+            fcntl.flock(self._lock_fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        meta_path = os.path.join(path, "meta.json")
+        meta = {"dim": self.dim, "dtype": dtype, "capacity": self.capacity}
+        fresh = True
+        try:
+            with open(meta_path) as fh:
+                fresh = json.load(fh) != meta
+        except (OSError, ValueError):
+            pass
+        mode = "w+" if fresh else "r+"
+        if fresh:
+            logger.info("embed cache: new store %s dim=%d dtype=%s rows=%d",
+                        path, self.dim, dtype, self.capacity)
+
+        self._vectors = np.memmap(os.path.join(path, "vectors.bin"), dtype=dtype,
+                                  mode=mode, shape=(self.capacity, self.dim))
+        self._keys = np.memmap(os.path.join(path, "keys.bin"), dtype=np.uint8,
+                               mode=mode, shape=(self.capacity, _KEY_BYTES))
+        if fresh:
+            self._keys[:] = 0
+            self._keys.flush()
+            with open(meta_path, "w") as fh:
+                json.dump(meta, fh)
+
+        # Rebuild the index from keys.bin; all-zero rows are free.
+        self._index: Dict[bytes, int] = {}
+        used = self._keys.any(axis=1)
+        for row in np.nonzero(used)[0].tolist():
+            self._index[bytes(self._keys[row])] = row
+        self._free = np.nonzero(~used)[0][::-1].tolist()   # pop() hands out low rows first
+        self._tick = 0
+        self._last_used = np.zeros(self.capacity, dtype=np.int64)
+        self._last_used[list(self._index.values())] = 1
+
+    # --- lookups ------------------------------------------------------------
+
+    def get_many(self, keys: Sequence[bytes]) -> Tuple[Dict[int, Any], List[int]]:
+        """({position: vector} for hits, [positions that missed])."""
+        hits: Dict[int, Any] = {}
+        misses: List[int] = []
+        with self._lock:
+            self._tick += 1
+            for pos, key in enumerate(keys):
+                row = self._index.get(key)
+                if row is None:
+                    misses.append(pos)
+                    continue
+                self._last_used[row] = self._tick
+                hits[pos] = self._np.array(self._vectors[row], dtype=self._np.float32)
+            self._stats["hits"] += len(hits)
+            self._stats["misses"] += len(misses)
+        return hits, misses
+
+    def put_many(self, keys: Sequence[bytes], vectors) -> None:
+        """Store ``vectors[i]`` under ``keys[i]``; keys already held are skipped.
+
+        A batch bigger than the whole store keeps the first ``capacity`` new
+        keys and leaves the rest uncached: a row handed out earlier in this
+        call is never reused within it.
+        """
+        np = self._np
+        with self._lock:
+            self._tick += 1
+            rows: List[int] = []
+            evicted: List[int] = []
+            for key in keys:
+                if key in self._index:
+                    rows.append(-1)
+                    continue
+                if self._free:
+                    row = self._free.pop()
+                else:
+                    row = int(np.argmin(self._last_used))
+                    if self._last_used[row] == self._tick:
+                        rows.append(-1)     # every row already taken by this batch
+                        continue
+                    self._index.pop(bytes(self._keys[row]), None)
+                    evicted.append(row)
+                    self._stats["evictions"] += 1
+                self._last_used[row] = self._tick
+                rows.append(row)
+                self._index[key] = row
+
+            targets = [(i, r) for i, r in enumerate(rows) if r >= 0]
+            if not targets:
+                return
+            # Free evicted rows on disk before their vectors change, so a
+            # crash can't leave an old key pointing at a new vector.
+            if evicted:
+                self._keys[evicted] = 0
+                self._keys.flush()
+            for i, row in targets:
+                self._vectors[row] = vectors[i]
+            self._vectors.flush()
+            for i, row in targets:
+                self._keys[row] = np.frombuffer(keys[i], dtype=np.uint8)
+            self._keys.flush()
+            self._stats["stores"] += len(targets)
+
+    # --- introspection ------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            s["rows"] = len(self._index)
+        s.update(path=self.path, dim=self.dim, dtype=self.dtype, capacity=self.capacity)
+        lookups = s["hits"] + s["misses"]
+        s["hit_rate"] = round(s["hits"] / lookups, 4) if lookups else 0.0
+        return s
+
+
+# ---------------------------------------------------------------------------
+# Per-process registry, keyed like the stores themselves
+# ---------------------------------------------------------------------------
+
+_STORES: Dict[Tuple[str, bool], Optional[EmbeddingStore]] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def _budget_bytes() -> int:
+    raw = os.environ.get("HUGPY_EMBED_CACHE_MB")
+    try:
+        mb = float(raw) if raw not in (None, "") else DEFAULT_EMBED_CACHE_MB
+    except ValueError:
+        logger.warning("bad HUGPY_EMBED_CACHE_MB=%r; using %s", raw, DEFAULT_EMBED_CACHE_MB)
+        mb = DEFAULT_EMBED_CACHE_MB
+    return int(mb * 2**20)
+
+
+def _dtype() -> str:
+    dtype = (os.environ.get("HUGPY_EMBED_CACHE_DTYPE") or "float32").strip().lower()
+    if dtype not in _DTYPES:
+        logger.warning("bad HUGPY_EMBED_CACHE_DTYPE=%r; using float32", dtype)
+        dtype = "float32"
+    return dtype
+
+
+def _store_path(model_key: str, normalize: bool) -> str:
+    return os.path.join(EMBED_CACHE_DIR, _safe_name(model_key), "norm" if normalize else "raw")
+
+
+def _disk_dim(path: str) -> Optional[int]:
+    try:
+        with open(os.path.join(path, "meta.json")) as fh:
+            return int(json.load(fh)["dim"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def get_embedding_store(model_key: str, normalize: bool,
+                        dim: Optional[int] = None) -> Optional[EmbeddingStore]:
+    """Open (once per process) the store for this model/normalize pair.
+
+    ``dim=None`` is a read-side lookup: it opens a store that already exists
+    on disk, but won't create one. Returns None when caching is disabled or
+    the store can't be opened — the caller then just encodes everything.
+    """
+    key = (model_key, bool(normalize))
+    if key in _STORES:
+        return _STORES[key]
+    with _STORES_LOCK:
+        if key in _STORES:
+            return _STORES[key]
+        budget = _budget_bytes()
+        if budget <= 0:
+            _STORES[key] = None
+            return None
+        path = _store_path(model_key, normalize)
+        if dim is None:
+            dim = _disk_dim(path)
+            if dim is None:
+                return None             # nothing cached yet; the first put creates it
+        dtype = _dtype()
+        row_bytes = dim * (2 if dtype == "float16" else 4) + _KEY_BYTES
+        store = None
+        try:
+            store = EmbeddingStore(path, dim=dim, dtype=dtype,
+                                   capacity=max(1, budget // row_bytes))
+        except Exception as exc:
+            logger.warning("embed cache disabled for %s (%s: %s)",
+                           model_key, type(exc).__name__, exc)
+        _STORES[key] = store
+        return store
+
+
+def embedding_cache_stats() -> List[Dict[str, Any]]:
+    return [s.stats() for s in list(_STORES.values()) if s is not None]
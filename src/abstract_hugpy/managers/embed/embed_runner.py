@@ -20,6 +20,9 @@ import threading
 from typing import Any, Dict
 
 from .imports import *           # ensure_model, ModelConfig, etc
+from ..residency import RESIDENCY, dir_footprint, torch_footprint
+from .batcher import EmbedMicroBatcher
+from .embed_cache import embedding_cache_stats, get_embedding_store, text_key
 
 
 logger = logging.getLogger(__name__)
@@ -40,6 +43,13 @@ class FeatureExtractionRunner:
     # Same shape as get_llama_runner's _LLAMA_INSTANCES.
     _MODELS: Dict[str, Any] = {}
     _LOCK = threading.Lock()
+    # Encodes in flight per model_key; residency never evicts a busy model.
+    # Own lock: _LOCK is held for whole model loads, and encodes of other
+    # models shouldn't queue behind those.
+    _INFLIGHT: Dict[str, int] = {}
+    _INFLIGHT_LOCK = threading.Lock()
+    # One micro-batcher per model_key: concurrent requests share encode calls.
+    _BATCHERS: Dict[str, EmbedMicroBatcher] = {}
 
     def __init__(self, cfg, **runtime_kwargs):
         self.cfg = cfg
@@ -52,6 +62,7 @@ class FeatureExtractionRunner:
     def model(self):
         cached = self._MODELS.get(self.model_key)
         if cached is not None:
+            RESIDENCY.touch(("embed", self.model_key))
             return cached
 
         with self._LOCK:
@@ -69,6 +80,8 @@ class FeatureExtractionRunner:
                 ) from exc
 
             model_dir = ensure_model(self.model_key)
+            ram, vram = dir_footprint(model_dir)
+            RESIDENCY.make_room(ram_bytes=ram, vram_bytes=vram)
             # trust_remote_code is needed for gte-large-en-v1.5 and similar
             # models that ship custom modeling code. all-minilm-l6-v2 ignores it.
             instance = SentenceTransformer(
@@ -81,63 +94,140 @@ class FeatureExtractionRunner:
                 self.model_key, model_dir,
             )
             self._MODELS[self.model_key] = instance
+            self._register_resident(instance)
             return instance
 
+    def _register_resident(self, instance) -> None:
+        model_key, models, inflight = self.model_key, self._MODELS, self._INFLIGHT
+
+        def unload() -> None:
+            # Lock-free pop: eviction may run while another loader holds _LOCK.
+            models.pop(model_key, None)
+
+        ram, vram = torch_footprint(instance)
+        RESIDENCY.register(
+            ("embed", model_key), model_key=model_key,
+            ram_bytes=ram, vram_bytes=vram, unload=unload,
+            busy=lambda: inflight.get(model_key, 0) > 0,
+        )
+
+    @property
+    def batcher(self) -> EmbedMicroBatcher:
+        batcher = self._BATCHERS.get(self.model_key)
+        if batcher is not None:
+            return batcher
+        with self._LOCK:
+            batcher = self._BATCHERS.get(self.model_key)
+            if batcher is None:
+                batcher = EmbedMicroBatcher(self._encode, model_key=self.model_key)
+                self._BATCHERS[self.model_key] = batcher
+            return batcher
+
+    @classmethod
+    def batching_stats(cls) -> list:
+        """Per-model micro-batching throughput / queue-wait counters."""
+        return [b.stats() for b in list(cls._BATCHERS.values())]
+
+    @staticmethod
+    def cache_stats() -> list:
+        """Per-store hit rate / rows / evictions of the on-disk embedding cache."""
+        return embedding_cache_stats()
+
     # --- encoding ---------------------------------------------------------
 
     def _encode(self, texts, normalize: bool, batch_size: int):
-        """Blocking encode. Called from a worker thread by .run()."""
-        return self.model.encode(
-            texts,
-            batch_size=batch_size,
-            normalize_embeddings=normalize,
-            convert_to_numpy=True,
-            show_progress_bar=False,
-        )
+        """Blocking encode. Called from the micro-batcher's thread.
+
+        Rows already in the on-disk embedding store are read back instead of
+        encoded, and repeated texts in one batch are encoded once; only the
+        distinct misses reach the model.
+        """
+        import numpy as np
+
+        store = get_embedding_store(self.model_key, normalize)
+        keys = [text_key(t) for t in texts]
+        hits, misses = store.get_many(keys) if store is not None else ({}, list(range(len(texts))))
+
+        first_of: Dict[bytes, int] = {}
+        for pos in misses:
+            first_of.setdefault(keys[pos], pos)
+        todo = list(first_of.values())
+        if not todo:
+            return np.stack([hits[i] for i in range(len(texts))])
+
+        encoded = self._encode_model([texts[i] for i in todo], normalize, batch_size)
+        if store is None:
+            store = get_embedding_store(self.model_key, normalize, dim=encoded.shape[1])
+        if store is not None:
+            store.put_many([keys[i] for i in todo], encoded)
+
+        if not hits and len(todo) == len(texts):
+            return encoded
+        out = np.empty((len(texts), encoded.shape[1]), dtype=encoded.dtype)
+        row_of = {keys[pos]: row for row, pos in enumerate(todo)}
+        for pos in misses:
+            out[pos] = encoded[row_of[keys[pos]]]
+        for pos, vec in hits.items():
+            out[pos] = vec
+        return out
+
+    def _encode_model(self, texts, normalize: bool, batch_size: int):
+        with self._INFLIGHT_LOCK:
+            self._INFLIGHT[self.model_key] = self._INFLIGHT.get(self.model_key, 0) + 1
+        try:
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                normalize_embeddings=normalize,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+        finally:
+            with self._INFLIGHT_LOCK:
+                self._INFLIGHT[self.model_key] -= 1
 
     # --- public API -------------------------------------------------------
 
     async def run(self, req: EmbedRequest) -> EmbedResult:
         try:
-            embeddings = await asyncio.to_thread(
-                self._encode, req.texts, req.normalize, req.batch_size,
+            embeddings = await self.batcher.embed(
+                req.texts, req.normalize, req.batch_size,
             )
+            arrays: Dict[str, Any] = {"embeddings": embeddings}
 
-            if req.other_texts is None:
-                # feature-extraction mode
+            if req.other_texts is not None:
+                # sentence-similarity mode
+                other = await self.batcher.embed(
+                    req.other_texts, req.normalize, req.batch_size,
+                )
+                # Off the loop: a big matmul (or the blockwise top-k) is
+                # seconds of CPU on large inputs.
+                if req.top_k is not None:
+                    idx, scores = await asyncio.to_thread(
+                        _top_k_similarities, embeddings, other, req.normalize, req.top_k,
+                    )
+                    arrays["top_k_indices"] = idx
+                    arrays["top_k_scores"] = scores
+                else:
+                    arrays["similarities"] = await asyncio.to_thread(
+                        _similarities, embeddings, other, req.normalize,
+                    )
+
+            if req.result_format == "json":
                 return EmbedResult(
                     request_id=req.request_id,
                     model_key=req.model_key,
                     ok=True,
-                    embeddings=embeddings.tolist(),
+                    **{name: value.tolist() for name, value in arrays.items()},
                 )
-
-            # sentence-similarity mode
-            other = await asyncio.to_thread(
-                self._encode, req.other_texts, req.normalize, req.batch_size,
-            )
-
-            if req.normalize:
-                # normalized vectors -> dot product is cosine similarity
-                sims = embeddings @ other.T
-            else:
-                # explicit cosine similarity
-                import numpy as np
-                eps = 1e-12
-                a_norm = embeddings / (
-                    np.linalg.norm(embeddings, axis=1, keepdims=True) + eps
-                )
-                b_norm = other / (
-                    np.linalg.norm(other, axis=1, keepdims=True) + eps
-                )
-                sims = a_norm @ b_norm.T
-
             return EmbedResult(
                 request_id=req.request_id,
                 model_key=req.model_key,
                 ok=True,
-                embeddings=embeddings.tolist(),
-                similarities=sims.tolist(),
+                arrays={
+                    name: ArrayPayload.from_numpy(value, req.result_format)
+                    for name, value in arrays.items()
+                },
             )
 
         except Exception as exc:
@@ -151,3 +241,46 @@ class FeatureExtractionRunner:
                 ok=False,
                 error=f"{type(exc).__name__}: {exc}",
             )
+
+
+# --- similarity math (module-level: runs in a worker thread) --------------
+
+# Rows of `a` scored per block in top-k mode; bounds the temporary block to
+# _TOP_K_BLOCK_ROWS x len(b) floats instead of the full matrix.
+_TOP_K_BLOCK_ROWS = 1024
+
+
+def _unit_rows(x, normalize: bool):
+    if normalize:
+        # normalized vectors -> dot product is cosine similarity
+        return x
+    import numpy as np
+    eps = 1e-12
+    return x / (np.linalg.norm(x, axis=1, keepdims=True) + eps)
+
+
+def _similarities(a, b, normalize: bool):
+    """Full len(a) x len(b) cosine-similarity matrix."""
+    return _unit_rows(a, normalize) @ _unit_rows(b, normalize).T
+
+
+def _top_k_similarities(a, b, normalize: bool, k: int):
+    """(indices, scores), each len(a) x k, best match first, built blockwise."""
+    import numpy as np
+
+    k = min(k, len(b))
+    indices = np.empty((len(a), max(k, 0)), dtype=np.int64)
+    scores = np.empty((len(a), max(k, 0)), dtype=np.float32)
+    if k <= 0 or not len(a):
+        return indices, scores          # nothing to rank against
+    a = _unit_rows(a, normalize)
+    bt = _unit_rows(b, normalize).T
+    for start in range(0, a.shape[0], _TOP_K_BLOCK_ROWS):
+        block = a[start:start + _TOP_K_BLOCK_ROWS] @ bt
+        part = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        vals = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(-vals, axis=1)
+        stop = start + block.shape[0]
+        indices[start:stop] = np.take_along_axis(part, order, axis=1)
+        scores[start:stop] = np.take_along_axis(vals, order, axis=1)
+    return indices, scores
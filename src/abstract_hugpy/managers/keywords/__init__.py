@@ -1,3 +1,4 @@
+from .density import *
 from .keybert_model import *
 from .keywords_runner import *
 
@@ -0,0 +1,143 @@
+"""
+Keyword density, phrase-aware and in one pass per phrase length.
+
+The text is tokenized once (whitespace split, edge punctuation stripped,
+lowercased — the same rule keyword_density always used) into an array of
+interned token ids. Counting a keyword set then:
+
+    1. maps every text token to a keyword-token id (0 = in no keyword),
+    2. for each distinct phrase length n, hashes every n-token window as
+       a base-(K+1) number — exact, since ids are < K+1 — and
+    3. counts the windows whose hash is one of the keywords'.
+
+"machine learning pipeline" is matched as three consecutive tokens, not
+looked up as a single word. Density stays occurrences / total words * 100,
+so single-word numbers are what they always were.
+
+numpy does steps 1-3 vectorized; without it (or if a hash could overflow
+int64) the same count runs as a plain Python sliding window.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+__all__ = ["KeywordDensityIndex", "density_tokens", "keyword_density"]
+
+_SPLIT = re.compile(r"\s+")
+_EDGE_PUNCT = ".,!?;:()\"'"
+_INT64_MAX = 2**63 - 1
+
+
+def density_tokens(text: str) -> List[str]:
+    """Density's tokenizer: split on whitespace, strip edge punctuation, lowercase."""
+    return [w.strip(_EDGE_PUNCT).lower() for w in _SPLIT.split(text) if w.strip()]
+
+
+def _np():
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
+
+
+class KeywordDensityIndex:
+    """One text, tokenized once; density() as many keyword sets as you like."""
+
+    def __init__(self, text: str):
+        self.tokens = density_tokens(text or "")
+        self.total = len(self.tokens)
+        self._vocab: Dict[str, int] = {}
+        ids = [self._vocab.setdefault(tok, len(self._vocab)) for tok in self.tokens]
+        np = _np()
+        self._ids = np.asarray(ids, dtype=np.int64) if np is not None else ids
+
+    def counts(self, keywords: Iterable[str]) -> Dict[str, int]:
+        """Occurrences of each keyword (as a whole token sequence)."""
+        keywords = list(keywords)
+        phrases: Dict[str, Tuple[str, ...]] = {
+            kw: tuple(density_tokens(kw)) for kw in keywords
+        }
+        out = {kw: 0 for kw in keywords}
+        # Keyword tokens get ids 1..K; a phrase with a token the text never
+        # uses can't occur and is left at 0.
+        kw_ids: Dict[int, int] = {}
+        encoded: Dict[str, Tuple[int, ...]] = {}
+        for kw, toks in phrases.items():
+            if not toks or any(t not in self._vocab for t in toks):
+                continue
+            encoded[kw] = tuple(
+                kw_ids.setdefault(self._vocab[t], len(kw_ids) + 1) for t in toks
+            )
+        if not encoded or not self.total:
+            return out
+
+        by_len: Dict[int, List[str]] = {}
+        for kw, seq in encoded.items():
+            by_len.setdefault(len(seq), []).append(kw)
+        base = len(kw_ids) + 1
+        for n, group in by_len.items():
+            if n > self.total:
+                continue
+            found = self._count_windows(n, base, kw_ids, [encoded[kw] for kw in group])
+            for kw in group:
+                out[kw] = found.get(encoded[kw], 0)
+        return out
+
+    def density(self, keywords: Iterable[str]) -> Dict[str, float]:
+        """keyword -> occurrences / total words * 100."""
+        keywords = list(keywords)
+        if not self.total:
+            return {kw: 0.0 for kw in keywords}
+        return {kw: (c / self.total) * 100 for kw, c in self.counts(keywords).items()}
+
+    # --- counting -----------------------------------------------------------
+
+    def _count_windows(self, n: int, base: int, kw_ids: Dict[int, int],
+                       wanted: List[Tuple[int, ...]]) -> Dict[Tuple[int, ...], int]:
+        np = _np()
+        if np is not None and (base ** n) <= _INT64_MAX:
+            return self._count_windows_np(np, n, base, kw_ids, wanted)
+        wanted_set = set(wanted)
+        remapped = [kw_ids.get(i, 0) for i in self._ids]
+        found: Counter = Counter()
+        for start in range(self.total - n + 1):
+            window = tuple(remapped[start:start + n])
+            if window in wanted_set:
+                found[window] += 1
+        return found
+
+    def _count_windows_np(self, np, n, base, kw_ids, wanted):
+        lut = np.zeros(len(self._vocab), dtype=np.int64)
+        lut[list(kw_ids)] = list(kw_ids.values())
+        seq = lut[self._ids]
+        windows = len(seq) - n + 1
+        # Horner over the n offsets: hash[i] = seq[i]*base^(n-1) + ... + seq[i+n-1]
+        hashes = np.zeros(windows, dtype=np.int64)
+        for k in range(n):
+            hashes = hashes * base + seq[k:k + windows]
+
+        targets = {}
+        for phrase in wanted:
+            h = 0
+            for t in phrase:
+                h = h * base + t
+            targets[h] = phrase
+        keys = np.fromiter(targets, dtype=np.int64, count=len(targets))
+        hits = hashes[np.isin(hashes, keys)]
+        values, counts = np.unique(hits, return_counts=True)
+        return {targets[int(v)]: int(c) for v, c in zip(values, counts)}
+
+
+def keyword_density(text: str, keywords: List[str],
+                    index: Optional[KeywordDensityIndex] = None) -> Dict[str, float]:
+    """Occurrences of each keyword per 100 words of ``text``.
+
+    Pass an ``index`` to reuse one text's tokenization across keyword sets.
+    """
+    if not text and index is None:
+        return {kw: 0.0 for kw in keywords}
+    return (index or KeywordDensityIndex(text)).density(keywords)
@@ -5,8 +5,9 @@ Two back-ends:
     "keybert"  — transformer-based (KeyBERT + sentence-BERT)
     "spacy"    — rule-based (POS + NER via spaCy)
 
-Both are lazy-loaded singletons.  The combined pipeline merges results
-from both, deduplicates, and computes density in one call.
+Both are lazy-loaded once per process (see managers/warmup.py).  The combined pipeline merges results
+from both, deduplicates, and computes density in one call.  The *_batch
+variants do the same for a list of documents in one model pass each.
 """
 
 from __future__ import annotations
@@ -18,11 +19,12 @@ from typing import Dict, List, Optional, Tuple
 
 from .imports import (
     DEFAULT_PATHS,
-    SingletonMeta,
     get_sentence_transformers,
     is_available,
     require,
 )
+from .density import keyword_density
+from ..warmup import register_warmup, warm
 
 
 # ---------------------------------------------------------------------------
@@ -217,31 +219,36 @@ def _build_sentence_bert(model_path: Optional[str] = None):
 # Manager: spaCy NLP
 # ---------------------------------------------------------------------------
 
-class SpacyManager(metaclass=SingletonMeta):
+class SpacyManager:
+    """Built once, through warm("spacy") — not constructed directly."""
 
     def __init__(self):
-        if not hasattr(self, "_ready"):
-            spacy = require("spacy", reason="needed by spacy keyword backend")
-            self.nlp = spacy.load("en_core_web_sm")
-            self._ready = True
+        spacy = require("spacy", reason="needed by spacy keyword backend")
+        self.nlp = spacy.load("en_core_web_sm")
+
+
+register_warmup("spacy", SpacyManager)
 
 
 def get_nlp():
-    return SpacyManager().nlp
+    return warm("spacy").nlp
 
 
 # ---------------------------------------------------------------------------
 # Manager: KeyBERT + sentence-BERT
 # ---------------------------------------------------------------------------
 
-class KeyBERTManager(metaclass=SingletonMeta):
+class KeyBERTManager:
+    """Built once, through warm("keybert") — not constructed directly.
+
+    Loads on its own warm-up thread, in parallel with spaCy; a request that
+    needs it before then waits on that load rather than starting another.
+    """
 
     def __init__(self):
-        if not hasattr(self, "_ready"):
-            self._sbert = _build_sentence_bert()
-            KeyBERT = require("keybert", reason="needed by keybert backend").KeyBERT
-            self._keybert = KeyBERT(self._sbert)
-            self._ready = True
+        self._sbert = _build_sentence_bert()
+        KeyBERT = require("keybert", reason="needed by keybert backend").KeyBERT
+        self._keybert = KeyBERT(self._sbert)
 
     @property
     def sbert(self):
@@ -252,14 +259,17 @@ class KeyBERTManager(metaclass=SingletonMeta):
         return self._keybert
 
 
+register_warmup("keybert", KeyBERTManager)
+
+
 def get_sbert():
-    return KeyBERTManager().sbert
+    return warm("keybert").sbert
 
 
 def get_keybert_instance():
     """Return the initialised KeyBERT model.  NOT named `get_keybert` — that
     import accessor lives in .imports and we never shadow it."""
-    return KeyBERTManager().keybert
+    return warm("keybert").keybert
 
 
 # ---------------------------------------------------------------------------
@@ -317,6 +327,59 @@ def extract_keybert(req: KeywordRequest) -> List[Tuple[str, float]]:
     return results
 
 
+def extract_keybert_batch(
+    texts: List[str],
+    req: KeywordRequest,
+    *,
+    batch_size: int = 64,
+) -> List[List[Tuple[str, float]]]:
+    """KeyBERT over many documents with a single encode() call.
+
+    KeyBERT would embed the documents and then the candidate phrases in two
+    passes per call. Here the candidate vocabulary is built once across all
+    documents (the same CountVectorizer KeyBERT builds internally), documents
+    and deduplicated candidates go through one SentenceTransformer.encode,
+    and KeyBERT only does the scoring / MMR on the precomputed embeddings.
+    """
+    if not texts:
+        return []
+    kw = get_keybert_instance()
+    CountVectorizer = require(
+        "sklearn.feature_extraction.text", reason="needed by keybert backend"
+    ).CountVectorizer
+
+    vectorizer = CountVectorizer(
+        ngram_range=req.keyphrase_ngram_range, stop_words=req.stop_words,
+    )
+    try:
+        vectorizer.fit(texts)
+    except ValueError:          # empty vocabulary: nothing but stop words
+        return [[] for _ in texts]
+    words = list(vectorizer.get_feature_names_out())
+
+    vectors = get_sbert().encode(
+        list(texts) + words, batch_size=batch_size, show_progress_bar=False,
+    )
+    doc_embeddings, word_embeddings = vectors[:len(texts)], vectors[len(texts):]
+
+    results = kw.extract_keywords(
+        list(texts),
+        keyphrase_ngram_range=req.keyphrase_ngram_range,
+        stop_words=req.stop_words,
+        top_n=req.top_n,
+        use_mmr=req.use_mmr,
+        diversity=req.diversity,
+        # Same vocabulary word_embeddings was built from, row for row.
+        vectorizer=vectorizer,
+        doc_embeddings=doc_embeddings,
+        word_embeddings=word_embeddings,
+    )
+    # Single document: KeyBERT returns the flat list, not a list of one.
+    if len(texts) == 1 and (not results or not isinstance(results[0], list)):
+        return [results]
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Back-end: spaCy rule-based extraction
 # ---------------------------------------------------------------------------
@@ -332,9 +395,25 @@ def extract_spacy(req: KeywordRequest) -> List[str]:
             f"extract_spacy expects a string, got {type(req.text)}"
         )
 
+    return _spacy_keywords(get_nlp()(req.text), req.top_n)
+
+
+def extract_spacy_batch(
+    texts: List[str],
+    top_n: int = 10,
+    *,
+    n_process: int = 1,
+    batch_size: int = 32,
+) -> List[List[str]]:
+    """extract_spacy for many documents through one ``nlp.pipe`` stream."""
     nlp = get_nlp()
-    doc = nlp(req.text)
+    return [
+        _spacy_keywords(doc, top_n)
+        for doc in nlp.pipe(texts, n_process=n_process, batch_size=batch_size)
+    ]
 
+
+def _spacy_keywords(doc, top_n: int) -> List[str]:
     word_counts = Counter(
         tok.text.lower()
         for tok in doc
@@ -348,27 +427,14 @@ def extract_spacy(req: KeywordRequest) -> List[str]:
     )
 
     combined = entity_counts + word_counts
-    return [kw for kw, _ in combined.most_common(req.top_n)]
+    return [kw for kw, _ in combined.most_common(top_n)]
 
 
 # ---------------------------------------------------------------------------
-# Keyword density
+# Keyword density — phrase-aware, see density.py
 # ---------------------------------------------------------------------------
 
-def keyword_density(text: str, keywords: List[str]) -> Dict[str, float]:
-    if not text:
-        return {kw: 0.0 for kw in keywords}
-
-    words = [
-        w.strip(".,!?;:()\"'").lower()
-        for w in re.split(r"\s+", text)
-        if w.strip()
-    ]
-    total = len(words)
-    if total == 0:
-        return {kw: 0.0 for kw in keywords}
-
-    return {kw: (words.count(kw.lower()) / total) * 100 for kw in keywords}
+# keyword_density is re-exported from here for existing importers.
 
 
 # ---------------------------------------------------------------------------
@@ -413,10 +479,89 @@ def extract_keywords(
     `backend_errors` dict tells you exactly what wasn't available.
     If *both* are missing, raises ImportError — there's nothing to do.
     """
+    req = _build_request(
+        text, preset, top_n, diversity, use_mmr, keyphrase_ngram_range, stop_words,
+    )
+
+    spacy_kws: Optional[List[str]] = None
+    keybert_kws: Optional[List[Tuple[str, float]]] = None
+    errors: Dict[str, str] = {}
+
+    # -- spacy backend -----------------------------------------------------
+    try:
+        spacy_kws = extract_spacy(req)
+    except ImportError as exc:
+        errors["spacy"] = str(exc)
+
+    # -- keybert backend ---------------------------------------------------
+    try:
+        keybert_kws = extract_keybert(req)
+    except ImportError as exc:
+        errors["keybert"] = str(exc)
+
+    return _merge_result(text, req.top_n, spacy_kws, keybert_kws, errors)
+
+
+def extract_keywords_batch(
+    texts: List[str],
+    *,
+    preset: Optional[str] = None,
+    top_n: Optional[int] = None,
+    diversity: Optional[float] = None,
+    use_mmr: Optional[bool] = None,
+    keyphrase_ngram_range: Optional[Tuple[int, int]] = None,
+    stop_words: Optional[str] = None,
+    n_process: int = 1,
+    batch_size: int = 32,
+) -> List[KeywordResult]:
+    """extract_keywords for many documents at once; one KeywordResult each.
+
+    spaCy runs as one ``nlp.pipe(texts, n_process, batch_size)`` stream and
+    KeyBERT embeds every document plus the deduplicated candidate set in a
+    single encode() call, instead of one model pass per document.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    req = _build_request(
+        "", preset, top_n, diversity, use_mmr, keyphrase_ngram_range, stop_words,
+    )
+
+    spacy_all: List[Optional[List[str]]] = [None] * len(texts)
+    keybert_all: List[Optional[List[Tuple[str, float]]]] = [None] * len(texts)
+    errors: Dict[str, str] = {}
+
+    try:
+        spacy_all = extract_spacy_batch(
+            texts, req.top_n, n_process=n_process, batch_size=batch_size,
+        )
+    except ImportError as exc:
+        errors["spacy"] = str(exc)
+
+    try:
+        keybert_all = extract_keybert_batch(texts, req, batch_size=max(batch_size, 64))
+    except ImportError as exc:
+        errors["keybert"] = str(exc)
+
+    return [
+        _merge_result(text, req.top_n, spacy_kws, keybert_kws, dict(errors))
+        for text, spacy_kws, keybert_kws in zip(texts, spacy_all, keybert_all)
+    ]
+
+
+def _build_request(
+    text: str,
+    preset: Optional[str],
+    top_n: Optional[int],
+    diversity: Optional[float],
+    use_mmr: Optional[bool],
+    keyphrase_ngram_range: Optional[Tuple[int, int]],
+    stop_words: Optional[str],
+) -> KeywordRequest:
     p = get_preset(preset) if preset else KeywordPreset()
     _d = {f.name: f.default for f in KeywordRequest.__dataclass_fields__.values()}
 
-    req = KeywordRequest(
+    return KeywordRequest(
         text=text,
         top_n=_resolve(top_n, p.top_n, _d["top_n"]),
         diversity=_resolve(diversity, p.diversity, _d["diversity"]),
@@ -427,21 +572,22 @@ def extract_keywords(
         ),
     )
 
-    result = KeywordResult()
 
-    # -- spacy backend -----------------------------------------------------
-    try:
-        result.keywords_spacy = extract_spacy(req)
+def _merge_result(
+    text: str,
+    top_n: int,
+    spacy_kws: Optional[List[str]],
+    keybert_kws: Optional[List[Tuple[str, float]]],
+    errors: Dict[str, str],
+) -> KeywordResult:
+    """Merge per-backend output (None = backend unavailable), dedupe, density."""
+    result = KeywordResult(backend_errors=errors)
+    if spacy_kws is not None:
+        result.keywords_spacy = spacy_kws
         result.backends_used.append("spacy")
-    except ImportError as exc:
-        result.backend_errors["spacy"] = str(exc)
-
-    # -- keybert backend ---------------------------------------------------
-    try:
-        result.keywords_keybert = extract_keybert(req)
+    if keybert_kws is not None:
+        result.keywords_keybert = keybert_kws
         result.backends_used.append("keybert")
-    except ImportError as exc:
-        result.backend_errors["keybert"] = str(exc)
 
     # -- nothing worked? ---------------------------------------------------
     if not result.backends_used:
@@ -458,7 +604,7 @@ def extract_keywords(
 
     result.combined = list(dict.fromkeys(
         spacy_lower + keybert_lower
-    ))[:req.top_n]
+    ))[:top_n]
 
     result.density = keyword_density(text, result.combined)
 
@@ -541,6 +687,54 @@ def refine_keywords(
         stop_words=stop_words,
     )
 
+    return _refine(raw, preset, min_d, max_d, min_s, max_w)
+
+
+def refine_keywords_batch(
+    texts: List[str],
+    *,
+    preset: str = "seo",
+    top_n: Optional[int] = None,
+    diversity: Optional[float] = None,
+    use_mmr: Optional[bool] = None,
+    keyphrase_ngram_range: Optional[Tuple[int, int]] = None,
+    stop_words: Optional[str] = None,
+    min_density: Optional[float] = None,
+    max_density: Optional[float] = None,
+    min_score: Optional[float] = None,
+    max_words_per_phrase: Optional[int] = None,
+    n_process: int = 1,
+    batch_size: int = 32,
+) -> List[RefinedResult]:
+    """refine_keywords for many documents, extracted via extract_keywords_batch."""
+    p = get_preset(preset) if preset else KeywordPreset()
+    min_d = min_density if min_density is not None else p.min_density
+    max_d = max_density if max_density is not None else p.max_density
+    min_s = min_score if min_score is not None else p.min_score
+    max_w = max_words_per_phrase if max_words_per_phrase is not None else p.max_words_per_phrase
+
+    raws = extract_keywords_batch(
+        texts,
+        preset=preset,
+        top_n=top_n,
+        diversity=diversity,
+        use_mmr=use_mmr,
+        keyphrase_ngram_range=keyphrase_ngram_range,
+        stop_words=stop_words,
+        n_process=n_process,
+        batch_size=batch_size,
+    )
+    return [_refine(raw, preset, min_d, max_d, min_s, max_w) for raw in raws]
+
+
+def _refine(
+    raw: KeywordResult,
+    preset: str,
+    min_d: Optional[float],
+    max_d: Optional[float],
+    min_s: Optional[float],
+    max_w: Optional[int],
+) -> RefinedResult:
     # -- build a score lookup from keybert results -------------------------
     score_map: Dict[str, float] = {
         kw.lower(): score for kw, score in raw.keywords_keybert
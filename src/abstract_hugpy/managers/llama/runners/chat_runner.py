@@ -21,7 +21,7 @@ from typing import AsyncIterator, Optional
 
 from .src import *
 from .imports import *
-from .get import get_llama_runner
+from .get import get_llama_runner, lease_llama_runner
 
 logger = logging.getLogger(__name__)
 
@@ -63,23 +63,26 @@ class LlamaCppChatRunner:
             for m in req.messages
         ]
 
-        if req.unbounded:
-            text = await self.runner.generate_text_async(
-                messages,
-                temperature=req.temperature,
-                top_p=req.top_p,
-                do_sample=req.do_sample,
-            )
-        else:
-            text = await self.runner.generate_text_async(
-                messages,
-                max_new_tokens=req.max_new_tokens,
-                temperature=req.temperature,
-                top_p=req.top_p,
-                do_sample=req.do_sample,
-                use_chat_template=True,
-                return_full_text=False,
-            )
+        # Leased for the whole call, so residency can't close the runner
+        # between lookup and generate.
+        with lease_llama_runner(self.model_key) as runner:
+            if req.unbounded:
+                text = await runner.generate_text_async(
+                    messages,
+                    temperature=req.temperature,
+                    top_p=req.top_p,
+                    do_sample=req.do_sample,
+                )
+            else:
+                text = await runner.generate_text_async(
+                    messages,
+                    max_new_tokens=req.max_new_tokens,
+                    temperature=req.temperature,
+                    top_p=req.top_p,
+                    do_sample=req.do_sample,
+                    use_chat_template=True,
+                    return_full_text=False,
+                )
 
         return ChatResult(
             request_id=req.request_id,
@@ -102,10 +105,11 @@ class LlamaCppChatRunner:
         (TokenEvent stream + one terminal DoneEvent/ErrorEvent), so the
         adapter is a straight passthrough.
         """
-        streamer = (
-            self.runner.stream_chat_unbounded(req, cancel_event=cancel_event)
-            if req.unbounded
-            else self.runner.stream_chat(req, cancel_event=cancel_event)
-        )
-        async for event in streamer:
-            yield event
+        with lease_llama_runner(self.model_key) as runner:
+            streamer = (
+                runner.stream_chat_unbounded(req, cancel_event=cancel_event)
+                if req.unbounded
+                else runner.stream_chat(req, cancel_event=cancel_event)
+            )
+            async for event in streamer:
+                yield event
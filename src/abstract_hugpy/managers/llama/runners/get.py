@@ -1,4 +1,7 @@
+from contextlib import contextmanager
+
 from .src import *
+from ...residency import RESIDENCY, gguf_footprint
 
 # ---------------------------------------------------------------------------
 # Process-local singleton cache for the heavy GGUF runners.
@@ -13,20 +16,64 @@ def get_llama_runner(model_key: str) -> "LlamaCppBaseRunner":
     """Get-or-build the singleton runner for a model_key.
 
     HTTP runner first (cheap probe); falls back to in-process Python.
+    The runner isn't held: residency may close it before the caller uses
+    it. Anything that generates should go through lease_llama_runner.
     """
+    return _lookup(model_key, lease=False)
+
+
+@contextmanager
+def lease_llama_runner(model_key: str):
+    """get_llama_runner, counted busy from lookup until the block exits."""
+    runner = _lookup(model_key, lease=True)
+    try:
+        yield runner
+    finally:
+        release = getattr(runner, "release_lease", None)
+        if release is not None:
+            release()
+
+
+def _lookup(model_key: str, lease: bool) -> "LlamaCppBaseRunner":
     if not isinstance(model_key, str):
         raise TypeError(
             f"get_llama_runner expects model_key: str, got {type(model_key).__name__}"
         )
 
     with _LLAMA_LOCK:
-        runner = _LLAMA_INSTANCES.get(model_key)
-        if runner is None:
-            runner = _build_runner(model_key)
-            _LLAMA_INSTANCES[model_key] = runner
+        while True:
+            runner = _LLAMA_INSTANCES.get(model_key)
+            if runner is None:
+                runner = _build_runner(model_key)
+                _LLAMA_INSTANCES[model_key] = runner
+                _register_resident(model_key, runner)
+            acquire = getattr(runner, "acquire_lease", None) if lease else None
+            if acquire is None or acquire():
+                break
+            # Closed by an eviction between lookup and lease: build afresh.
+            if _LLAMA_INSTANCES.get(model_key) is runner:
+                _LLAMA_INSTANCES.pop(model_key, None)
+        RESIDENCY.touch(("llama", model_key))
         return runner
 
 
+def _register_resident(model_key: str, runner: "LlamaCppBaseRunner") -> None:
+    # HTTP runners hold no weights in this process; nothing to budget.
+    if not isinstance(runner, LlamaCppPythonRunner):
+        return
+
+    def unload() -> None:
+        # No _LLAMA_LOCK here: eviction can run from inside get_llama_runner.
+        _LLAMA_INSTANCES.pop(model_key, None)
+        runner.close()
+
+    ram, vram = gguf_footprint(runner.model_path, runner.n_gpu_layers)
+    RESIDENCY.register(
+        ("llama", model_key), model_key=model_key,
+        ram_bytes=ram, vram_bytes=vram, unload=unload, busy=runner.is_busy,
+    )
+
+
 def _build_runner(model_key: str) -> "LlamaCppBaseRunner":
     try:
         candidate = LlamaCppRunner(model_key)  # HTTP runner
@@ -41,3 +88,13 @@ def _build_runner(model_key: str) -> "LlamaCppBaseRunner":
             model_key,
         )
         return LlamaCppPythonRunner(model_key)
+
+
+def llama_runner_stats() -> list[dict]:
+    """Concurrency/throughput snapshot of every loaded in-process runner.
+
+    HTTP runners are skipped — llama-server reports its own slots on /slots.
+    """
+    with _LLAMA_LOCK:
+        runners = list(_LLAMA_INSTANCES.values())
+    return [r.runtime_stats() for r in runners if hasattr(r, "runtime_stats")]
@@ -1,3 +1,5 @@
 from .ccp_runner import *
+from .scheduler import *
+from .prefix_cache import *
 from .python_runner import *
 from .base_runner import *
@@ -15,8 +15,13 @@ class LlamaCppBaseRunner(ABC):
         max_tokens: int,
         temp: float,
         top_p: float,
+        cancel_event: Optional[asyncio.Event] = None,
     ) -> AsyncIterator[tuple[str, Optional[str]]]:
-        """Yield (text_chunk, finish_reason_or_None) pairs from the backend."""
+        """Yield (text_chunk, finish_reason_or_None) pairs from the backend.
+
+        Must not block the event loop. ``cancel_event`` lets the backend stop
+        producing at the next token rather than after the consumer notices.
+        """
         ...
     @abstractmethod
     def _chat_complete(
@@ -77,7 +82,8 @@ class LlamaCppBaseRunner(ABC):
         last_finish: Optional[str] = None
 
         try:
-            async for text, fr in self._iter_stream(messages, max_tokens, temp, top_p):
+            async for text, fr in self._iter_stream(messages, max_tokens, temp, top_p,
+                                                    cancel_event=cancel_event):
                 if cancel_event and cancel_event.is_set():
                     self._log_done(req, "cancelled", output_chunks, max_tokens)
                     yield DoneEvent(request_id=req.request_id, input_tokens=0,
@@ -133,7 +139,8 @@ class LlamaCppBaseRunner(ABC):
                 piece_text = ""
                 chunk_finish: Optional[str] = None
 
-                async for text, fr in self._iter_stream(convo, chunk_tokens, temp, top_p):
+                async for text, fr in self._iter_stream(convo, chunk_tokens, temp, top_p,
+                                                        cancel_event=cancel_event):
                     if cancel_event and cancel_event.is_set():
                         self._log_done(req, "cancelled", output_chunks, chunk_tokens)
                         yield DoneEvent(request_id=req.request_id, input_tokens=0,
@@ -150,6 +157,9 @@ class LlamaCppBaseRunner(ABC):
                 if last_finish != "length" or not piece_text:
                     break
 
+                # The next pass re-sends convo + this piece; on the in-process
+                # runner the prefix KV cache restores everything up to here,
+                # so only the appended turn is prefilled.
                 convo.append({"role": "assistant", "content": piece_text})
                 convo.append({"role": "user", "content": "continue"})
 
@@ -30,7 +30,7 @@ class LlamaCppRunner(LlamaCppBaseRunner):
 ##        self.port: int = cfg[model_key]
 ##        self.base_url = f"{self.llama_host}:{self.port}"
 
-    async def _iter_stream(self, messages, max_tokens, temp, top_p):
+    async def _iter_stream(self, messages, max_tokens, temp, top_p, cancel_event=None):
         payload = {"messages": messages, "max_tokens": max_tokens,
                    "temperature": temp, "top_p": top_p, "stream": True}
         async with httpx.AsyncClient(timeout=None) as client:
@@ -38,6 +38,10 @@ class LlamaCppRunner(LlamaCppBaseRunner):
                                      json=payload) as response:
                 response.raise_for_status()
                 async for line in response.aiter_lines():
+                    # Leaving the block closes the connection, which is what
+                    # makes llama-server stop decoding for this slot.
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
                     if not line or line.strip() == "[DONE]":
                         continue
                     line = line.removeprefix("data: ")
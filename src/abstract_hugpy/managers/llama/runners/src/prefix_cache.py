@@ -0,0 +1,166 @@
+"""Prompt-prefix KV-state cache for the in-process GGUF runner.
+
+Continuation passes (stream_chat_unbounded, the worker's auto-continue) and
+multi-turn chats re-send the whole conversation every time. Without a cache
+llama.cpp re-evaluates that ever-growing prompt from scratch whenever any
+other request touched the context in between, so long outputs pay quadratic
+prefill.
+
+llama_cpp.Llama already has the hook: when ``llm.cache`` is set, every
+completion first asks ``cache[prompt_tokens]`` for the snapshot sharing the
+longest token prefix, restores it with load_state(), and only evaluates the
+remaining suffix; afterwards it stores ``cache[prompt + completion] =
+save_state()``. PrefixKVCache is that object: an LRU of LlamaState snapshots
+bounded by bytes, plus hit/miss/tokens-reused counters for /health.
+
+Llama skips load_state() when its live context already shares a longer
+prefix than the snapshot, so a lookup is not a hit: the runner reports each
+actual restore through record_restore(), and only those count.
+
+It deliberately duck-types llama_cpp's BaseLlamaCache instead of subclassing
+it, so importing this module never imports llama_cpp.
+"""
+from .imports import *
+from collections import OrderedDict
+
+# Default RAM budget for snapshots, and the share of currently-available RAM
+# it may never exceed. HUGPY_PREFIX_CACHE_GIB overrides; 0 disables.
+DEFAULT_PREFIX_CACHE_GIB = 2.0
+_PREFIX_CACHE_RAM_SHARE = 0.25
+
+
+def _common_prefix_len(a, b) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+class PrefixKVCache:
+    """LRU of llama.cpp context snapshots keyed by the tokens they contain."""
+
+    def __init__(self, capacity_bytes: int):
+        self.capacity_bytes = int(capacity_bytes)
+        self._states: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: Optional[tuple[int, int]] = None   # (prompt len, shared) of the last lookup
+        self._stats = {
+            "lookups": 0,
+            "hits": 0,
+            "tokens_reused": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    # --- BaseLlamaCache surface used by Llama ------------------------------
+
+    @property
+    def cache_size(self) -> int:
+        return sum(self._state_bytes(s) for s in self._states.values())
+
+    def _find_longest_prefix_key(self, key: tuple) -> tuple[Optional[tuple], int]:
+        best_key, best_len = None, 0
+        for k in self._states:
+            n = _common_prefix_len(k, key)
+            if n > best_len:
+                best_key, best_len = k, n
+        return best_key, best_len
+
+    def _find_reusable(self, key: tuple) -> tuple[Optional[tuple], int]:
+        best_key, best_len = self._find_longest_prefix_key(key)
+        # Every prompt starts with BOS; sharing only that saves nothing.
+        if best_len <= 1:
+            return None, 0
+        return best_key, best_len
+
+    def __getitem__(self, key):
+        key = tuple(key)
+        with self._lock:
+            self._stats["lookups"] += 1
+            best_key, best_len = self._find_reusable(key)
+            self._pending = None
+            if best_key is None:
+                raise KeyError("no cached prefix")
+            self._states.move_to_end(best_key)
+            self._pending = (len(key), best_len)
+            return self._states[best_key]
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return self._find_reusable(tuple(key))[0] is not None
+
+    def record_restore(self, n_tokens: int) -> None:
+        """Count a hit: the snapshot from the last lookup was loaded and the
+        context now holds ``n_tokens``."""
+        with self._lock:
+            if self._pending is None:
+                return
+            prompt_len, shared = self._pending
+            self._pending = None
+            self._stats["hits"] += 1
+            # Only the tokens the prompt shares with the snapshot skip prefill,
+            # and Llama.generate re-evaluates the prompt's last token anyway.
+            self._stats["tokens_reused"] += min(shared, n_tokens, max(prompt_len - 1, 0))
+
+    def __setitem__(self, key, value) -> None:
+        key = tuple(key)
+        size = self._state_bytes(value)
+        if size > self.capacity_bytes:
+            return                      # one snapshot bigger than the whole budget
+        with self._lock:
+            self._pending = None
+            self._states.pop(key, None)
+            # A snapshot that is a strict prefix of the new one is now
+            # redundant: anything it could serve, the new one serves too.
+            for k in [k for k in self._states if len(k) < len(key) and key[:len(k)] == k]:
+                del self._states[k]
+            self._states[key] = value
+            self._stats["stores"] += 1
+            while self._states and self.cache_size > self.capacity_bytes:
+                self._states.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    # --- introspection -----------------------------------------------------
+
+    @staticmethod
+    def _state_bytes(state) -> int:
+        return int(getattr(state, "llama_state_size", 0) or 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+            self._pending = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s["entries"] = len(self._states)
+            s["bytes"] = self.cache_size
+        s["capacity_bytes"] = self.capacity_bytes
+        lookups = s.pop("lookups")
+        s["misses"] = lookups - s["hits"]
+        s["hit_rate"] = round(s["hits"] / lookups, 4) if lookups else 0.0
+        return s
+
+
+def build_prefix_cache(model_key: str) -> Optional[PrefixKVCache]:
+    """PrefixKVCache sized from HUGPY_PREFIX_CACHE_GIB and free RAM, or None if disabled."""
+    from ....spill import free_ram_bytes
+
+    raw = os.environ.get("HUGPY_PREFIX_CACHE_GIB")
+    try:
+        gib = float(raw) if raw not in (None, "") else DEFAULT_PREFIX_CACHE_GIB
+    except ValueError:
+        logger.warning("bad HUGPY_PREFIX_CACHE_GIB=%r; using %s", raw, DEFAULT_PREFIX_CACHE_GIB)
+        gib = DEFAULT_PREFIX_CACHE_GIB
+    if gib <= 0:
+        return None
+
+    capacity = int(gib * 2**30)
+    free = free_ram_bytes()
+    if free:
+        capacity = min(capacity, int(free * _PREFIX_CACHE_RAM_SHARE))
+    logger.info("prefix KV cache: model=%s capacity=%.2fGiB", model_key, capacity / 2**30)
+    return PrefixKVCache(capacity)
@@ -1,11 +1,18 @@
 from .base_runner import LlamaCppBaseRunner
 from .imports import *
+from .scheduler import LlamaSequenceScheduler, resolve_max_concurrent_sequences
+from .prefix_cache import build_prefix_cache
+from contextlib import contextmanager
 # ===========================================================================
 # In-process Python runner — loads a GGUF via llama_cpp directly
 # ===========================================================================
 
 # python_runner.py  (in-process)
 class LlamaCppPythonRunner(LlamaCppBaseRunner):
+    # Context size for the tokenizer-only Llama kept when the scheduler owns
+    # generation: tokenize/detokenize need the vocab, not a full KV cache.
+    _TOKENIZER_N_CTX = 512
+
     def __init__(
         self,
         model_key: str,
@@ -13,9 +20,10 @@ class LlamaCppPythonRunner(LlamaCppBaseRunner):
         n_ctx: int = DEFAULT_N_CTX,
         n_threads: Optional[int] = None,
         n_gpu_layers: Optional[int] = None,
+        max_concurrent_sequences: Optional[int] = None,
     ):
-        from llama_cpp import Llama
         from ....spill import llama_kwargs
+        from ....residency import RESIDENCY, gguf_footprint
 
         self.model_key = model_key
         self.cfg = get_model_config(model_key)
@@ -31,6 +39,13 @@ class LlamaCppPythonRunner(LlamaCppBaseRunner):
         self.n_ctx = n_ctx
         self.n_threads = n_threads or max(1, (os.cpu_count() or 4) - 1)
         self.generate_lock = threading.Lock()
+        self._lock_waiters = 0
+        self._stats_lock = threading.Lock()
+        # Callers holding this runner (lease_llama_runner). Residency reads
+        # it as busy; close() while it's non-zero waits for the last release.
+        self._leases = 0
+        self._retired = False
+        self._chat_formatter = None
 
         # GPU/CPU spill. The resolver/dispatch path doesn't pass n_gpu_layers,
         # so by default we derive it from the spill module (env + autofit).
@@ -39,22 +54,217 @@ class LlamaCppPythonRunner(LlamaCppBaseRunner):
         gpu_kwargs = llama_kwargs(self.model_path)
         if n_gpu_layers is not None:
             gpu_kwargs["n_gpu_layers"] = n_gpu_layers
+        # Unload idle models this one doesn't fit beside; if that freed
+        # anything, re-run autofit so the new load sees the reclaimed VRAM.
+        ram, vram = gguf_footprint(self.model_path, gpu_kwargs.get("n_gpu_layers", 0))
+        if RESIDENCY.make_room(ram_bytes=ram, vram_bytes=vram,
+                               exclude=("llama", model_key)) and n_gpu_layers is None:
+            gpu_kwargs = llama_kwargs(self.model_path)
         self.n_gpu_layers = gpu_kwargs.get("n_gpu_layers", 0)
+        self._gpu_kwargs = gpu_kwargs
+
+        # Concurrent sequences: >1 hands generation to the batching scheduler,
+        # which builds its own multi-slot context on these weights. The Llama
+        # kept here then only tokenizes, so it doesn't need a full-size KV.
+        self.max_concurrent_sequences = resolve_max_concurrent_sequences(
+            self.cfg, max_concurrent_sequences,
+        )
+        self.scheduler: Optional[LlamaSequenceScheduler] = None
+        if self.max_concurrent_sequences > 1:
+            self.llm = self._load_llm(min(self.n_ctx, self._TOKENIZER_N_CTX))
+            try:
+                self.scheduler = LlamaSequenceScheduler(
+                    self.llm,
+                    model_key=model_key,
+                    max_concurrent_sequences=self.max_concurrent_sequences,
+                    seq_n_ctx=self.n_ctx,
+                )
+            except Exception as exc:
+                # Old llama_cpp without the batch/seq API, or not enough memory
+                # for N slots: degrade to the serialized path instead of failing.
+                logger.warning(
+                    "batching scheduler unavailable for %s (%s: %s); "
+                    "falling back to single-sequence generation",
+                    model_key, type(exc).__name__, exc,
+                )
+                self.max_concurrent_sequences = 1
+                self.llm = self._load_llm(self.n_ctx)
+        else:
+            self.llm = self._load_llm(self.n_ctx)
+
+        # Prefix KV reuse: continuation passes and follow-up turns restore the
+        # snapshot sharing their longest token prefix and only prefill the new
+        # suffix. Single-context path only — scheduler slots are cleared on
+        # retire, so there is no state there to snapshot.
+        self.prefix_cache = None
+        if self.scheduler is None:
+            self.prefix_cache = build_prefix_cache(model_key)
+            if self.prefix_cache is not None:
+                self.llm.set_cache(self.prefix_cache)
+                self._track_prefix_restores()
 
-        self.llm = Llama(
+        logger.info(
+            "LlamaCppPythonRunner ready: model=%s n_ctx=%s n_threads=%s "
+            "n_gpu_layers=%s max_concurrent_sequences=%s path=%s",
+            model_key, self.n_ctx, self.n_threads, self.n_gpu_layers,
+            self.max_concurrent_sequences, self.model_path,
+        )
+
+    def _track_prefix_restores(self) -> None:
+        """Report each snapshot Llama actually restores to the prefix cache,
+        with the context's token count once it is loaded."""
+        llm, cache = self.llm, self.prefix_cache
+        load_state = llm.load_state
+
+        def load_and_record(state):
+            load_state(state)
+            cache.record_restore(llm.n_tokens)
+
+        llm.load_state = load_and_record
+
+    def _load_llm(self, n_ctx: int):
+        from llama_cpp import Llama
+
+        return Llama(
             model_path=self.model_path,
-            n_ctx=self.n_ctx,
+            n_ctx=n_ctx,
             n_threads=self.n_threads,
             verbose=False,
-            **gpu_kwargs,
+            **self._gpu_kwargs,
         )
 
-        logger.info(
-            "LlamaCppPythonRunner ready: model=%s n_ctx=%s n_threads=%s "
-            "n_gpu_layers=%s path=%s",
-            model_key, self.n_ctx, self.n_threads, self.n_gpu_layers, self.model_path,
+    @contextmanager
+    def _generation_slot(self):
+        """generate_lock, counting how many callers are queued behind it."""
+        with self._stats_lock:
+            self._lock_waiters += 1
+        try:
+            self.generate_lock.acquire()
+        finally:
+            with self._stats_lock:
+                self._lock_waiters -= 1
+        try:
+            yield
+        finally:
+            self.generate_lock.release()
+
+    def runtime_stats(self) -> dict:
+        """Snapshot for /health: slots, queue depth, throughput, prefix-cache counters."""
+        if self.scheduler is not None:
+            return self.scheduler.stats()
+        return {
+            "model_key": self.model_key,
+            "max_concurrent_sequences": 1,
+            "active_sequences": int(self.generate_lock.locked()),
+            "queue_depth": self._lock_waiters,
+            "prefix_cache": self.prefix_cache.stats() if self.prefix_cache else None,
+        }
+
+    def is_busy(self) -> bool:
+        """True while leased, or a generation is running or queued (residency won't evict)."""
+        if self._leases:
+            return True
+        if self.scheduler is not None:
+            stats = self.scheduler.stats()
+            return bool(stats["active_sequences"] or stats["queue_depth"])
+        return self.generate_lock.locked() or self._lock_waiters > 0
+
+    def acquire_lease(self) -> bool:
+        """Count one holder; False once the runner has been closed."""
+        with self._stats_lock:
+            if self._retired:
+                return False
+            self._leases += 1
+            return True
+
+    def release_lease(self) -> None:
+        with self._stats_lock:
+            self._leases -= 1
+            free = self._retired and not self._leases
+        if free:
+            self._free()
+
+    def close(self) -> None:
+        """Free the llama context and weights now (or, while leased, after
+        the last release) instead of at GC time."""
+        with self._stats_lock:
+            self._retired = True
+            free = not self._leases
+        if free:
+            self._free()
+
+    def _free(self) -> None:
+        if self.scheduler is not None:
+            self.scheduler.close()
+            self.scheduler = None
+        if self.prefix_cache is not None:
+            self.prefix_cache.clear()
+        llm, self.llm = self.llm, None
+        if llm is not None:
+            try:
+                llm.close()
+            except Exception:
+                logger.exception("llama close failed: model=%s", self.model_key)
+
+    # ----- batched (scheduler) path ----------------------------------------
+
+    def _chat_tokens(self, messages) -> tuple[list[int], list[str]]:
+        """Render messages through the GGUF's chat template and tokenize.
+
+        Same Jinja formatter create_chat_completion builds for an embedded
+        template; models without one fall back to the User:/Assistant:
+        scaffold. Returns (tokens, template stop strings).
+        """
+        template = (getattr(self.llm, "metadata", None) or {}).get("tokenizer.chat_template")
+        if not template:
+            prompt = messages_to_prompt_from_dicts(messages)
+            return self.llm.tokenize(prompt.encode("utf-8"), add_bos=True, special=True), []
+
+        if self._chat_formatter is None:
+            from llama_cpp.llama_chat_format import Jinja2ChatFormatter
+
+            def token_text(tok: int) -> str:
+                if tok is None or tok < 0:
+                    return ""
+                try:
+                    raw = self.llm.detokenize([tok], special=True)
+                except TypeError:
+                    raw = self.llm.detokenize([tok])
+                return raw.decode("utf-8", errors="ignore")
+
+            eos_id = self.llm.token_eos()
+            self._chat_formatter = Jinja2ChatFormatter(
+                template=template,
+                eos_token=token_text(eos_id),
+                bos_token=token_text(self.llm.token_bos()),
+                stop_token_ids=[eos_id],
+            )
+        result = self._chat_formatter(messages=messages)
+        tokens = self.llm.tokenize(
+            result.prompt.encode("utf-8"),
+            add_bos=not getattr(result, "added_special", False),
+            special=True,
+        )
+        stop = result.stop or []
+        return tokens, [stop] if isinstance(stop, str) else list(stop)
+
+    def _submit(self, tokens, max_tokens, temp, top_p, stop, **callbacks):
+        return self.scheduler.submit(
+            tokens, max_tokens=max_tokens, temp=temp, top_p=top_p,
+            stop=stop, **callbacks,
         )
 
+    def _submit_chat(self, messages, max_tokens, temp, top_p, stop, **callbacks):
+        messages, max_tokens = self._fit_chat(messages, max_tokens)
+        tokens, template_stop = self._chat_tokens(messages)
+        return self._submit(tokens, max_tokens, temp, top_p,
+                            list(stop or []) + template_stop, **callbacks)
+
+    def _submit_raw(self, prompt, max_tokens, temp, top_p, stop, **callbacks):
+        prompt, max_tokens = self._fit_raw(prompt, max_tokens)
+        tokens = self.llm.tokenize(prompt.encode("utf-8"), add_bos=True, special=True)
+        return self._submit(tokens, max_tokens, temp, top_p, stop, **callbacks)
+
     # ----- context-window fitting -----------------------------------------
     # Extra tokens the chat template / BOS / role wrappers add on top of the
     # raw message text we measure. Kept as headroom so we never tip over n_ctx.
@@ -133,27 +343,79 @@ class LlamaCppPythonRunner(LlamaCppBaseRunner):
         )
         return new_prompt, out
 
-    async def _iter_stream(self, messages, max_tokens, temp, top_p):
+    async def _iter_stream(self, messages, max_tokens, temp, top_p, cancel_event=None):
+        if self.scheduler is not None:
+            async for item in self._iter_scheduled(messages, max_tokens, temp, top_p,
+                                                   cancel_event):
+                yield item
+            return
+
         messages, max_tokens = self._fit_chat(messages, max_tokens)
 
-        def run():
-            with self.generate_lock:
-                return self.llm.create_chat_completion(
+        def produce(emit, should_stop):
+            # Decode runs here, on the bridge thread, and entirely under the
+            # lock — the llama_cpp generator mutates the shared context on
+            # every next(), so iterating it outside the lock was a race.
+            with self._generation_slot():
+                if should_stop():
+                    return
+                stream = self.llm.create_chat_completion(
                     messages=messages, max_tokens=max_tokens,
                     temperature=temp, top_p=top_p, stream=True, stop=None)
-        stream = await asyncio.to_thread(run)
-        for raw in stream:
-            try:
-                choice = raw["choices"][0]
-                text = (choice.get("delta") or {}).get("content") or ""
-                fr   = choice.get("finish_reason")
-            except Exception:
-                text, fr = "", None
-            yield text, fr
-            await asyncio.sleep(0)
+                try:
+                    for raw in stream:
+                        try:
+                            choice = raw["choices"][0]
+                            text = (choice.get("delta") or {}).get("content") or ""
+                            fr   = choice.get("finish_reason")
+                        except Exception:
+                            text, fr = "", None
+                        if not emit((text, fr)):
+                            break
+                finally:
+                    stream.close()
+
+        async for item in iter_in_thread(produce, cancel_event=cancel_event,
+                                         name=f"llama-stream-{self.model_key}"):
+            yield item
+
+    async def _iter_scheduled(self, messages, max_tokens, temp, top_p, cancel_event=None):
+        """Stream one sequence out of the batching scheduler.
+
+        The decode thread pushes text onto an asyncio.Queue via
+        call_soon_threadsafe; a None sentinel marks retirement. The decode
+        thread is shared, so it never blocks on a slow consumer: while this
+        queue is over DEFAULT_STREAM_QUEUE_SIZE the sequence is simply skipped
+        (it keeps its slot and KV) until the consumer catches up.
+        ``cancel_event`` and abandoning the iterator both retire the sequence
+        at the next step, freeing the slot for the next request.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        handle = await asyncio.to_thread(
+            self._submit_chat, messages, max_tokens, temp, top_p, None,
+            on_text=lambda t: loop.call_soon_threadsafe(queue.put_nowait, t),
+            on_done=lambda: loop.call_soon_threadsafe(queue.put_nowait, None),
+            cancel_event=cancel_event,
+            backpressure=lambda: queue.qsize() >= DEFAULT_STREAM_QUEUE_SIZE,
+        )
+        try:
+            while True:
+                text = await queue.get()
+                if text is None:
+                    break
+                yield text, None
+            if handle.error is not None:
+                raise handle.error
+            yield "", handle.finish_reason
+        finally:
+            handle.cancel()
+
     def _chat_complete(self, messages, max_tokens, temp, top_p, stop):
+        if self.scheduler is not None:
+            return self._submit_chat(messages, max_tokens, temp, top_p, stop).wait()
         messages, max_tokens = self._fit_chat(messages, max_tokens)
-        with self.generate_lock:
+        with self._generation_slot():
             out = self.llm.create_chat_completion(
                 messages=messages, max_tokens=max_tokens,
                 temperature=temp, top_p=top_p, stop=stop, stream=False)
@@ -163,8 +425,11 @@ class LlamaCppPythonRunner(LlamaCppBaseRunner):
         return choice["message"]["content"] or "", choice.get("finish_reason") or "stop"
 
     def _raw_complete(self, prompt, max_tokens, temp, top_p, stop, return_full_text):
+        if self.scheduler is not None:
+            text, finish = self._submit_raw(prompt, max_tokens, temp, top_p, stop).wait()
+            return (prompt + text if return_full_text else text), finish
         prompt, max_tokens = self._fit_raw(prompt, max_tokens)
-        with self.generate_lock:
+        with self._generation_slot():
             out = self.llm(prompt, max_tokens=max_tokens, temperature=temp,
                            top_p=top_p, stop=stop, stream=False, echo=return_full_text)
         choice = out["choices"][0]
@@ -181,7 +446,20 @@ class LlamaCppPythonRunner(LlamaCppBaseRunner):
         use_chat_template: bool,
         return_full_text: bool,
     ) -> str:
-        with self.generate_lock:
+        if self.scheduler is not None:
+            if use_chat_template and isinstance(messages, list):
+                text, _ = self._chat_complete(messages, max_tokens, temp, top_p, stop)
+                return text
+            prompt = (
+                messages
+                if isinstance(messages, str)
+                else messages_to_prompt_from_dicts(messages)
+            )
+            text, _ = self._raw_complete(prompt, max_tokens, temp, top_p, stop,
+                                         return_full_text)
+            return text
+
+        with self._generation_slot():
             if use_chat_template and isinstance(messages, list):
                 messages, max_tokens = self._fit_chat(messages, max_tokens)
                 out = self.llm.create_chat_completion(
@@ -0,0 +1,475 @@
+"""Interleave decode steps from several in-flight requests on one GGUF.
+
+Without this, LlamaCppPythonRunner serializes everything behind one
+generate_lock: the second user waits for the first user's whole completion,
+and aggregate tokens/sec on a shared model stays flat no matter how many
+requests are queued.
+
+The scheduler owns a *second* llama.cpp context built on the runner's
+already-loaded weights (no second model load) with ``n_seq_max`` KV slots,
+and one decode thread. Every step it builds a single llama_batch holding:
+
+    - the last sampled token of every decoding sequence (1 token each), then
+    - as many prompt tokens of newly admitted sequences as still fit n_batch.
+
+One llama_decode evaluates the whole batch, each sequence samples from its
+own logits row, and finished sequences give their slot (and KV cells) back.
+Batched decode is memory-bound, so N sequences per step cost far less than
+N separate steps — that's where the aggregate throughput comes from.
+
+Sampling happens here (greedy, or temperature + top-p in numpy) because the
+high-level Llama sampler is single-sequence. Grammar/repeat-penalty are not
+supported on this path; callers that need them keep max_concurrent_sequences=1.
+"""
+# ===========================================================================
+# Continuous-batching scheduler for the in-process GGUF runner
+# ===========================================================================
+from .imports import *
+import codecs
+import time
+from collections import deque
+
+
+def resolve_max_concurrent_sequences(cfg=None, requested: Optional[int] = None) -> int:
+    """Per-model slot count: explicit arg > model row > HUGPY_MAX_CONCURRENT_SEQUENCES > 1.
+
+    The model row is ModelConfig.extra (models_dict / overlay JSON), so a
+    model can opt in with ``"max_concurrent_sequences": 4`` without a code
+    change. 1 keeps the classic single-sequence generate_lock path.
+    """
+    value = requested
+    if value is None and cfg is not None:
+        value = (getattr(cfg, "extra", None) or {}).get("max_concurrent_sequences")
+    if value is None:
+        value = os.environ.get("HUGPY_MAX_CONCURRENT_SEQUENCES", "1")
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        logger.warning("bad max_concurrent_sequences=%r; using 1", value)
+        return 1
+
+
+# ---------------------------------------------------------------------------
+# llama_cpp API shims — the low-level names moved between releases
+# ---------------------------------------------------------------------------
+
+def _new_context(llama_cpp, model, params):
+    ctor = (getattr(llama_cpp, "llama_init_from_model", None)
+            or getattr(llama_cpp, "llama_new_context_with_model"))
+    ctx = ctor(model, params)
+    if not ctx:
+        raise RuntimeError("llama.cpp failed to create the batched context")
+    return ctx
+
+
+def _seq_rm_fn(llama_cpp, ctx) -> Callable[[int], None]:
+    """Drop every KV cell of one sequence id."""
+    get_memory = getattr(llama_cpp, "llama_get_memory", None)
+    memory_seq_rm = getattr(llama_cpp, "llama_memory_seq_rm", None)
+    if get_memory is not None and memory_seq_rm is not None:
+        mem = get_memory(ctx)
+        return lambda seq_id: memory_seq_rm(mem, seq_id, -1, -1)
+    for name in ("llama_kv_self_seq_rm", "llama_kv_cache_seq_rm"):
+        fn = getattr(llama_cpp, name, None)
+        if fn is not None:
+            return lambda seq_id, fn=fn: fn(ctx, seq_id, -1, -1)
+    raise RuntimeError("llama_cpp exposes no per-sequence KV removal API")
+
+
+def _is_eog_fn(llama_cpp, llm) -> Callable[[int], bool]:
+    """End-of-generation test (EOS, EOT, <|im_end|>, ...) for this vocab."""
+    vocab_is_eog = getattr(llama_cpp, "llama_vocab_is_eog", None)
+    get_vocab = getattr(llama_cpp, "llama_model_get_vocab", None)
+    if vocab_is_eog is not None and get_vocab is not None:
+        vocab = get_vocab(llm.model)
+        return lambda tok: bool(vocab_is_eog(vocab, tok))
+    token_is_eog = getattr(llama_cpp, "llama_token_is_eog", None)
+    if token_is_eog is not None:
+        return lambda tok: bool(token_is_eog(llm.model, tok))
+    eos = llm.token_eos()
+    return lambda tok: tok == eos
+
+
+def _sample(np, logits, temp: float, top_p: float, rng) -> int:
+    """Greedy when temp == 0, else temperature + nucleus sampling."""
+    if temp <= 0:
+        return int(np.argmax(logits))
+    scaled = logits.astype(np.float64) / temp
+    scaled -= scaled.max()
+    probs = np.exp(scaled)
+    probs /= probs.sum()
+    if top_p >= 1.0:
+        return int(rng.choice(probs.shape[0], p=probs))
+    # Sorting a 150k vocab per token is the expensive part; the nucleus is
+    # almost always inside the top few hundred, so partition first and only
+    # fall back to a full sort when it isn't.
+    k = min(probs.shape[0], 1024)
+    cand = np.argpartition(-probs, k - 1)[:k]
+    if probs[cand].sum() < top_p:
+        cand = np.arange(probs.shape[0])
+    cand = cand[np.argsort(-probs[cand])]
+    cut = int(np.searchsorted(np.cumsum(probs[cand]), top_p)) + 1
+    keep = cand[:cut]
+    p = probs[keep] / probs[keep].sum()
+    return int(rng.choice(keep, p=p))
+
+
+# ---------------------------------------------------------------------------
+# One in-flight request
+# ---------------------------------------------------------------------------
+
+class SequenceHandle:
+    """Caller-side view of a scheduled generation.
+
+    ``on_text(text)`` (optional) is called from the decode thread for every
+    released text piece and ``on_done()`` once when the sequence retires;
+    ``wait()`` blocks until then and returns (text, finish_reason) in
+    llama.cpp vocabulary ('stop'/'length'/'cancelled').
+
+    ``cancel_event`` (anything with ``is_set()``) retires the sequence at the
+    next step. ``backpressure()`` returning True parks it for that step —
+    the consumer is behind, so decoding more would only buffer.
+    """
+
+    def __init__(self, prompt_tokens, *, max_tokens, temp, top_p, stop,
+                 on_text=None, on_done=None, cancel_event=None, backpressure=None):
+        self.prompt_tokens = list(prompt_tokens)
+        self.max_tokens = int(max_tokens)
+        self.temp = float(temp)
+        self.top_p = float(top_p)
+        self.stop = [s for s in (stop or []) if s]
+        self.on_text = on_text
+        self.on_done = on_done
+        self.cancel_event = cancel_event
+        self.backpressure = backpressure
+
+        self.text = ""
+        self.finish_reason: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+        self._cancelled = False
+
+        # scheduler-owned state
+        self.slot: Optional[int] = None
+        self.pending: list[int] = list(self.prompt_tokens)
+        self.n_past = 0
+        self.n_generated = 0
+        self._emitted = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+
+    def cancel(self) -> None:
+        """Retire at the next scheduler step; the slot is freed immediately after."""
+        self._cancelled = True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled or (
+            self.cancel_event is not None and self.cancel_event.is_set()
+        )
+
+    @property
+    def paused(self) -> bool:
+        if self.backpressure is None:
+            return False
+        try:
+            return bool(self.backpressure())
+        except Exception:
+            return False
+
+    def wait(self, timeout: Optional[float] = None) -> tuple[str, str]:
+        self.done.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.text, self.finish_reason or "stop"
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+class LlamaSequenceScheduler:
+    """Owns a multi-sequence llama.cpp context and the one thread that decodes it."""
+
+    # How long the decode thread sleeps when every live sequence is parked
+    # behind a slow consumer.
+    _PAUSED_POLL_S = 0.01
+
+    def __init__(
+        self,
+        llm,
+        *,
+        model_key: str,
+        max_concurrent_sequences: int,
+        seq_n_ctx: int,
+    ):
+        import llama_cpp
+        import numpy as np
+
+        self._lib = llama_cpp
+        self._np = np
+        self._rng = np.random.default_rng()
+        self.llm = llm
+        self.model_key = model_key
+        self.max_concurrent_sequences = int(max_concurrent_sequences)
+        self.seq_n_ctx = int(seq_n_ctx)
+
+        # Same threads/batch/offload settings as the runner's own context,
+        # but one KV slot per sequence, each with the runner's full window.
+        params = type(llm.context_params).from_buffer_copy(llm.context_params)
+        params.n_ctx = self.seq_n_ctx * self.max_concurrent_sequences
+        params.n_seq_max = self.max_concurrent_sequences
+        self.n_batch = max(self.max_concurrent_sequences, int(params.n_batch))
+        params.n_batch = self.n_batch
+        self.ctx = _new_context(llama_cpp, llm.model, params)
+        self.batch = llama_cpp.llama_batch_init(self.n_batch, 0, self.max_concurrent_sequences)
+        self._seq_rm = _seq_rm_fn(llama_cpp, self.ctx)
+        self._is_eog = _is_eog_fn(llama_cpp, llm)
+        self.n_vocab = llm.n_vocab()
+
+        self._cond = threading.Condition()
+        self._queue: deque[SequenceHandle] = deque()
+        self._active: list[SequenceHandle] = []
+        self._free_slots = list(range(self.max_concurrent_sequences))
+        self._rr = 0
+        self._closed = False
+
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "cancelled": 0,
+            "errors": 0,
+            "prompt_tokens": 0,
+            "generated_tokens": 0,
+            "decode_steps": 0,
+            "batched_tokens": 0,
+            "decode_seconds": 0.0,
+        }
+
+        self._thread = threading.Thread(
+            target=self._loop, name=f"llama-sched-{model_key}", daemon=True,
+        )
+        self._thread.start()
+        logger.info(
+            "LlamaSequenceScheduler ready: model=%s slots=%s seq_n_ctx=%s n_batch=%s",
+            model_key, self.max_concurrent_sequences, self.seq_n_ctx, self.n_batch,
+        )
+
+    # --- public -------------------------------------------------------------
+
+    def submit(
+        self,
+        prompt_tokens: list[int],
+        *,
+        max_tokens: int,
+        temp: float = 0.0,
+        top_p: float = 1.0,
+        stop: Optional[list[str]] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        on_done: Optional[Callable[[], None]] = None,
+        cancel_event: Optional[Any] = None,
+        backpressure: Optional[Callable[[], bool]] = None,
+    ) -> SequenceHandle:
+        if not prompt_tokens:
+            raise ValueError("scheduler needs at least one prompt token")
+        if len(prompt_tokens) >= self.seq_n_ctx:
+            raise ValueError(
+                f"prompt of {len(prompt_tokens)} tokens does not fit seq_n_ctx={self.seq_n_ctx}"
+            )
+        handle = SequenceHandle(
+            prompt_tokens, max_tokens=max_tokens, temp=temp, top_p=top_p,
+            stop=stop, on_text=on_text, on_done=on_done,
+            cancel_event=cancel_event, backpressure=backpressure,
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"scheduler for {self.model_key} is closed")
+            self._queue.append(handle)
+            self._stats["submitted"] += 1
+            self._cond.notify()
+        return handle
+
+    def stats(self) -> dict:
+        with self._cond:
+            s = dict(self._stats)
+            s["active_sequences"] = len(self._active)
+            s["queue_depth"] = len(self._queue)
+        s["model_key"] = self.model_key
+        s["max_concurrent_sequences"] = self.max_concurrent_sequences
+        s["seq_n_ctx"] = self.seq_n_ctx
+        secs = s["decode_seconds"]
+        s["tokens_per_sec"] = round(s["generated_tokens"] / secs, 2) if secs else 0.0
+        steps = s["decode_steps"]
+        s["mean_batch_tokens"] = round(s["batched_tokens"] / steps, 2) if steps else 0.0
+        return s
+
+    def close(self) -> None:
+        """Stop the decode thread, fail anything still queued, free the context."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=30)
+        for seq in list(self._queue) + list(self._active):
+            self._finish(seq, None, RuntimeError("scheduler closed"))
+        self._queue.clear()
+        self._active.clear()
+        try:
+            self._lib.llama_batch_free(self.batch)
+            self._lib.llama_free(self.ctx)
+        except Exception:
+            logger.exception("scheduler close: failed to free llama context")
+
+    # --- decode thread ------------------------------------------------------
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._queue and not self._active:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                while self._queue and self._free_slots:
+                    seq = self._queue.popleft()
+                    seq.slot = self._free_slots.pop(0)
+                    self._active.append(seq)
+                    self._stats["prompt_tokens"] += len(seq.prompt_tokens)
+                active = list(self._active)
+
+            for seq in active:
+                if seq.cancelled:
+                    self._retire(seq, "cancelled")
+            runnable = [s for s in active if s.finish_reason is None and not s.paused]
+            if not runnable:
+                if any(s.finish_reason is None for s in active):
+                    # Every live sequence is waiting on its consumer; don't spin.
+                    with self._cond:
+                        self._cond.wait(timeout=self._PAUSED_POLL_S)
+                continue
+            active = runnable
+            try:
+                self._step(active)
+            except Exception as exc:  # llama_decode failure poisons this batch only
+                logger.exception("scheduler step failed: model=%s", self.model_key)
+                for seq in active:
+                    self._retire(seq, None, exc)
+
+    def _step(self, active: list[SequenceHandle]) -> None:
+        # Decoding sequences (1 pending token) go first so a big prefill can't
+        # starve them; the round-robin offset keeps prefill chunks fair too.
+        n = len(active)
+        order = [active[(self._rr + i) % n] for i in range(n)]
+        self._rr = (self._rr + 1) % max(n, 1)
+        order.sort(key=lambda s: len(s.pending) > 1)
+
+        batch = self.batch
+        n_tokens = 0
+        logit_rows: list[tuple[SequenceHandle, int]] = []
+        for seq in order:
+            room = self.n_batch - n_tokens
+            if room <= 0:
+                break
+            take = seq.pending[:room]
+            for j, tok in enumerate(take):
+                batch.token[n_tokens] = tok
+                batch.pos[n_tokens] = seq.n_past + j
+                batch.n_seq_id[n_tokens] = 1
+                batch.seq_id[n_tokens][0] = seq.slot
+                batch.logits[n_tokens] = False
+                n_tokens += 1
+            seq.n_past += len(take)
+            del seq.pending[:len(take)]
+            if not seq.pending:
+                batch.logits[n_tokens - 1] = True
+                logit_rows.append((seq, n_tokens - 1))
+        batch.n_tokens = n_tokens
+
+        t0 = time.perf_counter()
+        rc = self._lib.llama_decode(self.ctx, batch)
+        elapsed = time.perf_counter() - t0
+        if rc != 0:
+            raise RuntimeError(f"llama_decode returned {rc}")
+
+        with self._cond:
+            self._stats["decode_steps"] += 1
+            self._stats["batched_tokens"] += n_tokens
+            self._stats["decode_seconds"] += elapsed
+
+        np = self._np
+        for seq, row in logit_rows:
+            ptr = self._lib.llama_get_logits_ith(self.ctx, row)
+            logits = np.ctypeslib.as_array(ptr, shape=(self.n_vocab,))
+            tok = _sample(np, logits, seq.temp, seq.top_p, self._rng)
+            self._accept(seq, tok)
+
+    def _accept(self, seq: SequenceHandle, tok: int) -> None:
+        if self._is_eog(tok):
+            self._retire(seq, "stop")
+            return
+        seq.n_generated += 1
+        with self._cond:
+            self._stats["generated_tokens"] += 1
+        piece = seq._decoder.decode(self.llm.detokenize([tok]))
+        seq.text += piece
+
+        if seq.stop:
+            for s in seq.stop:
+                idx = seq.text.find(s, max(0, seq._emitted - len(s) + 1))
+                if idx != -1:
+                    seq.text = seq.text[:idx]
+                    self._retire(seq, "stop")
+                    return
+            # Hold back a possible stop-string prefix until it's decided.
+            hold = max(len(s) for s in seq.stop) - 1
+            self._release(seq, len(seq.text) - hold)
+        else:
+            self._release(seq, len(seq.text))
+
+        if seq.n_generated >= seq.max_tokens or seq.n_past + 1 >= self.seq_n_ctx:
+            self._retire(seq, "length")
+            return
+        seq.pending = [tok]
+
+    def _release(self, seq: SequenceHandle, upto: int) -> None:
+        if upto <= seq._emitted:
+            return
+        chunk = seq.text[seq._emitted:upto]
+        seq._emitted = upto
+        if seq.on_text is not None and chunk:
+            try:
+                seq.on_text(chunk)
+            except Exception:
+                logger.exception("scheduler on_text callback failed; cancelling sequence")
+                seq.cancel()
+
+    def _retire(self, seq: SequenceHandle, finish: Optional[str],
+                error: Optional[BaseException] = None) -> None:
+        if finish is not None and error is None:
+            self._release(seq, len(seq.text))
+        try:
+            self._seq_rm(seq.slot)
+        except Exception:
+            logger.exception("scheduler: failed to clear KV for slot %s", seq.slot)
+        with self._cond:
+            if seq in self._active:
+                self._active.remove(seq)
+            if seq.slot is not None:
+                self._free_slots.append(seq.slot)
+                seq.slot = None
+            key = "errors" if error is not None else (
+                "cancelled" if finish == "cancelled" else "completed")
+            self._stats[key] += 1
+            self._cond.notify()
+        self._finish(seq, finish, error)
+
+    @staticmethod
+    def _finish(seq: SequenceHandle, finish: Optional[str],
+                error: Optional[BaseException]) -> None:
+        seq.finish_reason = finish or "error"
+        seq.error = error
+        seq.done.set()
+        if seq.on_done is not None:
+            try:
+                seq.on_done()
+            except Exception:
+                logger.exception("scheduler on_done callback failed")
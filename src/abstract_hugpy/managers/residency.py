@@ -0,0 +1,322 @@
+"""Model residency — which heavy models stay loaded, and who gets unloaded.
+
+Every inner singleton cache (get_llama_runner, FeatureExtractionRunner._MODELS,
+the summarizer backends' _MODELS/_PIPELINES, VisionCoder's _INSTANCES) used to
+grow without bound: a worker that rotated through models kept every one of them
+until the box OOMed or VRAM ran out, and dispatch.evict() only dropped the cheap
+runner wrapper.
+
+Each cache now registers what it loads here, with an estimated footprint and an
+``unload`` callback that removes it from the owning cache:
+
+    RESIDENCY.make_room(ram_bytes=..., vram_bytes=...)   # before a load
+    RESIDENCY.register(key, model_key=..., ram_bytes=..., vram_bytes=...,
+                       unload=..., busy=...)             # after a load
+    RESIDENCY.touch(key)                                 # on every use
+
+make_room() unloads least-recently-used models (skipping any whose ``busy()``
+says a generation is in flight) until the new one fits, then runs gc and
+``torch.cuda.empty_cache()`` so the memory really goes back.
+
+Budgets come from the environment, like the spill knobs:
+
+    HUGPY_RESIDENT_RAM_GIB    float   RAM budget for resident models
+    HUGPY_RESIDENT_VRAM_GIB   float   VRAM budget for resident models
+    HUGPY_RESIDENT_MAX_MODELS int     cap on the number of resident models
+
+Unset budgets fall back to live free memory (spill.free_ram_bytes /
+free_vram_bytes), so by default a load only evicts when it would not fit.
+"""
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Optional
+
+from .spill import (
+    _VRAM_SAFETY,
+    _ASSUMED_LAYERS,
+    _env_float,
+    _env_int,
+    _gguf_layer_count,
+    free_ram_bytes,
+    free_vram_bytes,
+)
+
+logger = logging.getLogger("abstract_hugpy.residency")
+
+# Weight files counted when estimating a transformers model dir before load.
+_WEIGHT_SUFFIXES = (".safetensors", ".bin", ".pt", ".pth", ".gguf")
+
+
+# ---------------------------------------------------------------------------
+# footprint estimates (best-effort, never raise)
+# ---------------------------------------------------------------------------
+def gguf_footprint(model_path: str, n_gpu_layers: int) -> tuple[int, int]:
+    """(ram_bytes, vram_bytes) for a GGUF given how many layers are offloaded.
+
+    Same even per-layer split autofit_gpu_layers uses: -1 puts the whole file
+    on the GPU, 0 keeps it all in RAM, N offloads N/total of it.
+    """
+    try:
+        size = os.path.getsize(model_path)
+    except OSError:
+        return 0, 0
+    if not n_gpu_layers:
+        return size, 0
+    if n_gpu_layers < 0:
+        return 0, size
+    total = _gguf_layer_count(model_path) or _ASSUMED_LAYERS
+    vram = int(size * min(n_gpu_layers, total) / max(total, 1))
+    return size - vram, vram
+
+
+def dir_footprint(model_dir: str, device: Optional[str] = None) -> tuple[int, int]:
+    """(ram_bytes, vram_bytes) estimate for a model dir from its weight files.
+
+    ``device=None`` assumes the weights go to the GPU whenever one is visible,
+    which is what SentenceTransformer / pipeline(device=None) do.
+    """
+    if device is None:
+        device = "cuda" if free_vram_bytes() is not None else "cpu"
+    total = 0
+    try:
+        for root, _dirs, files in os.walk(model_dir):
+            for name in files:
+                if name.endswith(_WEIGHT_SUFFIXES):
+                    try:
+                        total += os.path.getsize(os.path.join(root, name))
+                    except OSError:
+                        pass
+    except Exception:
+        return 0, 0
+    return (0, total) if str(device).startswith("cuda") else (total, 0)
+
+
+def torch_footprint(*objs: Any) -> tuple[int, int]:
+    """Measured (ram_bytes, vram_bytes) of loaded torch modules.
+
+    Accepts nn.Modules, HF pipelines (uses .model), SentenceTransformers, and
+    anything else with .parameters(); other objects count as zero.
+    """
+    ram = vram = 0
+    for obj in objs:
+        module = getattr(obj, "model", None) if not hasattr(obj, "parameters") else obj
+        if module is None or not hasattr(module, "parameters"):
+            continue
+        try:
+            tensors = list(module.parameters())
+            if hasattr(module, "buffers"):
+                tensors += list(module.buffers())
+            for t in tensors:
+                n = t.numel() * t.element_size()
+                if getattr(t.device, "type", "cpu") == "cuda":
+                    vram += n
+                else:
+                    ram += n
+        except Exception:
+            continue
+    return ram, vram
+
+
+def release_device_memory() -> None:
+    """gc + CUDA cache flush, without importing torch if nobody else has."""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return
+    try:
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+            torch.cuda.ipc_collect()
+    except Exception:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# the manager
+# ---------------------------------------------------------------------------
+@dataclass
+class Resident:
+    key: Hashable
+    model_key: str
+    ram_bytes: int
+    vram_bytes: int
+    unload: Callable[[], None]
+    busy: Optional[Callable[[], bool]] = None
+    loaded_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+
+    def is_busy(self) -> bool:
+        if self.busy is None:
+            return False
+        try:
+            return bool(self.busy())
+        except Exception:
+            return False
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "key": repr(self.key),
+            "model_key": self.model_key,
+            "ram_bytes": self.ram_bytes,
+            "vram_bytes": self.vram_bytes,
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+            "busy": self.is_busy(),
+        }
+
+
+class ModelResidency:
+    """LRU of loaded models under RAM / VRAM / count budgets."""
+
+    def __init__(self):
+        self._residents: "OrderedDict[Hashable, Resident]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.loads = 0
+        self.evictions = 0
+
+    # --- budgets ------------------------------------------------------------
+    @staticmethod
+    def budgets() -> dict[str, Optional[float]]:
+        ram = _env_float("HUGPY_RESIDENT_RAM_GIB")
+        vram = _env_float("HUGPY_RESIDENT_VRAM_GIB")
+        return {
+            "ram_bytes": int(ram * 2**30) if ram is not None else None,
+            "vram_bytes": int(vram * 2**30) if vram is not None else None,
+            "max_models": _env_int("HUGPY_RESIDENT_MAX_MODELS"),
+        }
+
+    def _totals(self) -> tuple[int, int]:
+        ram = sum(r.ram_bytes for r in self._residents.values())
+        vram = sum(r.vram_bytes for r in self._residents.values())
+        return ram, vram
+
+    def _fits(self, ram_bytes: int, vram_bytes: int, budgets: dict) -> bool:
+        used_ram, used_vram = self._totals()
+        max_models = budgets["max_models"]
+        if max_models is not None and len(self._residents) + 1 > max_models:
+            return False
+        if ram_bytes:
+            if budgets["ram_bytes"] is not None:
+                if used_ram + ram_bytes > budgets["ram_bytes"]:
+                    return False
+            else:
+                free = free_ram_bytes()
+                if free is not None and ram_bytes > free:
+                    return False
+        if vram_bytes:
+            if budgets["vram_bytes"] is not None:
+                if used_vram + vram_bytes > budgets["vram_bytes"]:
+                    return False
+            else:
+                free = free_vram_bytes()
+                if free is not None and vram_bytes > free * _VRAM_SAFETY:
+                    return False
+        return True
+
+    # --- lifecycle ----------------------------------------------------------
+    def make_room(self, *, ram_bytes: int = 0, vram_bytes: int = 0,
+                  exclude: Optional[Hashable] = None) -> list[Hashable]:
+        """Unload LRU models until a load of this size fits. Returns evicted keys.
+
+        Never evicts busy models or ``exclude``; if that still isn't enough the
+        load goes ahead anyway and llama.cpp/accelerate spill as before.
+        """
+        budgets = self.budgets()
+        evicted: list[Hashable] = []
+        with self._lock:
+            while not self._fits(ram_bytes, vram_bytes, budgets):
+                victim = next(
+                    (r for k, r in self._residents.items()
+                     if k != exclude and not r.is_busy()),
+                    None,
+                )
+                if victim is None:
+                    logger.warning(
+                        "residency: cannot make room for ram=%.2fGiB vram=%.2fGiB; "
+                        "all %d resident models busy",
+                        ram_bytes / 2**30, vram_bytes / 2**30, len(self._residents),
+                    )
+                    break
+                self._evict_locked(victim.key, reason="lru")
+                evicted.append(victim.key)
+        return evicted
+
+    def register(self, key: Hashable, *, model_key: str, unload: Callable[[], None],
+                 ram_bytes: int = 0, vram_bytes: int = 0,
+                 busy: Optional[Callable[[], bool]] = None) -> None:
+        with self._lock:
+            self._residents.pop(key, None)
+            self._residents[key] = Resident(
+                key=key, model_key=model_key, ram_bytes=int(ram_bytes or 0),
+                vram_bytes=int(vram_bytes or 0), unload=unload, busy=busy,
+            )
+            self.loads += 1
+        logger.info(
+            "residency: loaded %r ram=%.2fGiB vram=%.2fGiB (resident=%d)",
+            key, (ram_bytes or 0) / 2**30, (vram_bytes or 0) / 2**30, len(self._residents),
+        )
+
+    def touch(self, key: Hashable) -> None:
+        with self._lock:
+            resident = self._residents.get(key)
+            if resident is not None:
+                resident.last_used = time.time()
+                self._residents.move_to_end(key)
+
+    def evict(self, key: Hashable) -> bool:
+        with self._lock:
+            if key not in self._residents:
+                return False
+            self._evict_locked(key, reason="explicit")
+        return True
+
+    def evict_model(self, model_key: str) -> list[Hashable]:
+        """Unload every resident entry (all owners) for one model_key."""
+        with self._lock:
+            keys = [k for k, r in self._residents.items() if r.model_key == model_key]
+            for k in keys:
+                self._evict_locked(k, reason="explicit")
+        return keys
+
+    def forget(self, key: Hashable) -> None:
+        """Drop bookkeeping for something its owner already unloaded."""
+        with self._lock:
+            self._residents.pop(key, None)
+
+    def _evict_locked(self, key: Hashable, *, reason: str) -> None:
+        resident = self._residents.pop(key)
+        try:
+            resident.unload()
+        except Exception:
+            logger.exception("residency: unload of %r failed", key)
+        self.evictions += 1
+        release_device_memory()
+        logger.info(
+            "residency: evicted %r (%s) ram=%.2fGiB vram=%.2fGiB",
+            key, reason, resident.ram_bytes / 2**30, resident.vram_bytes / 2**30,
+        )
+
+    # --- introspection ------------------------------------------------------
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            residents = [r.to_dict() for r in self._residents.values()]
+            ram, vram = self._totals()
+        return {
+            "budgets": self.budgets(),
+            "resident_ram_bytes": ram,
+            "resident_vram_bytes": vram,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "residents": residents,     # LRU first
+        }
+
+
+RESIDENCY = ModelResidency()
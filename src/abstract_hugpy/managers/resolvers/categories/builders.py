@@ -99,7 +99,7 @@ def _build_summarize_request(kwargs: Dict[str, Any], model_key: str) -> "Summari
         "max_chunk_tokens", "min_length", "max_length",
         "do_sample", "min_input_words",
         "consolidation_min_length", "consolidation_max_length",
-        "max_output_words",
+        "max_output_words", "cache",
     ):
         if k in kwargs:
             out[k] = kwargs[k]
@@ -136,6 +136,7 @@ def _build_embed_request(kwargs: Dict[str, Any], model_key: str) -> EmbedRequest
         texts=_texts_from_kwargs(kwargs),
         normalize=kwargs.get("normalize", True),
         batch_size=kwargs.get("batch_size", 32),
+        result_format=kwargs.get("result_format", "json"),
     )
 
 
@@ -167,6 +168,8 @@ def _build_similarity_request(kwargs: Dict[str, Any], model_key: str) -> EmbedRe
         other_texts=other_texts,
         normalize=kwargs.get("normalize", True),
         batch_size=kwargs.get("batch_size", 32),
+        result_format=kwargs.get("result_format", "json"),
+        top_k=kwargs.get("top_k"),
     )
 
 
@@ -82,6 +82,18 @@ except Exception as exc:  # never let placement config break resolution
 # resolve_model_key — picks the model. Default-resolution chain only.
 # Does NOT pick task; that's resolve()'s job.
 # ---------------------------------------------------------------------------
+def _post_frame(base_url, payload, timeout):
+    """POST a binary/npy request to a peer's execute; decode the array frame."""
+    import httpx
+    from abstract_hugpy.imports import ARRAYS_MIMETYPE, EmbedResult, embed_result_from_frame
+
+    r = httpx.post(f"{base_url.rstrip('/')}/api/llm/execute", json=payload, timeout=timeout)
+    r.raise_for_status()
+    if r.headers.get("content-type", "").startswith(ARRAYS_MIMETYPE):
+        return embed_result_from_frame(r.content)
+    return EmbedResult.model_validate(r.json())
+
+
 def make_remote_runner(peer, framework, task):
     local_cls = FRAMEWORK_RUNNERS[(framework, task)]   # borrow result_type
 
@@ -95,6 +107,10 @@ def make_remote_runner(peer, framework, task):
             import asyncio
             from abstract_apis import postRequest
             payload = {"delegated": True, "task": task, **req.model_dump()}
+            if getattr(req, "result_format", "json") in ("binary", "npy"):
+                return await asyncio.to_thread(
+                    _post_frame, peer.base_url, payload, self.cfg.timeout_s or 3600,
+                )
             # postRequest is sync; keep the event loop free
             data = await asyncio.to_thread(
                 postRequest,
@@ -1,4 +1,5 @@
 from .generation import *
 from .media import *
+from .summary_cache import *
 from .summarizers import *
 from .summarize_runner import *
@@ -2,7 +2,7 @@ import asyncio
 import logging
 
 from .imports import *
-from .summarizers import summarize
+from .summarizers import iter_summarize, summarize
 
 logger = logging.getLogger(__name__)
 
@@ -37,25 +37,8 @@ class SummarizeRunner:
 
     async def run(self, req):
         try:
-            input_policy = (
-                InputPolicy(req.input_policy) if req.input_policy else None
-            )
             summary = await asyncio.to_thread(
-                summarize,
-                req.text,
-                backend=self.backend,
-                model_key=self.model_key,
-                preset=req.preset,
-                summary_mode=req.summary_mode,
-                input_policy=input_policy,
-                max_chunk_tokens=req.max_chunk_tokens,
-                min_length=req.min_length,
-                max_length=req.max_length,
-                do_sample=req.do_sample,
-                min_input_words=req.min_input_words,
-                consolidation_min_length=req.consolidation_min_length,
-                consolidation_max_length=req.consolidation_max_length,
-                max_output_words=req.max_output_words,
+                lambda: summarize(req.text, **self._knobs(req))
             )
             return SummarizeResult(
                 request_id=req.request_id,
@@ -79,18 +62,67 @@ class SummarizeRunner:
                 finish_reason="error",
             )
 
+    def _knobs(self, req) -> dict:
+        return dict(
+            backend=self.backend,
+            model_key=self.model_key,
+            preset=req.preset,
+            summary_mode=req.summary_mode,
+            input_policy=InputPolicy(req.input_policy) if req.input_policy else None,
+            max_chunk_tokens=req.max_chunk_tokens,
+            min_length=req.min_length,
+            max_length=req.max_length,
+            do_sample=req.do_sample,
+            min_input_words=req.min_input_words,
+            consolidation_min_length=req.consolidation_min_length,
+            consolidation_max_length=req.consolidation_max_length,
+            max_output_words=req.max_output_words,
+            cache=req.cache,
+        )
+
     async def stream(self, req, cancel_event=None):
-        result = await self.run(req)
-        if getattr(result, "ok", True):
-            yield TokenEvent(request_id=req.request_id, text=result.text or "")
-            yield DoneEvent(
-                request_id=req.request_id,
-                input_tokens=0,
-                output_chunks=1,
-                finish_reason=getattr(result, "finish_reason", None) or "stop",
-            )
-        else:
-            yield ErrorEvent(
-                request_id=req.request_id,
-                message=result.error or "summarization failed",
+        """Incremental summary: a ProgressEvent (with the partial text) per
+        chunk and consolidation part as it finishes, then the final summary
+        as one TokenEvent and a DoneEvent.
+
+        ``cancel_event`` is checked between generate() batches; once set, the
+        worker thread stops, drops its model reference and the stream ends
+        with finish_reason "cancelled".
+        """
+        knobs = self._knobs(req)
+
+        def produce(emit, should_stop):
+            for step in iter_summarize(req.text, should_stop=should_stop, **knobs):
+                if not emit(step):
+                    return
+
+        chunks = 0
+        try:
+            async for step in iter_in_thread(
+                produce, cancel_event=cancel_event, name=f"summarize-{self.model_key}",
+            ):
+                if step.stage == "final":
+                    yield TokenEvent(request_id=req.request_id, text=step.text)
+                    yield DoneEvent(
+                        request_id=req.request_id, input_tokens=0,
+                        output_chunks=max(1, chunks), finish_reason="stop",
+                    )
+                    return
+                if step.stage == "chunk":
+                    chunks += 1
+                yield ProgressEvent(
+                    request_id=req.request_id, stage=step.stage,
+                    index=step.index, total=step.total, text=step.text,
+                )
+        except Exception as exc:
+            logger.exception(
+                "SummarizeRunner.stream failed: model=%s req=%s",
+                self.model_key, req.request_id,
             )
+            yield ErrorEvent(request_id=req.request_id, message=f"{type(exc).__name__}: {exc}")
+            return
+        # Producer ended without a final step: it was told to stop.
+        yield DoneEvent(
+            request_id=req.request_id, input_tokens=0,
+            output_chunks=chunks, finish_reason="cancelled",
+        )
@@ -16,13 +16,26 @@ serve several models.
 
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
+import os
 import re
 import threading
+import time
 import unicodedata
-from typing import Any, Dict, List, Literal, Optional, Protocol, Tuple, runtime_checkable
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any, Callable, Dict, Iterator, List, Literal, Optional, Protocol, Tuple,
+    runtime_checkable,
+)
 
 from .imports import *
+from ..residency import RESIDENCY, dir_footprint, torch_footprint
+from .summary_cache import get_summary_cache, summary_cache_key
+
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
@@ -85,6 +98,30 @@ class SummarizerBackend(Protocol):
     def summarize(self, req: SummaryRequest) -> str: ...
 
 
+@dataclass(frozen=True)
+class SummaryProgress:
+    """One step of an incremental summary.
+
+    stage "chunk" / "consolidate": part ``index`` of ``total`` finished,
+    ``text`` is its partial summary. stage "final": ``text`` is the answer.
+    Backends that can report progress expose
+    ``iter_summary(req, should_stop=None) -> Iterator[SummaryProgress]``;
+    the rest are wrapped so they yield just the final item.
+    """
+    stage: Literal["chunk", "consolidate", "final"]
+    index: int
+    total: int
+    text: str
+
+
+def _final_text(steps: Iterator[SummaryProgress]) -> str:
+    final = ""
+    for step in steps:
+        if step.stage == "final":
+            final = step.text
+    return final
+
+
 # ---------------------------------------------------------------------------
 # Backend registry
 # ---------------------------------------------------------------------------
@@ -154,6 +191,40 @@ def scale_lengths(mode: str, token_count: int) -> Tuple[int, int]:
 MODEL_NAME_CHUNK = "gpt-4"   # used only by recursive_chunk's token counter
 CHUNK_OVERLAP = 30
 
+# Chunks per generate() call in the seq2seq backend. Bigger batches mean
+# fewer forward passes but more padding memory (x num_beams); 1 restores
+# the old one-chunk-at-a-time behaviour.
+DEFAULT_SUMMARY_BATCH_SIZE = 8
+
+
+def summary_batch_size() -> int:
+    raw = os.environ.get("HUGPY_SUMMARY_BATCH_SIZE")
+    try:
+        return max(1, int(raw)) if raw not in (None, "") else DEFAULT_SUMMARY_BATCH_SIZE
+    except ValueError:
+        logger.warning("bad HUGPY_SUMMARY_BATCH_SIZE=%r; using %d", raw, DEFAULT_SUMMARY_BATCH_SIZE)
+        return DEFAULT_SUMMARY_BATCH_SIZE
+
+
+def _load_resident(owner: str, cache: Dict[str, Any], model_key: str, load,
+                   device: Optional[str] = None):
+    """Load into ``cache[model_key]`` under the residency budget.
+
+    Unloading only drops the cache entry; a summarize() already running keeps
+    its own reference, so eviction never pulls weights out from under it.
+    """
+    model_dir = ensure_model(model_key)
+    ram, vram = dir_footprint(model_dir, device)
+    RESIDENCY.make_room(ram_bytes=ram, vram_bytes=vram)
+    value = load(model_dir)
+    cache[model_key] = value
+    ram, vram = torch_footprint(*(value if isinstance(value, tuple) else (value,)))
+    RESIDENCY.register(
+        (owner, model_key), model_key=model_key, ram_bytes=ram, vram_bytes=vram,
+        unload=lambda: cache.pop(model_key, None),
+    )
+    return value
+
 
 # ---------------------------------------------------------------------------
 # Backend: Flan-T5 (text2text-generation pipeline, no chunking)
@@ -173,21 +244,23 @@ class FlanBackend:
     def _pipeline(self):
         cached = self._PIPELINES.get(self.model_key)
         if cached is not None:
+            RESIDENCY.touch(("summarizer.flan", self.model_key))
             return cached
         with self._LOCK:
             cached = self._PIPELINES.get(self.model_key)
             if cached is not None:
                 return cached
-            model_dir = ensure_model(self.model_key)   # was DEFAULT_PATHS["flan"] -> KeyError
-            tokenizer = get_transformers("AutoTokenizer").from_pretrained(model_dir)
-            model = get_transformers("AutoModelForSeq2SeqLM").from_pretrained(model_dir)
-            device = 0 if get_torch().cuda.is_available() else -1
-            pipe = get_transformers("pipeline")(
-                "text2text-generation",        # was "text-generation" — wrong head for T5
-                model=model, tokenizer=tokenizer, device=device,
-            )
-            self._PIPELINES[self.model_key] = pipe
-            return pipe
+
+            def load(model_dir):   # was DEFAULT_PATHS["flan"] -> KeyError
+                tokenizer = get_transformers("AutoTokenizer").from_pretrained(model_dir)
+                model = get_transformers("AutoModelForSeq2SeqLM").from_pretrained(model_dir)
+                device = 0 if get_torch().cuda.is_available() else -1
+                return get_transformers("pipeline")(
+                    "text2text-generation",        # was "text-generation" — wrong head for T5
+                    model=model, tokenizer=tokenizer, device=device,
+                )
+
+            return _load_resident("summarizer.flan", self._PIPELINES, self.model_key, load)
 
     def summarize(self, req: SummaryRequest) -> str:
         prompt = "Summarize the following text in a coherent, concise paragraph:\n\n" + req.text
@@ -204,27 +277,42 @@ class FlanBackend:
 
 @register_backend("seq2seq_chunked")
 class Seq2SeqChunkedBackend:
-    """Chunk → summarize → consolidate."""
+    """Chunk → summarize → consolidate.
+
+    Both passes run through _infer_batch, so an N-chunk document costs about
+    N / HUGPY_SUMMARY_BATCH_SIZE generate() calls per pass. Per-stage wall
+    times of the last summarize() are left on ``self.timings`` and logged.
+    If consolidation fails the merged chunk summaries are returned instead
+    and ``self.degraded`` is set, so that result isn't cached.
+    """
 
     _MODELS: Dict[str, Tuple[Any, Any]] = {}
     _LOCK = threading.Lock()
 
     def __init__(self, model_key: str = "flan-t5-xl"):
         self.model_key = model_key
+        self.timings: Dict[str, float] = {}
+        self.degraded = False
 
     def _load(self) -> Tuple[Any, Any]:
         cached = self._MODELS.get(self.model_key)
         if cached is not None:
+            RESIDENCY.touch(("summarizer.seq2seq", self.model_key))
             return cached
         with self._LOCK:
             cached = self._MODELS.get(self.model_key)
             if cached is not None:
                 return cached
-            model_dir = ensure_model(self.model_key)   # was os.path.join(MODELS_ROOT, entry.folder)
-            tokenizer = get_transformers("AutoTokenizer").from_pretrained(model_dir)
-            model = get_transformers("AutoModelForSeq2SeqLM").from_pretrained(model_dir)
-            self._MODELS[self.model_key] = (tokenizer, model)
-            return tokenizer, model
+
+            def load(model_dir):   # was os.path.join(MODELS_ROOT, entry.folder)
+                tokenizer = get_transformers("AutoTokenizer").from_pretrained(model_dir)
+                model = get_transformers("AutoModelForSeq2SeqLM").from_pretrained(model_dir)
+                return tokenizer, model
+
+            # generate() runs on whatever device from_pretrained picked: CPU.
+            return _load_resident(
+                "summarizer.seq2seq", self._MODELS, self.model_key, load, device="cpu",
+            )
 
     @property
     def _tokenizer(self):
@@ -235,49 +323,302 @@ class Seq2SeqChunkedBackend:
         return self._load()[1]
 
     def _infer(self, text: str, min_len: int, max_len: int) -> str:
+        return self._infer_batch([text], [(min_len, max_len)])[0]
+
+    def _infer_batch(self, texts: List[str], lengths: List[Tuple[int, int]],
+                     timings: Optional[Dict[str, float]] = None) -> List[str]:
+        out: List[str] = [""] * len(texts)
+        for batch in self._iter_infer_batches(texts, lengths, timings):
+            for i, text in batch:
+                out[i] = text
+        return out
+
+    def _iter_infer_batches(self, texts: List[str], lengths: List[Tuple[int, int]],
+                            timings: Optional[Dict[str, float]] = None):
+        """Summarize many texts with as few generate() calls as possible.
+
+        Inputs are tokenized once, sorted by length and cut into batches of
+        up to HUGPY_SUMMARY_BATCH_SIZE, so each batch pads to near its own
+        longest member rather than to the global longest. A batch shares one
+        generate() call, so it uses the smallest min and largest max length
+        among its members. Yields one [(input index, summary), ...] list per
+        batch as it finishes.
+        """
+        if not texts:
+            return
         torch = get_torch()
         tokenizer, model = self._load()
-        inputs = tokenizer(
-            "summarize: " + normalize_text(text),
-            return_tensors="pt", truncation=True, max_length=512,
-        )
-        with torch.no_grad():
-            ids = model.generate(
-                inputs.input_ids,
-                min_length=int(min_len), max_length=int(max_len),
-                num_beams=4, early_stopping=True, no_repeat_ngram_size=3,
-            )
-        return tokenizer.decode(ids[0], skip_special_tokens=True)
+        timings = timings if timings is not None else {}
+
+        t0 = time.perf_counter()
+        encoded = tokenizer(
+            ["summarize: " + normalize_text(t) for t in texts],
+            truncation=True, max_length=512,
+        )["input_ids"]
+        timings["tokenize_s"] = timings.get("tokenize_s", 0.0) + time.perf_counter() - t0
+
+        order = sorted(range(len(texts)), key=lambda i: len(encoded[i]))
+        size = summary_batch_size()
+        for b in range(0, len(order), size):
+            idx = order[b:b + size]
+            t0 = time.perf_counter()
+            batch = tokenizer.pad({"input_ids": [encoded[i] for i in idx]}, return_tensors="pt")
+            with torch.no_grad():
+                ids = model.generate(
+                    batch["input_ids"].to(model.device),
+                    attention_mask=batch["attention_mask"].to(model.device),
+                    min_length=int(min(lengths[i][0] for i in idx)),
+                    max_length=int(max(lengths[i][1] for i in idx)),
+                    num_beams=4, early_stopping=True, no_repeat_ngram_size=3,
+                )
+            timings["generate_s"] = timings.get("generate_s", 0.0) + time.perf_counter() - t0
+            timings["generate_calls"] = timings.get("generate_calls", 0) + 1
+            yield list(zip(idx, tokenizer.batch_decode(ids, skip_special_tokens=True)))
 
     def summarize(self, req: SummaryRequest) -> str:
+        return _final_text(self.iter_summary(req))
+
+    def iter_summary(self, req: SummaryRequest,
+                     should_stop: Optional[Callable[[], bool]] = None) -> Iterator[SummaryProgress]:
+        """summarize(), one step at a time: a "chunk" progress item per chunk
+        summary, a "consolidate" item per consolidation part, then "final".
+
+        ``should_stop`` is polled between generate() batches; when it turns
+        True the generator just ends, without a "final" item.
+        """
+        should_stop = should_stop or (lambda: False)
+        self.degraded = False
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        t0 = time.perf_counter()
         txt = normalize_text(req.text)
         chunks = recursive_chunk(
             text=txt, desired_tokens=req.max_chunk_tokens, model_name=MODEL_NAME_CHUNK,
             separators=["\n\n", "\n", r"(?<=[\.?\!])\s", ", ", " "], overlap=CHUNK_OVERLAP,
         )
-        summaries: List[str] = []
-        for chunk in chunks:
-            cnt = len(self._tokenizer.tokenize(chunk))
-            mn, mx = scale_lengths(req.summary_mode, cnt)
-            summaries.append(clean_output(self._infer(chunk, mn, mx)))
+        tokenizer = self._tokenizer
+        lengths = [scale_lengths(req.summary_mode, len(tokenizer.tokenize(c))) for c in chunks]
+        timings["chunk_s"] = time.perf_counter() - t0
+
+        stage: Dict[str, float] = {}
+        summaries: List[str] = [""] * len(chunks)
+        for batch in self._iter_infer_batches(chunks, lengths, stage):
+            for i, text in batch:
+                summaries[i] = clean_output(text)
+                yield SummaryProgress("chunk", i, len(chunks), summaries[i])
+            if should_stop():
+                return
+        timings["summarize_s"] = stage.get("tokenize_s", 0.0) + stage.get("generate_s", 0.0)
+        timings["summarize_calls"] = stage.get("generate_calls", 0)
         merged = " ".join(summaries)
 
+        stage = {}
         try:
             merged_chunks = recursive_chunk(
                 text=merged, desired_tokens=300, model_name=MODEL_NAME_CHUNK, overlap=20,
             )
-            final_parts = [
-                clean_output(self._infer(c, req.consolidation_min_length, req.consolidation_max_length))
-                for c in merged_chunks
-            ]
+            final_parts: List[str] = [""] * len(merged_chunks)
+            for batch in self._iter_infer_batches(
+                merged_chunks,
+                [(req.consolidation_min_length, req.consolidation_max_length)] * len(merged_chunks),
+                stage,
+            ):
+                for i, text in batch:
+                    final_parts[i] = clean_output(text)
+                    yield SummaryProgress("consolidate", i, len(merged_chunks), final_parts[i])
+                if should_stop():
+                    return
             consolidated = " ".join(final_parts)
         except Exception:
+            logger.warning("seq2seq summary %s: consolidation failed; "
+                           "returning the merged chunk summaries", self.model_key,
+                           exc_info=True)
+            self.degraded = True
             consolidated = merged
+        timings["consolidate_s"] = stage.get("tokenize_s", 0.0) + stage.get("generate_s", 0.0)
+        timings["consolidate_calls"] = stage.get("generate_calls", 0)
 
         words = consolidated.split()
         if len(words) > req.max_output_words:
             consolidated = " ".join(words[: req.max_output_words]) + "..."
-        return consolidated
+
+        timings["chunks"] = len(chunks)
+        timings["total_s"] = time.perf_counter() - started
+        self.timings = timings
+        logger.info(
+            "seq2seq summary %s: %d chunks, %d+%d generate calls, "
+            "chunk %.2fs summarize %.2fs consolidate %.2fs total %.2fs",
+            self.model_key, len(chunks), timings["summarize_calls"],
+            timings["consolidate_calls"], timings["chunk_s"], timings["summarize_s"],
+            timings["consolidate_s"], timings["total_s"],
+        )
+        yield SummaryProgress("final", len(chunks), len(chunks), consolidated)
+
+
+# ---------------------------------------------------------------------------
+# Backend: hierarchical (map-reduce tree over seq2seq_chunked's model)
+# ---------------------------------------------------------------------------
+
+# Summary nodes kept in memory across calls, keyed by content hash.
+DEFAULT_SUMMARY_NODE_CACHE = 4096
+
+
+@register_backend("hierarchical")
+class HierarchicalSummaryBackend(Seq2SeqChunkedBackend):
+    """Chunk → summarize → reduce → reduce … until one window's worth is left.
+
+    Leaves are chunk summaries. Each level packs consecutive summaries into
+    groups that fit the model's input window and summarizes every group;
+    the level above does the same to those, until the joined summaries fit
+    one window, which gets the final consolidation pass. Nothing is
+    truncated away, however long the input.
+
+    All nodes of a level are independent, so they go through one batched
+    generate pass together (_iter_infer_batches) rather than one by one.
+    Every node is cached by sha256(model, lengths, input text): editing a
+    document only recomputes the leaves whose chunk changed and the groups
+    above them. HUGPY_SUMMARY_NODE_CACHE bounds the cache (0 disables).
+    """
+
+    _NODES: "OrderedDict[str, str]" = OrderedDict()
+    _NODES_LOCK = threading.Lock()
+    _NODE_STATS = {"hits": 0, "misses": 0}
+
+    # generate() input cap used by _iter_infer_batches (tighter if the
+    # tokenizer's model_max_length is); the reduce budget leaves room for
+    # the "summarize: " prefix and EOS.
+    _WINDOW_TOKENS = 512
+    _WINDOW_MARGIN = 16
+
+    @staticmethod
+    def _node_capacity() -> int:
+        raw = os.environ.get("HUGPY_SUMMARY_NODE_CACHE")
+        try:
+            return max(0, int(raw)) if raw not in (None, "") else DEFAULT_SUMMARY_NODE_CACHE
+        except ValueError:
+            return DEFAULT_SUMMARY_NODE_CACHE
+
+    @classmethod
+    def node_cache_stats(cls) -> Dict[str, Any]:
+        with cls._NODES_LOCK:
+            return dict(cls._NODE_STATS, nodes=len(cls._NODES), capacity=cls._node_capacity())
+
+    def _node_key(self, text: str, lengths: Tuple[int, int]) -> str:
+        h = hashlib.sha256()
+        h.update(f"{self.model_key}\0{int(lengths[0])}\0{int(lengths[1])}\0".encode("utf-8"))
+        h.update(text.encode("utf-8"))
+        return h.hexdigest()
+
+    def _iter_nodes(self, texts: List[str], lengths: List[Tuple[int, int]],
+                    timings: Dict[str, float]):
+        """(index, cleaned summary) per node: cached ones first, then the
+        misses batch by batch as generate() finishes them."""
+        capacity = self._node_capacity()
+        keys = [self._node_key(t, l) for t, l in zip(texts, lengths)]
+        missing: List[int] = []
+        with self._NODES_LOCK:
+            hits = []
+            for i, key in enumerate(keys):
+                cached = self._NODES.get(key) if capacity else None
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._NODES.move_to_end(key)
+                    hits.append((i, cached))
+            self._NODE_STATS["hits"] += len(hits)
+            self._NODE_STATS["misses"] += len(missing)
+        yield hits
+        for batch in self._iter_infer_batches(
+            [texts[i] for i in missing], [lengths[i] for i in missing], timings,
+        ):
+            done = [(missing[j], clean_output(text)) for j, text in batch]
+            if capacity:
+                with self._NODES_LOCK:
+                    for i, text in done:
+                        self._NODES[keys[i]] = text
+                        self._NODES.move_to_end(keys[i])
+                    while len(self._NODES) > capacity:
+                        self._NODES.popitem(last=False)
+            yield done
+
+    def _group(self, summaries: List[str], budget: int) -> List[str]:
+        """Pack consecutive summaries into inputs of at most ``budget`` tokens."""
+        tokenizer = self._tokenizer
+        groups: List[List[str]] = [[]]
+        used = 0
+        for summary in summaries:
+            n = len(tokenizer.tokenize(summary)) + 1
+            if groups[-1] and used + n > budget:
+                groups.append([])
+                used = 0
+            groups[-1].append(summary)
+            used += n
+        if len(groups) == len(summaries) and len(groups) > 1:
+            # Every summary is a window on its own: pair them so the tree
+            # still gets smaller each level.
+            groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+        return [" ".join(g) for g in groups]
+
+    def iter_summary(self, req: SummaryRequest,
+                     should_stop: Optional[Callable[[], bool]] = None) -> Iterator[SummaryProgress]:
+        should_stop = should_stop or (lambda: False)
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        tokenizer = self._tokenizer
+        window = min(int(getattr(tokenizer, "model_max_length", 0) or self._WINDOW_TOKENS),
+                     self._WINDOW_TOKENS)
+        budget = max(32, window - self._WINDOW_MARGIN)
+
+        chunks = recursive_chunk(
+            text=normalize_text(req.text), desired_tokens=min(req.max_chunk_tokens, budget),
+            model_name=MODEL_NAME_CHUNK,
+            separators=["\n\n", "\n", r"(?<=[\.?\!])\s", ", ", " "], overlap=CHUNK_OVERLAP,
+        )
+        if not chunks:
+            yield SummaryProgress("final", 0, 0, "")
+            return
+        lengths = [scale_lengths(req.summary_mode, len(tokenizer.tokenize(c))) for c in chunks]
+
+        level: List[str] = [""] * len(chunks)
+        for batch in self._iter_nodes(chunks, lengths, timings):
+            for i, text in batch:
+                level[i] = text
+                yield SummaryProgress("chunk", i, len(chunks), text)
+            if should_stop():
+                return
+
+        reduce_len = (req.consolidation_min_length, req.consolidation_max_length)
+        depth = 0
+        while True:
+            groups = self._group(level, budget)
+            depth += 1
+            nxt: List[str] = [""] * len(groups)
+            for batch in self._iter_nodes(groups, [reduce_len] * len(groups), timings):
+                for i, text in batch:
+                    nxt[i] = text
+                    yield SummaryProgress("consolidate", i, len(groups), text)
+                if should_stop():
+                    return
+            level = nxt
+            if len(level) == 1:
+                break
+
+        consolidated = level[0] if level else ""
+        words = consolidated.split()
+        if len(words) > req.max_output_words:
+            consolidated = " ".join(words[: req.max_output_words]) + "..."
+
+        timings["chunks"] = len(chunks)
+        timings["depth"] = depth
+        timings["total_s"] = time.perf_counter() - started
+        self.timings = timings
+        logger.info(
+            "hierarchical summary %s: %d chunks, depth %d, %d generate calls, %.2fs",
+            self.model_key, len(chunks), depth, timings.get("generate_calls", 0),
+            timings["total_s"],
+        )
+        yield SummaryProgress("final", len(chunks), len(chunks), consolidated)
 
 
 # ---------------------------------------------------------------------------
@@ -298,30 +639,42 @@ class PipelineChunkedBackend:
     def _pipeline(self):
         cached = self._PIPELINES.get(self.model_key)
         if cached is not None:
+            RESIDENCY.touch(("summarizer.pipeline", self.model_key))
             return cached
         with self._LOCK:
             cached = self._PIPELINES.get(self.model_key)
             if cached is not None:
                 return cached
-            model_dir = ensure_model(self.model_key)   # was os.path.join(MODELS_ROOT, entry.folder)
-            device = 0 if get_torch().cuda.is_available() else -1
-            pipe = get_transformers("pipeline")(
-                "summarization", model=model_dir, device=device,
-            )
-            self._PIPELINES[self.model_key] = pipe
-            return pipe
+
+            def load(model_dir):   # was os.path.join(MODELS_ROOT, entry.folder)
+                device = 0 if get_torch().cuda.is_available() else -1
+                return get_transformers("pipeline")(
+                    "summarization", model=model_dir, device=device,
+                )
+
+            return _load_resident("summarizer.pipeline", self._PIPELINES, self.model_key, load)
 
     def summarize(self, req: SummaryRequest) -> str:
+        return _final_text(self.iter_summary(req))
+
+    def iter_summary(self, req: SummaryRequest,
+                     should_stop: Optional[Callable[[], bool]] = None) -> Iterator[SummaryProgress]:
+        """One "chunk" item per sentence-group summary, then "final"."""
+        should_stop = should_stop or (lambda: False)
         if not req.text:
-            return ""
+            yield SummaryProgress("final", 0, 0, "")
+            return
         chunks = split_sentences(req.text, max_words=300)
         parts: List[str] = []
-        for chunk in chunks:
+        for i, chunk in enumerate(chunks):
             out = self._pipeline(
                 chunk, max_length=req.max_length, min_length=req.min_length, truncation=True,
             )
             parts.append(out[0]["summary_text"].strip())
-        return " ".join(parts).strip()
+            yield SummaryProgress("chunk", i, len(chunks), parts[-1])
+            if should_stop():
+                return
+        yield SummaryProgress("final", len(chunks), len(chunks), " ".join(parts).strip())
 
 
 # ---------------------------------------------------------------------------
@@ -344,27 +697,72 @@ def get_backend(key: str, model_key: Optional[str] = None) -> SummarizerBackend:
     return cls(model_key) if model_key is not None else cls()
 
 
-def _dispatch(backend: str, model_key: Optional[str], req: SummaryRequest) -> str:
-    """Apply input_policy, then run the backend."""
+def _cache_lookup(be, backend: str, req: SummaryRequest, cache: bool):
+    """(cache, key, cached summary or None). cache is None when bypassed."""
+    store = get_summary_cache() if cache else None
+    if store is None:
+        return None, None, None
+    key = summary_cache_key(backend, getattr(be, "model_key", None), req,
+                            normalize_text(req.text))
+    return store, key, store.get(key)
+
+
+def _dispatch(backend: str, model_key: Optional[str], req: SummaryRequest,
+              cache: bool = True) -> str:
+    """Apply input_policy, then run the backend (or answer from the cache)."""
     be = get_backend(backend, model_key)
 
+    warning = ""
     problem = req.check_input()
     if problem is not None:
         if req.input_policy is InputPolicy.STRICT:
             raise ValueError(problem)
         if req.input_policy is InputPolicy.WARN:
-            return f"[WARNING: {problem}] {be.summarize(req)}"
+            warning = f"[WARNING: {problem}] "
         # InputPolicy.ALLOW — run it, no questions asked.
 
-    return be.summarize(req)
+    store, key, summary = _cache_lookup(be, backend, req, cache)
+    if summary is None:
+        summary = be.summarize(req)
+        if store is not None and not getattr(be, "degraded", False):
+            store.put(key, summary)
+    return warning + summary
 
 
-def summarize(
-    text: str = None,
-    backend: str = "seq2seq_chunked",
-    *,
-    model_key: Optional[str] = None,
-    request: Optional[SummaryRequest] = None,
+def _iter_dispatch(backend: str, model_key: Optional[str], req: SummaryRequest,
+                   should_stop: Optional[Callable[[], bool]] = None,
+                   cache: bool = True) -> Iterator[SummaryProgress]:
+    """_dispatch, incrementally. Backends without iter_summary yield one "final"."""
+    be = get_backend(backend, model_key)
+
+    warning = ""
+    problem = req.check_input()
+    if problem is not None:
+        if req.input_policy is InputPolicy.STRICT:
+            raise ValueError(problem)
+        if req.input_policy is InputPolicy.WARN:
+            warning = f"[WARNING: {problem}] "
+
+    store, key, summary = _cache_lookup(be, backend, req, cache)
+    if summary is not None:
+        yield SummaryProgress("final", 0, 0, warning + summary)
+        return
+
+    steps = (
+        be.iter_summary(req, should_stop=should_stop) if hasattr(be, "iter_summary")
+        else iter([SummaryProgress("final", 1, 1, be.summarize(req))])
+    )
+    for step in steps:
+        if step.stage == "final":
+            # A degraded fallback isn't what a healthy backend would say.
+            if store is not None and not getattr(be, "degraded", False):
+                store.put(key, step.text)
+            step = SummaryProgress("final", step.index, step.total, warning + step.text)
+        yield step
+
+
+def _build_request(
+    text: str,
     preset: Optional[str] = None,
     max_chunk_tokens: Optional[int] = None,
     min_length: Optional[int] = None,
@@ -376,31 +774,11 @@ def summarize(
     consolidation_min_length: Optional[int] = None,
     consolidation_max_length: Optional[int] = None,
     max_output_words: Optional[int] = None,
-) -> str:
-    """One call, any back-end, optional preset.
-
-    Two entry points:
-        1. Traditional: summarize(text, backend="seq2seq_chunked", preset="article", ...)
-        2. From request: summarize(request=SummaryRequest(...))
-
-    Resolution order (highest wins):
-        1. Explicit kwarg passed by the caller
-        2. Preset value (if a preset is named)
-        3. SummaryRequest field default
-    """
+) -> SummaryRequest:
+    """Resolve kwargs > preset > SummaryRequest defaults into one request."""
     if isinstance(input_policy, str):
         input_policy = InputPolicy(input_policy)
 
-    # -- entry point 1: SummaryRequest directly ----------------------------
-    if request is not None:
-        if text is not None:
-            raise ValueError("Cannot pass both `text` and `request`")
-        return _dispatch(backend, model_key, request)
-
-    # -- entry point 2: traditional kwargs ---------------------------------
-    if text is None:
-        raise ValueError("Must pass either `text` or `request`")
-
     p = get_preset(preset) if preset else SummaryPreset()
 
     def _resolve(explicit, from_preset, schema_default):
@@ -412,7 +790,7 @@ def summarize(
 
     _d = {f.name: f.default for f in SummaryRequest.__dataclass_fields__.values()}
 
-    req = SummaryRequest(
+    return SummaryRequest(
         text=text,
         max_chunk_tokens=_resolve(max_chunk_tokens, p.max_chunk_tokens, _d["max_chunk_tokens"]),
         min_length=_resolve(min_length, p.min_length, _d["min_length"]),
@@ -429,7 +807,82 @@ def summarize(
         ),
         max_output_words=_resolve(max_output_words, p.max_output_words, _d["max_output_words"]),
     )
-    return _dispatch(backend, model_key, req)
+
+
+def summarize(
+    text: str = None,
+    backend: str = "seq2seq_chunked",
+    *,
+    model_key: Optional[str] = None,
+    request: Optional[SummaryRequest] = None,
+    preset: Optional[str] = None,
+    max_chunk_tokens: Optional[int] = None,
+    min_length: Optional[int] = None,
+    max_length: Optional[int] = None,
+    do_sample: Optional[bool] = None,
+    summary_mode: Optional[Literal["short", "medium", "long", "auto"]] = None,
+    input_policy: Optional[InputPolicy] = None,
+    min_input_words: Optional[int] = None,
+    consolidation_min_length: Optional[int] = None,
+    consolidation_max_length: Optional[int] = None,
+    max_output_words: Optional[int] = None,
+    cache: bool = True,
+) -> str:
+    """One call, any back-end, optional preset.
+
+    Two entry points:
+        1. Traditional: summarize(text, backend="seq2seq_chunked", preset="article", ...)
+        2. From request: summarize(request=SummaryRequest(...))
+
+    Resolution order (highest wins):
+        1. Explicit kwarg passed by the caller
+        2. Preset value (if a preset is named)
+        3. SummaryRequest field default
+
+    Results are cached (see summary_cache.py); ``cache=False`` bypasses it.
+    """
+    # -- entry point 1: SummaryRequest directly ----------------------------
+    if request is not None:
+        if text is not None:
+            raise ValueError("Cannot pass both `text` and `request`")
+        return _dispatch(backend, model_key, request, cache)
+
+    # -- entry point 2: traditional kwargs ---------------------------------
+    if text is None:
+        raise ValueError("Must pass either `text` or `request`")
+
+    req = _build_request(
+        text, preset, max_chunk_tokens, min_length, max_length, do_sample,
+        summary_mode, input_policy, min_input_words, consolidation_min_length,
+        consolidation_max_length, max_output_words,
+    )
+    return _dispatch(backend, model_key, req, cache)
+
+
+def iter_summarize(
+    text: str = None,
+    backend: str = "seq2seq_chunked",
+    *,
+    model_key: Optional[str] = None,
+    request: Optional[SummaryRequest] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    cache: bool = True,
+    **knobs,
+) -> Iterator[SummaryProgress]:
+    """summarize(), yielding SummaryProgress items as the backend works.
+
+    Same arguments as summarize() (the knobs go through the same preset
+    resolution), plus ``should_stop``, polled between chunks. The last item
+    is stage "final" unless the run was stopped; a cache hit is just that.
+    """
+    if request is not None:
+        if text is not None:
+            raise ValueError("Cannot pass both `text` and `request`")
+    elif text is None:
+        raise ValueError("Must pass either `text` or `request`")
+    else:
+        request = _build_request(text, **knobs)
+    return _iter_dispatch(backend, model_key, request, should_stop, cache)
 
 
 # Back-compat alias — older callers imported summarize_t5.
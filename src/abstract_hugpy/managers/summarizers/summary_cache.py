@@ -0,0 +1,264 @@
+"""Summary result cache.
+
+Report regeneration (utils/seo/pdf_utils._analyze, utils/text/combined)
+summarizes the same page texts again and again. Summaries are a pure
+function of (backend, model_key, the resolved SummaryRequest knobs, text),
+so they're cached under
+
+    sha256(backend | model_key | knobs as JSON | sha256(normalized text))
+
+in two tiers:
+
+    memory   OrderedDict LRU, HUGPY_SUMMARY_CACHE_ITEMS entries (default 1024)
+    disk     sqlite at <SUMMARY_CACHE_DIR>/summaries.sqlite, capped at
+             HUGPY_SUMMARY_CACHE_MB (default 256; 0 = memory only); least
+             recently read rows go first when it's over
+
+Entries older than HUGPY_SUMMARY_CACHE_TTL_S (default 30 days; 0 = never)
+are treated as misses and dropped. HUGPY_SUMMARY_CACHE=0 turns the whole
+thing off; per call, summarize(..., cache=False) / SummarizeRequest.cache
+bypasses it (nothing read, nothing written).
+
+Anything with get(key) / put(key, summary) / stats() can replace the
+default through set_summary_cache(); set_summary_cache(None) disables it.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol, runtime_checkable
+
+from .imports import SUMMARY_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUMMARY_CACHE_ITEMS = 1024
+DEFAULT_SUMMARY_CACHE_MB = 256
+DEFAULT_SUMMARY_CACHE_TTL_S = 30 * 24 * 3600
+
+
+def _env_number(name: str, default, cast):
+    raw = os.environ.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        logger.warning("bad %s=%r; using %s", name, raw, default)
+        return default
+
+
+def summary_cache_key(backend: str, model_key: Optional[str], req, normalized_text: str) -> str:
+    """Cache key for one summarize() call; ``req`` is the resolved SummaryRequest."""
+    knobs = {k: v for k, v in dataclasses.asdict(req).items() if k != "text"}
+    text_hash = hashlib.sha256(normalized_text.encode("utf-8")).hexdigest()
+    blob = json.dumps([backend, model_key, knobs, text_hash], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+@runtime_checkable
+class SummaryCacheBackend(Protocol):
+    def get(self, key: str) -> Optional[str]: ...
+    def put(self, key: str, summary: str) -> None: ...
+    def stats(self) -> Dict[str, Any]: ...
+
+
+class SummaryCache:
+    """In-memory LRU in front of a size-capped sqlite table."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        max_items: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+    ):
+        self.max_items = max(0, max_items if max_items is not None else _env_number(
+            "HUGPY_SUMMARY_CACHE_ITEMS", DEFAULT_SUMMARY_CACHE_ITEMS, int))
+        self.max_bytes = max(0, max_bytes if max_bytes is not None else int(_env_number(
+            "HUGPY_SUMMARY_CACHE_MB", DEFAULT_SUMMARY_CACHE_MB, float) * 2**20))
+        self.ttl_s = max(0.0, ttl_s if ttl_s is not None else _env_number(
+            "HUGPY_SUMMARY_CACHE_TTL_S", DEFAULT_SUMMARY_CACHE_TTL_S, float))
+        self.path = path or os.path.join(SUMMARY_CACHE_DIR, "summaries.sqlite")
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                       "stores": 0, "expired": 0, "disk_evictions": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_failed = False
+
+    # --- disk tier ----------------------------------------------------------
+
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        """Open lazily; a cache that can't reach its disk runs memory-only."""
+        if self._db is not None or self._disk_failed or self.max_bytes <= 0:
+            return self._db
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                " key TEXT PRIMARY KEY, summary TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS summaries_accessed ON summaries(accessed)")
+            db.commit()
+            self._db = db
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning("summary cache: disk tier disabled (%s: %s)",
+                           type(exc).__name__, exc)
+            self._disk_failed = True
+        return self._db
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_s > 0 and now - created > self.ttl_s
+
+    def _trim_disk(self, db: sqlite3.Connection) -> None:
+        (total,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()
+        if total <= self.max_bytes:
+            return
+        # Drop least-recently-read rows until we're ~10% under the cap, so
+        # trimming doesn't run on every single put once the table is full.
+        target = total - int(self.max_bytes * 0.9)
+        freed = evicted = 0
+        for key, size in db.execute("SELECT key, size FROM summaries ORDER BY accessed").fetchall():
+            if freed >= target:
+                break
+            db.execute("DELETE FROM summaries WHERE key = ?", (key,))
+            freed += size
+            evicted += 1
+        self._stats["disk_evictions"] += evicted
+
+    # --- API ----------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                created, summary = hit
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return summary
+                del self._memory[key]
+                self._stats["expired"] += 1
+
+            db = self._conn()
+            if db is not None:
+                try:
+                    row = db.execute(
+                        "SELECT summary, created FROM summaries WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None and self._expired(row[1], now):
+                        db.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                        db.commit()
+                        self._stats["expired"] += 1
+                        row = None
+                    if row is not None:
+                        db.execute("UPDATE summaries SET accessed = ? WHERE key = ?", (now, key))
+                        db.commit()
+                        self._remember(key, row[1], row[0])
+                        self._stats["disk_hits"] += 1
+                        return row[0]
+                except sqlite3.Error as exc:
+                    logger.warning("summary cache read failed: %s", exc)
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, summary: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, summary)
+            self._stats["stores"] += 1
+            db = self._conn()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO summaries (key, summary, created, accessed, size)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, summary, now, now, len(summary.encode("utf-8")) + len(key)),
+                )
+                self._trim_disk(db)
+                db.commit()
+            except sqlite3.Error as exc:
+                logger.warning("summary cache write failed: %s", exc)
+
+    def _remember(self, key: str, created: float, summary: str) -> None:
+        if self.max_items <= 0:
+            return
+        self._memory[key] = (created, summary)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            db = self._conn()
+            if db is not None:
+                db.execute("DELETE FROM summaries")
+                db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            s["memory_items"] = len(self._memory)
+            db = self._db
+            if db is not None:
+                try:
+                    s["disk_items"], s["disk_bytes"] = db.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries"
+                    ).fetchone()
+                except sqlite3.Error:
+                    pass
+        s.update(path=self.path if self.max_bytes > 0 else None,
+                 max_items=self.max_items, max_bytes=self.max_bytes, ttl_s=self.ttl_s)
+        hits = s["memory_hits"] + s["disk_hits"]
+        lookups = hits + s["misses"]
+        s["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return s
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+
+_UNSET = object()
+_CACHE: Any = _UNSET
+_CACHE_LOCK = threading.Lock()
+
+
+def get_summary_cache() -> Optional[SummaryCacheBackend]:
+    """The active cache, built on first use; None when disabled."""
+    global _CACHE
+    if _CACHE is _UNSET:
+        with _CACHE_LOCK:
+            if _CACHE is _UNSET:
+                enabled = (os.environ.get("HUGPY_SUMMARY_CACHE") or "1").strip().lower()
+                _CACHE = None if enabled in ("0", "false", "no", "off") else SummaryCache()
+    return _CACHE
+
+
+def set_summary_cache(cache: Optional[SummaryCacheBackend]) -> None:
+    """Swap the process-wide cache (None disables caching)."""
+    global _CACHE
+    with _CACHE_LOCK:
+        _CACHE = cache
+
+
+def summary_cache_stats() -> Optional[Dict[str, Any]]:
+    cache = _CACHE if _CACHE is not _UNSET else None
+    return cache.stats() if cache is not None else None
@@ -1,7 +1,14 @@
+import asyncio
+import json
+import logging
+import os
+
 from .imports import *
 from ..vision.schemas import VisionRequest
 from ..vision.vision_runner import VisionRunner
 
+logger = logging.getLogger(__name__)
+
 def _resolve_manifest_path(source: Union[str, Any]) -> str:
     if isinstance(source, str):
         return source
@@ -22,11 +29,181 @@ def _build_prompt(user_prompt: str, frame_context: dict) -> str:
     )
 
 
+async def _run_batch(runner: VisionRunner, reqs: list[VisionRequest],
+                     config: VideoAnalysisConfig) -> list[tuple[Optional[str], Optional[str]]]:
+    """(text, error) per request. A failed batch is retried one frame at a
+    time so a single bad frame doesn't take its batch-mates down with it."""
+    try:
+        results = await runner.run_batch(reqs, batch_size=config.batch_size)
+        return [(r.text, r.error) for r in results]
+    except Exception as e:
+        if config.raise_on_frame_error and len(reqs) == 1:
+            raise
+        if len(reqs) == 1:
+            return [(None, f"{type(e).__name__}: {e}")]
+    out = []
+    for req in reqs:
+        try:
+            r = await runner.run(req)
+            out.append((r.text, r.error))
+        except Exception as e:
+            if config.raise_on_frame_error:
+                raise
+            out.append((None, f"{type(e).__name__}: {e}"))
+    return out
+
+
+async def _analyze_pending(pending, runner, config, model_key, finish) -> None:
+    t0 = time.time()
+    outcomes = await _run_batch(runner, [req for _, req in pending], config)
+    # Frames in one generate() finish together; each gets its share.
+    duration = (time.time() - t0) / len(pending)
+
+    done = []
+    for (ctx, req), (text, err) in zip(pending, outcomes):
+        ctx.update({
+            "analysis_prompt": req.prompt,
+            "analysis": text,
+            "model_key": model_key,
+            "analysis_duration": duration,
+            "error": err,
+        })
+
+        # Validate-on-write: schema drift fails fast, not three days from now
+        FrameAnalysis.model_validate(ctx)
+        done.append(ctx)
+    finish(done)
+
+
+class _CheckpointLog:
+    """Append-only JSONL of finished frame records.
+
+    Each record is one line, written as soon as its frame is done, so a
+    checkpoint costs O(1) no matter how far into the video we are. Resume
+    replays the log once; the last error-free line per frame_path wins.
+    """
+
+    def __init__(self, path: str, fsync_every: int):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self._fh = None
+        self._since_sync = 0
+
+    def load(self) -> dict[str, dict]:
+        done: dict[str, dict] = {}
+        if not osp.isfile(self.path):
+            return done
+        with open(self.path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue      # torn last line from a crash mid-write
+                fp = entry.get("frame_path") if isinstance(entry, dict) else None
+                if fp and entry.get("error") is None:
+                    done[fp] = entry
+        return done
+
+    def open(self, truncate: bool) -> None:
+        self._fh = open(self.path, "w" if truncate else "a", encoding="utf-8")
+
+    def append(self, records: list[dict]) -> None:
+        for record in records:
+            self._fh.write(json.dumps(record, default=str) + "\n")
+        self._fh.flush()
+        self._since_sync += len(records)
+        if self._since_sync >= self.fsync_every:
+            os.fsync(self._fh.fileno())
+            self._since_sync = 0
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+
+
+def _duplicate_map(frame_contexts: list, threshold: Optional[int]) -> dict[int, int]:
+    """frame index -> index of the representative it duplicates.
+
+    Uses the "dhash" extract_context_frames_from_whisper stored, hashing the
+    frame here only when it's missing. Representatives, frames that can't
+    be hashed and everything when ``threshold`` is None are left out.
+    """
+    if threshold is None:
+        return {}
+    hashes: list[Optional[int]] = []
+    for ctx in frame_contexts:
+        h = None
+        if isinstance(ctx, dict):
+            h = parse_dhash(ctx.get("dhash"))
+            frame_path = ctx.get("frame_path")
+            if h is None and frame_path and osp.isfile(frame_path):
+                try:
+                    h = frame_dhash(frame_path)
+                except Exception:
+                    h = None
+        hashes.append(h)
+    rep_of = cluster_near_duplicates(hashes, threshold)
+    return {i: rep for i, rep in enumerate(rep_of) if rep != i}
+
+
+def _fan_out(i: int, raw_ctx: dict, source: Optional[dict], rep: int,
+             total_frames: int, total_video_length, model_key: str) -> dict:
+    """Duplicate frame ``i``'s record, carrying its representative's analysis."""
+    ctx = copy.deepcopy(raw_ctx)
+    ctx.update({
+        "frame_index": i,
+        "total_frames": total_frames,
+        "total_video_length": total_video_length,
+        "duplicate_of": rep,
+        "model_key": model_key,
+        "analysis_duration": 0.0,
+    })
+    if source is None:
+        ctx.update({"analysis_prompt": "", "analysis": None,
+                    "error": f"representative frame {rep} has no record"})
+    else:
+        ctx.update({
+            "analysis_prompt": source.get("analysis_prompt") or "",
+            "analysis": source.get("analysis"),
+            "error": source.get("error"),
+        })
+    FrameAnalysis.model_validate(ctx)
+    return ctx
+
+
+def _concurrency(runner: VisionRunner, config: VideoAnalysisConfig) -> int:
+    if config.concurrency is not None:
+        return config.concurrency
+    # HTTP servers take overlapping requests; in-process, overlapping
+    # generate() calls just fight over the same GPU, so batch instead.
+    return getattr(runner.backend, "concurrency_hint", 1)
+
+
 async def analyze_video(
     source: Union[str, Any],
     runner: VisionRunner,
     config: VideoAnalysisConfig,
 ) -> VideoAnalysisSummary:
+    """Analyze every frame in the manifest's frame_context.
+
+    Three stages joined by a bounded queue:
+
+        prefetch   reads + base64-encodes frames (off the event loop), up
+                   to config.prefetch frames ahead of the workers
+        workers    config.concurrency tasks, each taking up to
+                   config.batch_size queued frames per runner.run_batch
+        checkpoint every finished frame is appended to analysis.jsonl
+
+    Near-duplicate frames (dHash within config.dedup_threshold bits of an
+    earlier frame) skip the vision stage; once their representative is
+    done they get a copy of its analysis plus "duplicate_of".
+
+    analysis.json (the full record list, in frame order) is written once
+    at the end; resume reads the JSONL log instead of it.
+    """
     manifest_path = require_file(_resolve_manifest_path(source), "manifest_path")
     manifest_data = safe_load_from_json(manifest_path)
     if not isinstance(manifest_data, dict):
@@ -51,81 +228,130 @@ async def analyze_video(
     total_video_length = last.get("timestamp") if isinstance(last, dict) else None
 
     analysis_json_path = osp.join(workspace_dir, "analysis.json")
+    analysis_log_path = osp.join(workspace_dir, "analysis.jsonl")
     manifest_data.setdefault("files", {})["analysis_json"] = analysis_json_path
+    manifest_data["files"]["analysis_log"] = analysis_log_path
     safe_dump_to_file(data=manifest_data, file_path=manifest_path)
 
-    # Resume keyed by frame_path so reruns are idempotent.
+    # Resume keyed by frame_path so reruns are idempotent. Runs from before
+    # the log existed only have analysis.json; read that as a fallback.
+    log = _CheckpointLog(analysis_log_path, fsync_every=config.save_every)
     done_by_frame: dict[str, dict] = {}
-    if config.resume and osp.isfile(analysis_json_path):
-        prior = safe_load_from_json(analysis_json_path) or []
-        for entry in prior:
-            fp = entry.get("frame_path")
-            if fp and entry.get("error") is None:
-                done_by_frame[fp] = entry
+    carried_over: list[dict] = []       # fallback records the log doesn't have yet
+    if config.resume:
+        done_by_frame = log.load()
+        if not done_by_frame and osp.isfile(analysis_json_path):
+            for entry in safe_load_from_json(analysis_json_path) or []:
+                fp = entry.get("frame_path") if isinstance(entry, dict) else None
+                if fp and entry.get("error") is None:
+                    done_by_frame[fp] = entry
+            carried_over = list(done_by_frame.values())
 
     records: list[dict] = list(done_by_frame.values())
     model_key = runner.cfg.model_key  # runner is the source of truth
+    workers = _concurrency(runner, config)
+    duplicates = await asyncio.to_thread(
+        _duplicate_map, frame_contexts, config.dedup_threshold)
+    if duplicates:
+        logger.info("analyze_video: %d of %d frames are near-duplicates",
+                    len(duplicates), total_frames)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(config.prefetch, config.batch_size))
 
-    for i, raw_ctx in enumerate(frame_contexts):
-        if not isinstance(raw_ctx, dict):
-            records.append({
-                "frame_index": i,
-                "error": f"frame_context[{i}] is not a dict",
-            })
-            continue
+    def finish(new: list[dict]) -> None:
+        records.extend(new)
+        log.append(new)
 
-        ctx = copy.deepcopy(raw_ctx)  # never mutate caller's data
-        frame_path = ctx.get("frame_path")
+    async def prefetch() -> None:
+        for i, raw_ctx in enumerate(frame_contexts):
+            if not isinstance(raw_ctx, dict):
+                finish([{
+                    "frame_index": i,
+                    "error": f"frame_context[{i}] is not a dict",
+                }])
+                continue
 
-        if not frame_path or not osp.isfile(frame_path):
-            err = f"frame_path missing or not found: {frame_path!r}"
-            if config.raise_on_frame_error:
-                raise FileNotFoundError(err)
-            ctx.update({"frame_index": i, "error": err})
-            records.append(ctx)
-            continue
-
-        if frame_path in done_by_frame:
-            continue
-
-        ctx["frame_index"] = i
-        ctx["total_frames"] = total_frames
-        ctx["total_video_length"] = total_video_length
-        rendered_prompt = _build_prompt(config.prompt, ctx)
-        image_b64 = get_base_64_image(frame_path)
-        req = VisionRequest(
-            request_id=f"frame-{i}-{uuid.uuid4().hex[:8]}",
-            model_key=model_key,
-            prompt=rendered_prompt,
-            max_new_tokens=config.max_new_tokens,
-            max_tokens=config.max_tokens,
-            image_b64=image_b64,
-        )
+            ctx = copy.deepcopy(raw_ctx)  # never mutate caller's data
+            frame_path = ctx.get("frame_path")
 
-        t0 = time.time()
-        try:
-            vresult = await runner.run(req)
-            text, err = vresult.text, vresult.error
-        except Exception as e:
-            if config.raise_on_frame_error:
-                raise
-            text, err = None, f"{type(e).__name__}: {e}"
-        duration = time.time() - t0
+            if not frame_path or not osp.isfile(frame_path):
+                err = f"frame_path missing or not found: {frame_path!r}"
+                if config.raise_on_frame_error:
+                    raise FileNotFoundError(err)
+                ctx.update({"frame_index": i, "error": err})
+                finish([ctx])
+                continue
 
-        ctx.update({
-            "analysis_prompt": rendered_prompt,
-            "analysis": text,
-            "model_key": model_key,
-            "analysis_duration": duration,
-            "error": err,
-        })
+            if frame_path in done_by_frame or i in duplicates:
+                continue
 
-        # Validate-on-write: schema drift fails fast, not three days from now
-        FrameAnalysis.model_validate(ctx)
-        records.append(ctx)
+            ctx["frame_index"] = i
+            ctx["total_frames"] = total_frames
+            ctx["total_video_length"] = total_video_length
+            rendered_prompt = _build_prompt(config.prompt, ctx)
+            image_b64 = await asyncio.to_thread(get_base_64_image, frame_path)
+            req = VisionRequest(
+                request_id=f"frame-{i}-{uuid.uuid4().hex[:8]}",
+                model_key=model_key,
+                prompt=rendered_prompt,
+                max_new_tokens=config.max_new_tokens,
+                max_tokens=config.max_tokens,
+                image_b64=image_b64,
+            )
+            await queue.put((ctx, req))
+
+        # Only on a clean finish: if prefetch raised, gather cancels the
+        # workers and nobody is left to take these off a full queue.
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def worker() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            # Take whatever else is already prefetched, up to a batch; never
+            # wait for a batch to fill.
+            pending = [item]
+            stop = False
+            while len(pending) < config.batch_size and not queue.empty():
+                nxt = queue.get_nowait()
+                if nxt is None:
+                    stop = True
+                    break
+                pending.append(nxt)
+            await _analyze_pending(pending, runner, config, model_key, finish)
+            if stop:
+                return
+
+    log.open(truncate=not config.resume)
+    if carried_over:
+        # Otherwise a crash in this run leaves a non-empty log without them,
+        # and the next resume (which then skips analysis.json) redoes them.
+        log.append(carried_over)
+    tasks = [asyncio.ensure_future(prefetch())]
+    tasks += [asyncio.ensure_future(worker()) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+
+        by_index = {r.get("frame_index"): r for r in records}
+        fanned = [
+            _fan_out(i, frame_contexts[i], by_index.get(rep), rep,
+                     total_frames, total_video_length, model_key)
+            for i, rep in sorted(duplicates.items())
+            if frame_contexts[i].get("frame_path") not in done_by_frame
+        ]
+        if fanned:
+            finish(fanned)
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        log.close()
 
-        if (i + 1) % config.save_every == 0 or (i + 1) == total_frames:
-            safe_dump_to_file(data=records, file_path=analysis_json_path)
+    records.sort(key=lambda r: r.get("frame_index", -1))
+    safe_dump_to_file(data=records, file_path=analysis_json_path)
 
     succeeded = sum(1 for r in records if r.get("error") is None)
     failed = sum(1 for r in records if r.get("error") is not None)
@@ -136,4 +362,5 @@ async def analyze_video(
         frames_total=total_frames,
         frames_succeeded=succeeded,
         frames_failed=failed,
+        frames_deduplicated=len(duplicates),
     )
@@ -1,34 +1,85 @@
 import asyncio
-from typing import Protocol, Callable
+from typing import Protocol, Callable, List, Sequence
 from .schemas import VisionRequest, VisionResult, VisionBackendConfig
-from .vision_coder import get_vision_coder
+from .vision_coder import (
+    _coerce_image_path,
+    get_vision_coder,
+    lease_vision_coder,
+    open_image_from_request,
+    vision_batch_size,
+)
 from .imports import VISION_HOST
 
 class VisionBackend(Protocol):
     async def run(self, req: VisionRequest) -> VisionResult: ...
+    async def run_batch(self, reqs: Sequence[VisionRequest]) -> List[VisionResult]: ...
+
+
+def _open_request_image(req: VisionRequest):
+    if req.image_path is not None:
+        req = req.model_copy(update={"image_path": _coerce_image_path(req.image_path)})
+    return open_image_from_request(req)
 
 
 class InProcessBackend:
+    # One GPU: overlapping generate() calls contend, batching doesn't.
+    concurrency_hint = 1
+
     def __init__(self, model_key: str):
         self.model_key = model_key
-        self.vision = get_vision_coder(model_key=model_key)
+        get_vision_coder(model_key=model_key)      # load eagerly, as before
+
+    def vision(self):
+        # Leased per call rather than pinned: a held reference would keep
+        # the weights alive after residency evicts them from _INSTANCES,
+        # and the lease keeps residency from closing them mid-batch.
+        return lease_vision_coder(model_key=self.model_key)
 
     async def run(self, req: VisionRequest) -> VisionResult:
-        text = await asyncio.to_thread(
-            self.vision.analyze_image,
-            image_path=req.image_path,
-            prompt=req.prompt,
-            max_new_tokens=req.max_new_tokens,
-            max_tokens=req.max_tokens,
-        )
-        return VisionResult(
-            request_id=req.request_id,
-            model_key=req.model_key,
-            text=text,
-        )
+        return (await self.run_batch([req]))[0]
+
+    async def run_batch(
+        self,
+        reqs: Sequence[VisionRequest],
+        batch_size: int | None = None,
+    ) -> List[VisionResult]:
+        """Run ``reqs`` through VisionCoder.analyze_batch.
+
+        Requests are grouped by (max_new_tokens, max_tokens) since those are
+        per-generate settings; within a group the coder batches by image
+        grid. Image decode happens in the worker thread too, so b64 and path
+        requests both stay off the event loop.
+        """
+        reqs = list(reqs)
+        groups: dict[tuple, list[int]] = {}
+        for i, req in enumerate(reqs):
+            groups.setdefault((req.max_new_tokens, req.max_tokens), []).append(i)
+
+        def _run_group(idx: list[int], max_new_tokens: int, max_tokens) -> list[str]:
+            with self.vision() as coder:
+                return coder.analyze_batch(
+                    [_open_request_image(reqs[i]) for i in idx],
+                    [reqs[i].prompt for i in idx],
+                    max_new_tokens=max_new_tokens,
+                    max_tokens=max_tokens,
+                    batch_size=batch_size or vision_batch_size(),
+                )
+
+        texts: list[str] = [""] * len(reqs)
+        for (max_new_tokens, max_tokens), idx in groups.items():
+            out = await asyncio.to_thread(_run_group, idx, max_new_tokens, max_tokens)
+            for i, text in zip(idx, out):
+                texts[i] = text
+
+        return [
+            VisionResult(request_id=req.request_id, model_key=req.model_key, text=text)
+            for req, text in zip(reqs, texts)
+        ]
 
 
 class HttpBackend:
+    concurrency_hint = 4
+
     def __init__(self, model_key: str, host: str, port: int, timeout_s: float):
         import aiohttp  # local import so inprocess users don't need aiohttp
         self._aiohttp = aiohttp
@@ -50,6 +101,15 @@ class HttpBackend:
                 payload = await r.json() if body else {}
         return VisionResult.model_validate(payload)
 
+    async def run_batch(
+        self,
+        reqs: Sequence[VisionRequest],
+        batch_size: int | None = None,
+    ) -> List[VisionResult]:
+        # The server batches across whatever arrives concurrently; the
+        # client's job is just not to serialize.
+        return list(await asyncio.gather(*(self.run(req) for req in reqs)))
+
 
 # ---- registry -------------------------------------------------------------
 
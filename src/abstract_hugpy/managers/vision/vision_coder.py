@@ -1,7 +1,10 @@
 import gc
 import math
+import os
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional, Sequence, Union
 
 import io
 import base64
@@ -18,9 +21,23 @@ from .imports import (
     DEFAULT_LOCAL_FILES_ONLY,
     get_model_path
 )
+from ..residency import RESIDENCY, dir_footprint, torch_footprint
 
 logger = get_logFile("vision_coder")
 
+# Images per generate() call in analyze_batch. VRAM grows with it (the KV
+# cache is per row), so it's an env knob rather than a constant.
+DEFAULT_VISION_BATCH_SIZE = 4
+
+
+def vision_batch_size() -> int:
+    raw = os.environ.get("HUGPY_VISION_BATCH_SIZE")
+    try:
+        return max(1, int(raw)) if raw not in (None, "") else DEFAULT_VISION_BATCH_SIZE
+    except ValueError:
+        return DEFAULT_VISION_BATCH_SIZE
+
+
 def cleanup_cuda() -> None:
     torch = get_torch()
     gc.collect()
@@ -151,6 +168,11 @@ class VisionCoder:
         require("transformers", reason="VisionCoder requires HuggingFace transformers")
 
         self.cfg = cfg
+        # Users holding this coder (leases and analyze_batch calls). Residency
+        # reads it as busy; close() while it's non-zero waits for the last one.
+        self._inflight = 0
+        self._retired = False
+        self._inflight_lock = threading.Lock()
 
         logger.info(
             "VisionCoder loading key=%s model=%s device=%s dtype=%s token_budget=[%d,%d]",
@@ -218,35 +240,92 @@ class VisionCoder:
         max_new_tokens: int = 128,
         max_tokens: Optional[int] = None,
     ) -> str:
-        torch = get_torch()
+        return self.analyze_batch(
+            [image], prompt, max_new_tokens=max_new_tokens, max_tokens=max_tokens,
+        )[0]
+
+    def analyze_batch(
+        self,
+        images: Sequence[Image.Image],
+        prompts: Union[str, Sequence[str]] = "Analyze this image.",
+        max_new_tokens: int = 128,
+        max_tokens: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> List[str]:
+        """One text per image, from as few generate() calls as possible.
+
+        Images are fitted to the token budget first, then grouped by the
+        resulting size: same size means the same visual grid and the same
+        number of image tokens, so a group pads only its text. Each group
+        runs in batches of up to ``batch_size`` (HUGPY_VISION_BATCH_SIZE,
+        default 4). Results come back in input order.
+        """
+        images = list(images)
+        if isinstance(prompts, str):
+            prompts = [prompts] * len(images)
+        prompts = list(prompts)
+        if len(prompts) != len(images):
+            raise ValueError(f"{len(images)} images but {len(prompts)} prompts")
+        if not images:
+            return []
+        if not self.acquire():
+            raise RuntimeError(f"VisionCoder {self.cfg.model_key} was unloaded")
+        try:
+            return self._analyze_batch(images, prompts, max_new_tokens, max_tokens, batch_size)
+        finally:
+            self.release()
 
+    def _analyze_batch(self, images, prompts, max_new_tokens, max_tokens, batch_size):
         budget = max_tokens if max_tokens is not None else self.cfg.max_tokens
-        image = fit_to_token_budget(image, budget)
+        fitted = [fit_to_token_budget(image, budget) for image in images]
+        size = max(1, batch_size or vision_batch_size())
+
+        by_grid: dict[tuple[int, int], list[int]] = {}
+        for i, image in enumerate(fitted):
+            by_grid.setdefault(image.size, []).append(i)
+
+        out: List[str] = [""] * len(images)
+        for grid, members in by_grid.items():
+            logger.debug(
+                "Vision batch: %d image(s) at %sx%s with token_budget=%s",
+                len(members), grid[0], grid[1], budget,
+            )
+            for b in range(0, len(members), size):
+                idx = members[b:b + size]
+                texts = self._generate([fitted[i] for i in idx],
+                                       [prompts[i] for i in idx], max_new_tokens)
+                for i, text in zip(idx, texts):
+                    out[i] = text
+        return out
+
+    def _generate(self, images: List[Image.Image], prompts: List[str],
+                  max_new_tokens: int) -> List[str]:
+        torch = get_torch()
 
-        logger.debug(
-            "Vision input resized to %sx%s with token_budget=%s",
-            image.size[0],
-            image.size[1],
-            budget,
-        )
+        texts = [
+            self.processor.apply_chat_template(
+                [{
+                    "role": "user",
+                    "content": [
+                        {"type": "image", "image": image},
+                        {"type": "text", "text": prompt},
+                    ],
+                }],
+                tokenize=False,
+                add_generation_prompt=True,
+            )
+            for image, prompt in zip(images, prompts)
+        ]
 
-        messages = [{
-            "role": "user",
-            "content": [
-                {"type": "image", "image": image},
-                {"type": "text", "text": prompt},
-            ],
-        }]
-
-        text = self.processor.apply_chat_template(
-            messages,
-            tokenize=False,
-            add_generation_prompt=True,
-        )
+        # Decoder-only batch: pad on the left so every row's prompt ends at
+        # the same column and generation starts right after it.
+        tokenizer = getattr(self.processor, "tokenizer", None)
+        if tokenizer is not None:
+            tokenizer.padding_side = "left"
 
         inputs = self.processor(
-            text=[text],
-            images=[image],
+            text=texts,
+            images=images,
             return_tensors="pt",
             padding=True,
         )
@@ -274,7 +353,7 @@ class VisionCoder:
             generated,
             skip_special_tokens=True,
             clean_up_tokenization_spaces=False,
-        )[0]
+        )
 
     def analyze_image(
         self,
@@ -293,7 +372,41 @@ class VisionCoder:
         )
 
 
+    @property
+    def busy(self) -> bool:
+        return self._inflight > 0
+
+    def acquire(self) -> bool:
+        """Count one user; False once the coder has been closed."""
+        with self._inflight_lock:
+            if self._retired:
+                return False
+            self._inflight += 1
+            return True
+
+    def release(self) -> None:
+        with self._inflight_lock:
+            self._inflight -= 1
+            drop = self._retired and not self._inflight
+        if drop:
+            self._drop_weights()
+
+    def close(self) -> None:
+        """Drop the weights now, or after the last user releases them;
+        the residency manager flushes the CUDA cache."""
+        with self._inflight_lock:
+            self._retired = True
+            drop = not self._inflight
+        if drop:
+            self._drop_weights()
+
+    def _drop_weights(self) -> None:
+        self.model = None
+        self.processor = None
+
+
 _INSTANCES: dict[tuple[str, int, int, str], VisionCoder] = {}
+_INSTANCES_LOCK = threading.Lock()
 
 
 def get_vision_coder(
@@ -302,6 +415,30 @@ def get_vision_coder(
     max_tokens: int = 512,
     min_tokens: int = 64,
 ) -> VisionCoder:
+    """The cached coder, loading it on first use.
+
+    Not held: residency may close it before the caller uses it. Callers
+    that run it concurrently with other loads should use lease_vision_coder.
+    """
+    return _lookup(model_key, torch_dtype, max_tokens, min_tokens, lease=False)
+
+
+@contextmanager
+def lease_vision_coder(
+    model_key: Optional[str] = None,
+    torch_dtype=None,
+    max_tokens: int = 512,
+    min_tokens: int = 64,
+):
+    """get_vision_coder, counted busy from lookup until the block exits."""
+    coder = _lookup(model_key, torch_dtype, max_tokens, min_tokens, lease=True)
+    try:
+        yield coder
+    finally:
+        coder.release()
+
+
+def _lookup(model_key, torch_dtype, max_tokens, min_tokens, lease: bool) -> VisionCoder:
     torch = get_torch()
 
     key = _resolve_vision_model_key(model_key)
@@ -309,16 +446,46 @@ def get_vision_coder(
 
     cache_key = (key, min_tokens, max_tokens, str(dtype))
 
-    if cache_key not in _INSTANCES:
-        cfg = build_config(
-            model_key=key,
-            torch_dtype=dtype,
-            min_tokens=min_tokens,
-            max_tokens=max_tokens,
-        )
-        _INSTANCES[cache_key] = VisionCoder(cfg)
-
-    return _INSTANCES[cache_key]
+    coder = _INSTANCES.get(cache_key)
+    if coder is not None and (not lease or coder.acquire()):
+        RESIDENCY.touch(("vision", cache_key))
+        return coder
+
+    with _INSTANCES_LOCK:
+        coder = _INSTANCES.get(cache_key)
+        if coder is not None and lease and not coder.acquire():
+            # Closed between lookup and lease: load a fresh one.
+            if _INSTANCES.get(cache_key) is coder:
+                _INSTANCES.pop(cache_key, None)
+            coder = None
+        if coder is None:
+            cfg = build_config(
+                model_key=key,
+                torch_dtype=dtype,
+                min_tokens=min_tokens,
+                max_tokens=max_tokens,
+            )
+            ram, vram = dir_footprint(cfg.model_dir, device)
+            RESIDENCY.make_room(ram_bytes=ram, vram_bytes=vram)
+            coder = VisionCoder(cfg)
+            if lease:
+                coder.acquire()
+            _INSTANCES[cache_key] = coder
+            _register_resident(cache_key, coder)
+        return coder
+
+
+def _register_resident(cache_key, coder: VisionCoder) -> None:
+    def unload() -> None:
+        _INSTANCES.pop(cache_key, None)   # lock-free: may run inside get_vision_coder
+        coder.close()
+
+    ram, vram = torch_footprint(coder.model)
+    RESIDENCY.register(
+        ("vision", cache_key), model_key=cache_key[0],
+        ram_bytes=ram, vram_bytes=vram, unload=unload,
+        busy=lambda: coder.busy,
+    )
 
 
 def deepcoder_image_analysis(
@@ -19,6 +19,21 @@ class VisionRunner:
                 f"got request for {req.model_key!r}"
             )
         return await self.backend.run(req)
+
+    async def run_batch(self, reqs, batch_size=None):
+        """Results for ``reqs`` in order; batched when the backend can."""
+        for req in reqs:
+            if req.model_key != self.cfg.model_key:
+                raise ValueError(
+                    f"VisionRunner bound to {self.cfg.model_key!r}, "
+                    f"got request for {req.model_key!r}"
+                )
+        run_batch = getattr(self.backend, "run_batch", None)
+        if run_batch is None:
+            import asyncio
+            return list(await asyncio.gather(*(self.backend.run(r) for r in reqs)))
+        return await run_batch(reqs, batch_size=batch_size)
+
     async def stream(self, req: VisionRequest, cancel_event=None):
         result = await self.run(req)
         yield TokenEvent(request_id=req.request_id, text=getattr(result, "text", "") or "")
@@ -0,0 +1,154 @@
+"""Background warm-up for process-wide models.
+
+Shared models that load on first use (spaCy, the KeyBERT sentence-BERT)
+make the first request after every restart pay for the load. Each one
+registers a loader here under a short name:
+
+    register_warmup("spacy", SpacyManager)
+    nlp = warm("spacy").nlp          # load once, or wait for the load in flight
+
+warm() is the only way in, so a request that arrives while the warm-up
+thread is still loading waits on that same load instead of starting a
+second one. start_warmup() (called by the worker and the Flask app at
+startup) loads the names in HUGPY_WARMUP, comma-separated — default
+"spacy,keybert", "none" to disable — each on its own daemon thread, so
+independent models load concurrently. warmup_status() is what /health
+reports.
+
+A failed load is recorded and not cached: the next warm() tries again.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["register_warmup", "start_warmup", "warm", "warmup_status"]
+
+DEFAULT_WARMUP = "spacy,keybert"
+
+
+class _Entry:
+    __slots__ = ("loader", "future", "state", "started", "seconds", "error")
+
+    def __init__(self, loader: Callable[[], Any]):
+        self.loader = loader
+        self.future: Optional[Future] = None
+        self.state = "cold"          # cold | loading | ready | failed
+        self.started: Optional[float] = None
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+
+_ENTRIES: Dict[str, _Entry] = {}
+_LOCK = threading.Lock()
+_REQUESTED: List[str] = []
+
+
+def register_warmup(name: str, loader: Callable[[], Any]) -> None:
+    """Register (or replace, while still cold) the loader behind ``name``."""
+    with _LOCK:
+        entry = _ENTRIES.get(name)
+        if entry is not None and entry.state != "cold":
+            return
+        _ENTRIES[name] = _Entry(loader)
+
+
+def warm(name: str) -> Any:
+    """The loaded object for ``name``; loads it, or waits for the load in flight."""
+    with _LOCK:
+        entry = _ENTRIES.get(name)
+        if entry is None:
+            raise KeyError(f"No warm-up target {name!r}. Registered: {sorted(_ENTRIES)}")
+        future = entry.future
+        owner = future is None
+        if owner:
+            future = entry.future = Future()
+            entry.state = "loading"
+            entry.started = time.perf_counter()
+            entry.seconds = None
+    if not owner:
+        return future.result()
+
+    try:
+        value = entry.loader()
+    except BaseException as exc:
+        with _LOCK:
+            entry.state = "failed"
+            entry.seconds = time.perf_counter() - entry.started
+            entry.error = f"{type(exc).__name__}: {exc}"
+            entry.future = None          # let the next caller retry
+        future.set_exception(exc)
+        raise
+    with _LOCK:
+        entry.state = "ready"
+        entry.seconds = time.perf_counter() - entry.started
+        entry.error = None
+    future.set_result(value)
+    logger.info("warm-up: %s ready in %.2fs", name, entry.seconds)
+    return value
+
+
+def _requested_names(names: Optional[Iterable[str]]) -> List[str]:
+    if names is None:
+        raw = os.environ.get("HUGPY_WARMUP")
+        raw = DEFAULT_WARMUP if raw is None else raw
+        names = [] if raw.strip().lower() in ("", "0", "none", "off") else raw.split(",")
+    return [n.strip() for n in names if n and n.strip()]
+
+
+def start_warmup(names: Optional[Iterable[str]] = None) -> List[str]:
+    """Start loading ``names`` (default: HUGPY_WARMUP) on background threads.
+
+    Returns the names actually started. Unknown names are logged and
+    skipped; names already loading or loaded are left alone.
+    """
+    started: List[str] = []
+    for name in _requested_names(names):
+        with _LOCK:
+            entry = _ENTRIES.get(name)
+            if entry is None:
+                logger.warning("warm-up: unknown target %r (registered: %s)",
+                               name, ", ".join(sorted(_ENTRIES)))
+                continue
+            if name not in _REQUESTED:
+                _REQUESTED.append(name)
+            if entry.future is not None or entry.state == "ready":
+                continue
+
+        def _run(n=name):
+            try:
+                warm(n)
+            except Exception as exc:
+                logger.warning("warm-up: %s failed: %s: %s", n, type(exc).__name__, exc)
+
+        threading.Thread(target=_run, name=f"warmup-{name}", daemon=True).start()
+        started.append(name)
+    return started
+
+
+def warmup_status() -> Dict[str, Any]:
+    """Per-target state plus overall readiness of what start_warmup asked for."""
+    with _LOCK:
+        targets = {
+            name: {
+                "state": e.state,
+                "seconds": round(e.seconds, 3) if e.seconds is not None
+                else (round(time.perf_counter() - e.started, 3) if e.started else None),
+                "error": e.error,
+            }
+            for name, e in _ENTRIES.items()
+        }
+        requested = list(_REQUESTED)
+    return {
+        "requested": requested,
+        "ready": all(targets[n]["state"] == "ready" for n in requested),
+        "done": all(targets[n]["state"] in ("ready", "failed") for n in requested),
+        "targets": targets,
+    }
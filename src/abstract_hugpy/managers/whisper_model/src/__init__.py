@@ -1,6 +1,9 @@
 from .model import *
 from .runner import WhisperRunner
 from .stream import (
+    PipeIngestError,
+    iter_url_pcm,
+    whisper_transcribe_url_pcm,
     extension_from_content_type,
     stream_url_to_temp_file,
     whisper_transcribe_url_stream
@@ -5,7 +5,18 @@ from .execute import (
     transcribe_file,
     transcribe_file_with_workspace
     )
+from .longform import (
+    TranscriptionCancelled,
+    WindowStitcher,
+    plan_windows,
+    stitch_windows,
+    transcribe_long_form,
+    )
 from .model import (
+    WHISPER_POOL,
+    WhisperModelPool,
     whisperManager,
-    get_whisper_model
+    get_whisper_model,
+    preload_whisper_models,
+    whisper_pool_stats,
     )
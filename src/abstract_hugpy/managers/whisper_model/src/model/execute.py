@@ -1,30 +1,67 @@
 from .imports import *
 from .utils import *
-from .model import get_whisper_model
+from .model import WHISPER_POOL
+from .longform import (
+    OnWindow,
+    SAMPLE_RATE,
+    load_audio_16k,
+    long_form_min_seconds,
+    transcribe_long_form,
+)
 def whisper_transcribe(
     audio_path: str,
     model_size: str = "small",
     language: str | None = "english",
     task: str = "transcribe",
     whisper_model_path: str | None = None,
+    long_form: bool | None = None,
+    long_form_window_s: float | None = None,
+    long_form_overlap_s: float | None = None,
+    long_form_workers: int | None = None,
+    on_window: OnWindow | None = None,
+    should_stop: Callable[[], bool] | None = None,
 ) -> dict[str, Any]:
+    """
+    Transcribe one audio file.
+
+    long_form=True splits the audio at pauses and transcribes the windows
+    concurrently (see longform.py); False is a single model.transcribe();
+    None picks long-form for files at least HUGPY_WHISPER_LONG_FORM_MIN_S
+    seconds long (default 600), or whenever ``on_window`` is given, since
+    windows are what it reports.
+    """
     if not os.path.isfile(audio_path):
         raise ValueError(f"Audio file does not exist: {audio_path}")
 
     if task not in {"transcribe", "translate"}:
         raise ValueError(f"Unsupported Whisper task: {task}")
 
-    model = get_whisper_model(
-        module_size=model_size,
-        whisper_model_path=whisper_model_path,
-    )
-
     options: dict[str, Any] = {"task": task}
 
     if language:
         options["language"] = language
 
-    return model.transcribe(audio_path, **options)
+    if long_form is None and on_window is not None:
+        long_form = True
+
+    audio: Any = audio_path
+    if long_form is not False:
+        audio = load_audio_16k(audio_path)
+        if long_form or len(audio) / SAMPLE_RATE >= long_form_min_seconds():
+            return transcribe_long_form(
+                audio,
+                model_size=model_size,
+                options=options,
+                whisper_model_path=whisper_model_path,
+                window_s=long_form_window_s,
+                overlap_s=long_form_overlap_s,
+                workers=long_form_workers,
+                on_window=on_window,
+                should_stop=should_stop,
+            )
+
+    with WHISPER_POOL.lease(model_size, whisper_model_path) as model:
+        return model.transcribe(audio, **options)
 def transcribe_from_video(
     video_path: str,
     audio_path: str | None = None,
@@ -95,6 +132,12 @@ def transcribe_file_with_workspace(
     capture_frames: bool = False,
     min_gap_seconds: float = 2.0,
     long_segment_seconds: float = 8.0,
+    long_form: bool | None = None,
+    long_form_window_s: float | None = None,
+    long_form_overlap_s: float | None = None,
+    long_form_workers: int | None = None,
+    on_window: OnWindow | None = None,
+    should_stop: Callable[[], bool] | None = None,
 ) -> dict[str, Any]:
     """
     Main media transcription pipeline.
@@ -139,6 +182,12 @@ def transcribe_file_with_workspace(
         language=language,
         task=task,
         whisper_model_path=whisper_model_path,
+        long_form=long_form,
+        long_form_window_s=long_form_window_s,
+        long_form_overlap_s=long_form_overlap_s,
+        long_form_workers=long_form_workers,
+        on_window=on_window,
+        should_stop=should_stop,
     )
 
     save_transcript_outputs(
@@ -0,0 +1,721 @@
+"""Long-form transcription: split at pauses, transcribe windows concurrently, stitch.
+
+model.transcribe() walks a file in 30 s steps on one thread, so a
+three-hour recording is one long serial decode. Here the audio is decoded
+once to 16 kHz mono and cut into windows of about ``window_s`` seconds:
+
+    cuts      each cut lands on the quietest 0.3 s stretch (frame RMS,
+              smoothed) within +/-25% of the target, so a cut falls in a
+              pause rather than mid-word
+    overlap   every window also reads ``overlap_s`` past both of its cuts,
+              so a word on a cut is heard whole by at least one side
+    run       CPU: a spawn-context process pool, one model per process and
+              torch threads split evenly between them, kept per model across
+              calls and capped by the RAM budget (one worker runs on the
+              pooled model instead); a pool whose process died is
+              restarted once per call. CUDA: one thread per WHISPER_POOL
+              replica (HUGPY_WHISPER_GPU_REPLICAS, default 1), since
+              whisper's decoder hooks the model per call and can't share it
+              between concurrent calls
+    stitch    timestamps are shifted by the window's start; a segment is
+              kept by the window its midpoint falls in (between that
+              window's own cuts), and a segment that repeats the previous
+              kept one's text across a seam is dropped
+
+The result has the same shape as model.transcribe()'s: text, segments
+(ids renumbered), language — plus "long_form" describing the windows.
+Windows are stitched in order as they finish, so ``on_window`` can stream
+each window's segments while later ones are still running.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import re
+import threading
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .imports import *
+from .model import WHISPER_POOL, _estimate_bytes
+from ....residency import RESIDENCY
+from ....spill import free_ram_bytes, free_vram_bytes
+
+SAMPLE_RATE = 16000
+DEFAULT_WINDOW_S = 120.0
+DEFAULT_OVERLAP_S = 2.0
+# Files at least this long go long-form when the request leaves it to us.
+DEFAULT_LONG_FORM_MIN_S = 600.0
+# Frames quieter than this RMS (float PCM in [-1, 1]) count as silence.
+SILENCE_RMS = 1e-3
+
+_FRAME = 480          # 30 ms at 16 kHz
+_SMOOTH = 10          # frames; 0.3 s
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def long_form_min_seconds() -> float:
+    return _env_float("HUGPY_WHISPER_LONG_FORM_MIN_S", DEFAULT_LONG_FORM_MIN_S)
+
+
+def load_audio_16k(path: str):
+    """Whole file as float32 mono 16 kHz (whisper's own ffmpeg loader)."""
+    return get_whisper().load_audio(path)
+
+
+def frame_energy(audio):
+    """Smoothed RMS per 30 ms frame."""
+    import numpy as np
+
+    n = len(audio) // _FRAME
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:n * _FRAME].reshape(n, _FRAME)
+    rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+    kernel = np.ones(_SMOOTH, dtype=np.float32) / _SMOOTH
+    return np.convolve(rms, kernel, mode="same")
+
+
+def plan_windows(audio, window_s: float = DEFAULT_WINDOW_S,
+                 overlap_s: float = DEFAULT_OVERLAP_S) -> list[dict[str, float]]:
+    """Windows as dicts of seconds: start/end (what's read) and keep_from/keep_to
+    (the window's own cuts; segments centred outside them belong to a neighbour)."""
+    import numpy as np
+
+    duration = len(audio) / SAMPLE_RATE
+    if duration <= window_s * 1.25:
+        return [{"start": 0.0, "end": duration, "keep_from": 0.0, "keep_to": duration}]
+
+    energy = frame_energy(audio)
+    frame_s = _FRAME / SAMPLE_RATE
+    search = window_s * 0.25
+
+    cuts = [0.0]
+    while duration - cuts[-1] > window_s * 1.25:
+        target = cuts[-1] + window_s
+        lo = int((target - search) / frame_s)
+        hi = min(int((target + search) / frame_s), len(energy))
+        if hi <= lo:
+            cuts.append(target)
+            continue
+        quietest = lo + int(np.argmin(energy[lo:hi]))
+        cuts.append(quietest * frame_s)
+    cuts.append(duration)
+
+    return [
+        {
+            "start": max(0.0, a - overlap_s),
+            "end": min(duration, b + overlap_s),
+            "keep_from": a,
+            "keep_to": b,
+        }
+        for a, b in zip(cuts, cuts[1:])
+    ]
+
+
+class PcmRing:
+    """Fixed-capacity ring of float32 samples, addressed by absolute index.
+
+    The streamed transcriber writes decoded audio in at ``end`` and, once a
+    window is cut, discards everything before the next window's start, so
+    memory stays at about one window however long the stream runs.
+    """
+
+    def __init__(self, capacity: int):
+        import numpy as np
+
+        self._np = np
+        self._buf = np.zeros(max(1, capacity), dtype=np.float32)
+        self.start = 0      # oldest sample still held
+        self.end = 0        # one past the newest
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def write(self, samples) -> None:
+        if len(self) + len(samples) > self.capacity:
+            # Only if a caller holds more than planned: grow, re-laying the
+            # held samples out at their absolute positions mod the new size.
+            held = self.read(self.start, self.end)
+            self._buf = self._np.zeros(
+                max(2 * self.capacity, len(held) + len(samples)), dtype=self._np.float32)
+            self.end = self.start
+            self._put(held)
+        self._put(samples)
+
+    def _put(self, samples) -> None:
+        n = len(samples)
+        pos = self.end % self.capacity
+        first = min(n, self.capacity - pos)
+        self._buf[pos:pos + first] = samples[:first]
+        if first < n:
+            self._buf[:n - first] = samples[first:]
+        self.end += n
+
+    def read(self, a: int, b: int):
+        """Copy of samples [a, b) (absolute indices, clipped to what's held)."""
+        np = self._np
+        a, b = max(a, self.start), min(b, self.end)
+        if b <= a:
+            return np.zeros(0, dtype=np.float32)
+        pa, pb = a % self.capacity, b % self.capacity
+        if pa < pb or pb == 0:
+            return self._buf[pa:pb or self.capacity].copy()
+        return np.concatenate([self._buf[pa:], self._buf[:pb]])
+
+    def discard_before(self, a: int) -> None:
+        self.start = max(self.start, min(a, self.end))
+
+
+def _next_cut(ring: PcmRing, prev_cut: int, window_s: float,
+              overlap_s: float) -> int | None:
+    """Where (absolute sample) the window starting at ``prev_cut`` ends, or
+    None until its whole search zone, plus overlap, is in ``ring``."""
+    import numpy as np
+
+    sr = SAMPLE_RATE
+    search = window_s * 0.25
+    # Smoothing reads _SMOOTH frames either side; without real samples
+    # there it pads with zeros and the zone's edges look like silence.
+    margin = _SMOOTH * _FRAME
+    if ring.end - prev_cut < int((window_s + search + overlap_s) * sr) + margin:
+        return None
+    target = prev_cut + int(window_s * sr)
+    lo, hi = target - int(search * sr), target + int(search * sr)
+    a = max(ring.start, lo - margin)
+    energy = frame_energy(ring.read(a, hi + margin))
+    first = -(-(lo - a) // _FRAME)            # first frame starting at/after lo
+    zone = energy[first:max(first, (hi - a) // _FRAME)]
+    if not len(zone):
+        return max(target, prev_cut + _FRAME)
+    cut = a + (first + int(np.argmin(zone))) * _FRAME
+    return max(cut, prev_cut + _FRAME)
+
+
+def _is_silent(audio) -> bool:
+    import numpy as np
+
+    energy = frame_energy(audio)
+    return not len(energy) or float(np.max(energy)) < SILENCE_RMS
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+
+_WORKER_MODEL = None
+
+
+def _process_init(model_size: str, whisper_model_path: str | None, threads: int) -> None:
+    global _WORKER_MODEL
+    torch = get_torch()
+    torch.set_num_threads(max(1, threads))
+    _WORKER_MODEL = get_whisper().load_model(
+        model_size, device="cpu", download_root=whisper_model_path,
+    )
+
+
+def _process_transcribe(audio, options: dict[str, Any]) -> dict[str, Any]:
+    return _WORKER_MODEL.transcribe(audio, **options)
+
+
+def _cpu_workers(workers: int | None) -> int:
+    if workers:
+        return max(1, workers)
+    env = os.environ.get("HUGPY_WHISPER_LONG_FORM_WORKERS")
+    if env:
+        try:
+            return max(1, int(env))
+        except ValueError:
+            pass
+    # Two or more torch threads per model keeps each decode reasonably fast;
+    # past that, extra processes beat extra threads.
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+def _models_that_fit(per_model: int, cuda: bool) -> int | None:
+    """How many more models of ``per_model`` bytes fit the residency budget
+    (or, with no budget set, free memory). None when that can't be told."""
+    budgets = RESIDENCY.budgets()
+    snap = RESIDENCY.snapshot()
+    if cuda:
+        budget, used, free = (budgets["vram_bytes"], snap["resident_vram_bytes"],
+                              free_vram_bytes())
+    else:
+        budget, used, free = (budgets["ram_bytes"], snap["resident_ram_bytes"],
+                              free_ram_bytes())
+    avail = budget - used if budget is not None else free
+    if avail is None:
+        return None
+    return max(0, int(avail // max(1, per_model)))
+
+
+class _CpuPool:
+    """Spawned worker processes, each holding one CPU copy of a model.
+
+    Kept per (size, path) across calls, so only the first long-form request
+    pays the loads, and registered with RESIDENCY as one entry of
+    n * model-size bytes, so it is budgeted and evicted (when idle) like any
+    other model.
+    """
+
+    def __init__(self, key: tuple, n: int):
+        self.key = key
+        self.n = n
+        self.inflight = 0
+        self.retired = False
+        threads = max(1, (os.cpu_count() or 1) // n)
+        self.executor = ProcessPoolExecutor(
+            max_workers=n,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_process_init,
+            initargs=(key[0], key[1], threads),
+        )
+
+
+_CPU_POOLS: dict[tuple, _CpuPool] = {}
+_CPU_POOLS_LOCK = threading.Lock()      # the dict and inflight counts
+_CPU_BUILD_LOCK = threading.Lock()      # one pool start-up at a time
+
+
+def _drop_cpu_pool(key: tuple, pool: _CpuPool | None = None) -> None:
+    """Residency unload: idle pools shut down now, busy ones after their last call.
+
+    With ``pool``, only that pool is dropped, not one started since in its place.
+    """
+    with _CPU_POOLS_LOCK:
+        if pool is not None and _CPU_POOLS.get(key) is not pool:
+            return
+        pool = _CPU_POOLS.pop(key, None)
+        if pool is None:
+            return
+        pool.retired = True
+        idle = not pool.inflight
+    if idle:
+        pool.executor.shutdown(wait=True, cancel_futures=True)
+    logger.info("long-form: CPU worker pool %s released", key)
+
+
+@contextmanager
+def _cpu_pool(model_size: str, whisper_model_path: str | None, workers: int | None):
+    """Yields the shared _CpuPool for this model, starting it on first use.
+
+    The pool is sized when it starts: ``workers`` (or the default), capped
+    by how many copies of the model fit the RAM budget.
+    """
+    key = (model_size, whisper_model_path or DEFAULT_WHISPER_MODEL_PATH)
+    rkey = ("whisper-long-form", key)
+    with _CPU_BUILD_LOCK:
+        with _CPU_POOLS_LOCK:
+            pool = _CPU_POOLS.get(key)
+            if pool is not None:
+                pool.inflight += 1
+        if pool is None:
+            per = _estimate_bytes(model_size)
+            n = _cpu_workers(workers)
+            RESIDENCY.make_room(ram_bytes=n * per)
+            fit = _models_that_fit(per, cuda=False)
+            if fit is not None and fit < n:
+                logger.warning("long-form: RAM fits %d of %d CPU worker(s) for %s",
+                               fit, n, model_size)
+                n = max(1, fit)
+            pool = _CpuPool(key, n)
+            pool.inflight = 1
+            with _CPU_POOLS_LOCK:
+                _CPU_POOLS[key] = pool
+            RESIDENCY.register(
+                rkey, model_key=f"whisper-{model_size}", ram_bytes=n * per,
+                unload=lambda k=key, p=pool: _drop_cpu_pool(k, p),
+                busy=lambda p=pool: p.inflight > 0,
+            )
+    try:
+        yield pool
+    finally:
+        with _CPU_POOLS_LOCK:
+            pool.inflight -= 1
+            close = pool.retired and not pool.inflight
+        if close:
+            pool.executor.shutdown(wait=True, cancel_futures=True)
+        else:
+            RESIDENCY.touch(rkey)
+
+
+def _discard_broken_pool(pool: _CpuPool) -> None:
+    """Drop a pool whose worker process died, unless it was already replaced."""
+    with _CPU_BUILD_LOCK:
+        with _CPU_POOLS_LOCK:
+            current = _CPU_POOLS.get(pool.key) is pool
+        if current:
+            RESIDENCY.evict(("whisper-long-form", pool.key))
+            _drop_cpu_pool(pool.key, pool)
+
+
+class TranscriptionCancelled(RuntimeError):
+    """should_stop() returned True between windows."""
+
+
+@contextmanager
+def _window_pool(n_chunks, options, model_size, whisper_model_path, workers, cuda):
+    """Yields submit(chunk) -> Future of that chunk's transcribe() result."""
+    if cuda:
+        n = workers or int(_env_float("HUGPY_WHISPER_GPU_REPLICAS", 1))
+        n = max(1, min(n, n_chunks))
+        if n > 1:
+            # Replicas already loaded are free to use; new ones must fit VRAM.
+            fit = _models_that_fit(_estimate_bytes(model_size), cuda=True)
+            if fit is not None:
+                n = max(1, min(n, WHISPER_POOL.loaded_replicas(
+                    model_size, whisper_model_path) + fit))
+        logger.info("long-form: %d windows on %d CUDA replica(s)", n_chunks, n)
+    else:
+        n = min(_cpu_workers(workers), n_chunks)
+        logger.info("long-form: %d windows on up to %d CPU worker(s)", n_chunks, n)
+
+    if cuda or n == 1:
+        # In this process, one pooled model per thread: replica 0 is the
+        # shared model, the rest (CUDA only) are WHISPER_POOL replicas, so
+        # they are budgeted and stay loaded for the next request.
+        local = threading.local()
+        assigned = iter(range(n))
+        assign_lock = threading.Lock()
+
+        def run(chunk):
+            if not hasattr(local, "replica"):
+                with assign_lock:
+                    local.replica = next(assigned)
+            # Leased per window, so other requests for this model get
+            # their turn between windows rather than after the file.
+            with WHISPER_POOL.lease(model_size, whisper_model_path,
+                                    replica=local.replica) as model:
+                return model.transcribe(chunk, **options)
+
+        pool = ThreadPoolExecutor(max_workers=n, thread_name_prefix="whisper-window")
+        try:
+            yield lambda chunk: pool.submit(run, chunk)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return
+
+    with ExitStack() as held:
+        current = {"pool": held.enter_context(
+            _cpu_pool(model_size, whisper_model_path, workers)), "restarted": False}
+        swap_lock = threading.Lock()
+
+        def restart(broken: _CpuPool) -> bool:
+            """Replace a pool whose process died; False once this call has."""
+            with swap_lock:
+                if current["pool"] is not broken:
+                    return True             # another window already did
+                _discard_broken_pool(broken)
+                if current["restarted"]:
+                    return False
+                current["restarted"] = True
+                logger.warning("long-form: CPU worker pool %s broke; restarting it",
+                               broken.key)
+                current["pool"] = held.enter_context(
+                    _cpu_pool(model_size, whisper_model_path, workers))
+                return True
+
+        def run(chunk):
+            while True:
+                shared = current["pool"]
+                try:
+                    return shared.executor.submit(
+                        _process_transcribe, chunk, options).result()
+                except BrokenProcessPool:
+                    if not restart(shared):
+                        raise
+
+        # One feeder thread per process. The processes outlive this call:
+        # on exit only its own queued windows are dropped, and the running
+        # ones finish.
+        feed = ThreadPoolExecutor(max_workers=current["pool"].n,
+                                  thread_name_prefix="whisper-window")
+        try:
+            yield lambda chunk: feed.submit(run, chunk)
+        finally:
+            feed.shutdown(wait=True, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# Stitching
+# ---------------------------------------------------------------------------
+
+_NORM = re.compile(r"[^\w]+")
+
+
+def _norm(text: str) -> str:
+    return _NORM.sub(" ", (text or "").lower()).strip()
+
+
+class WindowStitcher:
+    """Merges per-window results, in window order, into one transcript.
+
+    add() returns the segments that window contributed (timestamps already
+    absolute, ids final), so callers can stream them as they arrive.
+    """
+
+    def __init__(self, windows: list[dict[str, float]]):
+        self.windows = windows
+        self.segments: list[dict[str, Any]] = []
+        self.languages: Counter = Counter()
+
+    def add(self, index: int, result: dict[str, Any] | None,
+            last: bool | None = None) -> list[dict[str, Any]]:
+        """``last``: whether this is the final window (default: the last one
+        in ``windows``; streamed input, where windows are appended as they
+        are cut, says so explicitly)."""
+        if not result:
+            return []
+        window = self.windows[index]
+        if last is None:
+            last = index == len(self.windows) - 1
+        if result.get("language"):
+            self.languages[result["language"]] += 1
+        offset = window["start"]
+        added: list[dict[str, Any]] = []
+        for seg in result.get("segments", []):
+            seg = dict(seg)
+            seg["start"] = float(seg.get("start", 0.0)) + offset
+            seg["end"] = float(seg.get("end", seg["start"])) + offset
+            if seg.get("words"):
+                seg["words"] = [
+                    {**w,
+                     "start": (w["start"] + offset) if w.get("start") is not None else None,
+                     "end": (w["end"] + offset) if w.get("end") is not None else None}
+                    for w in seg["words"]
+                ]
+            mid = (seg["start"] + seg["end"]) / 2.0
+            if not (window["keep_from"] <= mid < window["keep_to"]
+                    or (last and mid >= window["keep_to"])):
+                continue
+            if self.segments:
+                prev = self.segments[-1]
+                if (_norm(seg.get("text")) == _norm(prev.get("text"))
+                        and seg["start"] < prev["end"] + 1.0):
+                    continue
+            seg["id"] = len(self.segments)
+            seg.pop("seek", None)     # window-relative; meaningless after stitching
+            self.segments.append(seg)
+            added.append(seg)
+        return added
+
+    def result(self) -> dict[str, Any]:
+        return {
+            "text": "".join(seg.get("text", "") for seg in self.segments),
+            "segments": self.segments,
+            "language": self.languages.most_common(1)[0][0] if self.languages else None,
+        }
+
+
+def stitch_windows(windows: list[dict[str, float]],
+                   results: list[dict[str, Any] | None]) -> dict[str, Any]:
+    stitcher = WindowStitcher(windows)
+    for i, result in enumerate(results):
+        stitcher.add(i, result)
+    return stitcher.result()
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+OnWindow = Callable[[int, int, dict[str, float], list[dict[str, Any]]], None]
+
+
+def transcribe_long_form(
+    audio,
+    model_size: str = "small",
+    options: dict[str, Any] | None = None,
+    whisper_model_path: str | None = None,
+    window_s: float | None = None,
+    overlap_s: float | None = None,
+    workers: int | None = None,
+    on_window: OnWindow | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> dict[str, Any]:
+    """Transcribe ``audio`` (a path or 16 kHz float32 array) window by window.
+
+    ``on_window(index, total, window, new_segments)`` is called in window
+    order as soon as each window (and every one before it) is done.
+    ``should_stop`` is polled between windows; when it returns True the
+    windows not yet started are dropped and TranscriptionCancelled raised.
+    """
+    if isinstance(audio, str):
+        audio = load_audio_16k(audio)
+    options = dict(options or {})
+    window_s = window_s or DEFAULT_WINDOW_S
+    overlap_s = DEFAULT_OVERLAP_S if overlap_s is None else overlap_s
+
+    windows = plan_windows(audio, window_s, overlap_s)
+    chunks = [
+        audio[int(w["start"] * SAMPLE_RATE):int(w["end"] * SAMPLE_RATE)]
+        for w in windows
+    ]
+    live = [i for i, chunk in enumerate(chunks) if not _is_silent(chunk)]
+
+    torch = get_torch()
+    cuda = torch.cuda.is_available()
+    if not cuda:
+        options.setdefault("fp16", False)
+
+    stitcher = WindowStitcher(windows)
+    total = len(windows)
+
+    def window_done(i: int, result) -> None:
+        added = stitcher.add(i, result)
+        if on_window is not None:
+            on_window(i, total, windows[i], added)
+        if should_stop is not None and should_stop():
+            raise TranscriptionCancelled(f"stopped after window {i + 1}/{total}")
+
+    if live:
+        with _window_pool(len(live), options, model_size, whisper_model_path,
+                          workers, cuda) as submit:
+            futures = {i: submit(chunks[i]) for i in live}
+            for i in range(total):
+                window_done(i, futures[i].result() if i in futures else None)
+    else:
+        for i in range(total):
+            window_done(i, None)
+
+    stitched = stitcher.result()
+    stitched["duration"] = len(audio) / SAMPLE_RATE
+    stitched["long_form"] = {
+        "windows": len(windows),
+        "silent_windows": len(windows) - len(live),
+        "window_s": window_s,
+        "overlap_s": overlap_s,
+        "device": "cuda" if cuda else "cpu",
+    }
+    return stitched
+
+
+def transcribe_pcm_stream(
+    blocks: Iterable[Any],
+    model_size: str = "small",
+    options: dict[str, Any] | None = None,
+    whisper_model_path: str | None = None,
+    window_s: float | None = None,
+    overlap_s: float | None = None,
+    workers: int | None = None,
+    on_window: OnWindow | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> dict[str, Any]:
+    """Long-form transcription of audio that is still arriving.
+
+    ``blocks`` yields float32 16 kHz mono arrays of any size (e.g. decoded
+    from a download as it lands). Samples go into a PcmRing; as soon as
+    enough has arrived past a window's target end to choose its cut (the
+    quietest stretch within +/-25%, as plan_windows does), that window is
+    submitted and the ring drops everything before the next window's
+    start. So transcription starts with the first window, not the last
+    byte. At most ``workers`` windows are queued or running: before
+    cutting another, this waits for the oldest, which stalls the reader of
+    ``blocks`` (and so the ffmpeg pipe and the download behind it). Memory
+    stays at about one window in the ring plus ``workers`` in flight.
+
+    ``on_window(index, total, window, new_segments)`` reports windows in
+    order; ``total`` is the number cut so far (the final count once the
+    stream has ended). Returns the same shape as transcribe_long_form().
+    """
+    import numpy as np
+
+    options = dict(options or {})
+    window_s = window_s or DEFAULT_WINDOW_S
+    overlap_s = DEFAULT_OVERLAP_S if overlap_s is None else overlap_s
+    search = window_s * 0.25
+    sr = SAMPLE_RATE
+    limit = max(1, workers or 1)
+
+    torch = get_torch()
+    cuda = torch.cuda.is_available()
+    if not cuda:
+        options.setdefault("fp16", False)
+
+    ring = PcmRing(int((window_s + 2 * search + 2 * overlap_s + 10.0) * sr))
+    windows: list[dict[str, float]] = []
+    stitcher = WindowStitcher(windows)
+    futures: list[Any] = []           # per window: Future, or None when silent
+    reported = 0
+    silent = 0
+    prev_cut = 0                      # samples
+
+    def report(block: bool, final: bool = False) -> None:
+        nonlocal reported
+        while reported < len(futures):
+            fut = futures[reported]
+            if fut is not None and not block and not fut.done():
+                return
+            i = reported
+            last = final and i == len(futures) - 1
+            added = stitcher.add(i, fut.result() if fut is not None else None, last=last)
+            reported += 1
+            if on_window is not None:
+                on_window(i, len(windows), windows[i], added)
+            if should_stop is not None and should_stop():
+                raise TranscriptionCancelled(f"stopped after window {i + 1}")
+
+    def throttle() -> None:
+        while True:
+            running = [f for f in futures[reported:] if f is not None and not f.done()]
+            if len(running) < limit:
+                return
+            wait(running[:1])
+            report(block=False)
+
+    def cut_window(submit, cut: int) -> None:
+        nonlocal prev_cut, silent
+        throttle()
+        a = max(0, prev_cut - int(overlap_s * sr))
+        b = min(ring.end, cut + int(overlap_s * sr))
+        chunk = ring.read(a, b)
+        windows.append({
+            "start": a / sr, "end": b / sr,
+            "keep_from": prev_cut / sr, "keep_to": cut / sr,
+        })
+        if _is_silent(chunk):
+            futures.append(None)
+            silent += 1
+        else:
+            futures.append(submit(chunk))
+        prev_cut = cut
+        ring.discard_before(cut - int(overlap_s * sr))
+
+    with _window_pool(workers or 1, options, model_size, whisper_model_path,
+                      workers or 1, cuda) as submit:
+        for block in blocks:
+            if should_stop is not None and should_stop():
+                raise TranscriptionCancelled("stopped while receiving audio")
+            ring.write(np.asarray(block, dtype=np.float32))
+            # Cut every window whose search zone (plus overlap) has arrived.
+            while (cut := _next_cut(ring, prev_cut, window_s, overlap_s)) is not None:
+                cut_window(submit, cut)
+            report(block=False)
+
+        if ring.end > prev_cut:
+            cut_window(submit, ring.end)
+        report(block=True, final=True)
+
+    stitched = stitcher.result()
+    stitched["duration"] = ring.end / sr
+    stitched["long_form"] = {
+        "windows": len(windows),
+        "silent_windows": silent,
+        "window_s": window_s,
+        "overlap_s": overlap_s,
+        "device": "cuda" if cuda else "cpu",
+        "streamed": True,
+    }
+    return stitched
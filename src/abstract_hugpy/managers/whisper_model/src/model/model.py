@@ -1,36 +1,279 @@
+"""Whisper models, pooled by (size, download path, device).
+
+whisperManager used to be a singleton holding one model and reloading it
+whenever a call asked for a different size or path, so alternating
+"small" / "large-v3" traffic paid a full load on nearly every request, and
+concurrent callers shared (and raced on) whichever model was current.
+
+WHISPER_POOL keeps one model per key:
+
+    model = get_whisper_model("small")                 # load once, reuse (unleased)
+    with WHISPER_POOL.lease("large-v3") as model:      # exclusive use
+        model.transcribe(audio)
+
+    load      per-key lock: concurrent first calls for one key load it once;
+              different keys load in parallel
+    lease     per-key use lock, and the entry reads as busy while held, so
+              residency never evicts a model mid-transcribe. openai-whisper
+              hooks the model for each decode, so one model can't serve two
+              transcribe() calls at once
+    eviction  entries register with RESIDENCY (global RAM/VRAM budgets, LRU).
+              HUGPY_WHISPER_POOL_GIB additionally caps the pool itself;
+              over it, the least recently used idle whisper model goes first
+    preload   preload_whisper_models() / HUGPY_WHISPER_PRELOAD
+              ("small,large-v3"), also registered as warm-up target
+              "whisper" (add it to HUGPY_WARMUP)
+
+stats() counts loads, hits, evictions and load time per key.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
 from .imports import *
-class whisperManager(metaclass=SingletonMeta):
+from ....residency import RESIDENCY, torch_footprint
+from ....warmup import register_warmup
+
+# Parameter counts (openai-whisper model card); weights load as fp32.
+_WHISPER_PARAMS = {
+    "tiny": 39e6, "base": 74e6, "small": 244e6, "medium": 769e6,
+    "large": 1550e6, "turbo": 809e6,
+}
+
+
+def _estimate_bytes(size: str) -> int:
+    stem = size.split(".")[0].split("-")[0]
+    return int(_WHISPER_PARAMS.get(stem, _WHISPER_PARAMS["large"]) * 4)
+
+
+def _default_device() -> str:
+    torch = get_torch()
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+class _Slot:
+    __slots__ = ("key", "model", "load_lock", "use_lock", "inflight", "bytes", "retire")
+
+    def __init__(self, key):
+        self.key = key
+        self.model = None
+        self.load_lock = threading.Lock()
+        self.use_lock = threading.Lock()
+        self.inflight = 0
+        self.bytes = 0
+        self.retire = False     # unload asked for while leased: last lease does it
+
+
+class WhisperModelPool:
+    """Loaded whisper models keyed by (size, download_root, device)."""
+
+    def __init__(self):
+        self._slots: "OrderedDict[tuple, _Slot]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: dict[tuple, dict[str, float]] = {}
+
+    @staticmethod
+    def key(size: str = "base", whisper_model_path: str | None = None,
+            device: str | None = None, replica: int = 0) -> tuple:
+        """``replica`` > 0 names an extra copy of the same model (long-form
+        runs one per CUDA thread); those are pooled and budgeted like the rest."""
+        key = (size, whisper_model_path or DEFAULT_WHISPER_MODEL_PATH,
+               device or _default_device())
+        return key + (replica,) if replica else key
+
+    @staticmethod
+    def budget_bytes() -> int | None:
+        raw = os.environ.get("HUGPY_WHISPER_POOL_GIB")
+        try:
+            return int(float(raw) * 2**30) if raw not in (None, "") else None
+        except ValueError:
+            return None
+
+    def _count(self, key: tuple, name: str, amount: float = 1) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(
+                key, {"loads": 0, "hits": 0, "evictions": 0, "load_seconds": 0.0})
+            entry[name] += amount
+
+    # --- load / evict -------------------------------------------------------
+
+    def _slot(self, key: tuple) -> _Slot:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = _Slot(key)
+            self._slots.move_to_end(key)
+            return slot
+
+    def _make_room(self, key: tuple, need: int) -> None:
+        budget = self.budget_bytes()
+        if budget is None:
+            return
+        while True:
+            with self._lock:
+                loaded = [s for s in self._slots.values() if s.model is not None]
+                used = sum(s.bytes for s in loaded)
+                victim = next((s for s in loaded if s.key != key and not s.inflight), None)
+            if used + need <= budget or victim is None:
+                return
+            if not RESIDENCY.evict(("whisper", victim.key)):
+                self._unload(victim.key)    # not (or no longer) registered there
+
+    def _unload(self, key: tuple) -> bool:
+        """Drop the model now, or, while it's leased, when the last lease ends."""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None or slot.model is None:
+                return False
+            if slot.inflight:
+                slot.retire = True
+                return False
+            slot.model = None
+            slot.bytes = 0
+            slot.retire = False
+        self._count(key, "evictions")
+        logger.info("whisper pool: unloaded %s", key)
+        return True
+
+    def get(self, size: str = "base", whisper_model_path: str | None = None,
+            device: str | None = None, replica: int = 0):
+        """The model for this key, loading it on first use.
+
+        Not leased: nothing stops an eviction or another thread's
+        transcribe() while the caller uses it. Fine for single-threaded
+        callers; anything concurrent should use lease().
+        """
+        key = self.key(size, whisper_model_path, device, replica)
+        slot = self._slot(key)
+        model = slot.model
+        if model is not None:
+            self._count(key, "hits")
+            RESIDENCY.touch(("whisper", key))
+            return model
+
+        with slot.load_lock:
+            if slot.model is not None:
+                self._count(key, "hits")
+                return slot.model
+            need = _estimate_bytes(size)
+            on_gpu = str(key[2]).startswith("cuda")
+            self._make_room(key, need)
+            RESIDENCY.make_room(ram_bytes=0 if on_gpu else need,
+                                vram_bytes=need if on_gpu else 0)
+
+            t0 = time.perf_counter()
+            model = get_whisper().load_model(size, device=key[2], download_root=key[1])
+            elapsed = time.perf_counter() - t0
+
+            ram, vram = torch_footprint(model)
+            slot.bytes = (ram + vram) or need
+            slot.model = model
+            self._count(key, "loads")
+            self._count(key, "load_seconds", elapsed)
+            logger.info("whisper pool: loaded %s in %.2fs", key, elapsed)
+            RESIDENCY.register(
+                ("whisper", key), model_key=f"whisper-{size}",
+                ram_bytes=ram, vram_bytes=vram,
+                unload=lambda k=key: self._unload(k),
+                busy=lambda s=slot: s.inflight > 0,
+            )
+            return model
+
+    @contextmanager
+    def lease(self, size: str = "base", whisper_model_path: str | None = None,
+              device: str | None = None, replica: int = 0):
+        """Exclusive use of one model for the duration of the block."""
+        key = self.key(size, whisper_model_path, device, replica)
+        slot = self._slot(key)
+        with self._lock:
+            slot.inflight += 1          # counts waiters too: don't evict under them
+        try:
+            with slot.use_lock:
+                yield self.get(size, whisper_model_path, device, replica)
+        finally:
+            with self._lock:
+                slot.inflight -= 1
+                deferred = slot.retire and not slot.inflight
+            if deferred:
+                self._unload(key)
+
+    def preload(self, sizes=None, whisper_model_path: str | None = None,
+                device: str | None = None) -> list[tuple]:
+        """Load ``sizes`` (default: HUGPY_WHISPER_PRELOAD, comma-separated)."""
+        if sizes is None:
+            sizes = [s.strip() for s in (os.environ.get("HUGPY_WHISPER_PRELOAD") or "").split(",")]
+        keys = []
+        for size in sizes:
+            if size:
+                self.get(size, whisper_model_path, device)
+                keys.append(self.key(size, whisper_model_path, device))
+        return keys
+
+    def loaded_replicas(self, size: str, whisper_model_path: str | None = None,
+                        device: str | None = None) -> int:
+        """How many copies of this model (replica 0 included) are loaded."""
+        base = self.key(size, whisper_model_path, device)
+        with self._lock:
+            return sum(1 for k, s in self._slots.items()
+                       if k[:3] == base and s.model is not None)
+
+    def evict(self, size: str, whisper_model_path: str | None = None,
+              device: str | None = None) -> bool:
+        """Unload an idle model; a leased one stays and False is returned."""
+        key = self.key(size, whisper_model_path, device)
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None or slot.model is None or slot.inflight:
+                return False
+        return RESIDENCY.evict(("whisper", key)) or self._unload(key)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            loaded = {repr(k): {"bytes": s.bytes, "inflight": s.inflight}
+                      for k, s in self._slots.items() if s.model is not None}
+            per_key = {repr(k): dict(v) for k, v in self._stats.items()}
+        totals = {name: sum(v[name] for v in per_key.values())
+                  for name in ("loads", "hits", "evictions", "load_seconds")}
+        return {"budget_bytes": self.budget_bytes(), "loaded": loaded,
+                "totals": totals, "per_key": per_key}
+
+
+WHISPER_POOL = WhisperModelPool()
+
+register_warmup("whisper", lambda: WHISPER_POOL.preload())
+
+
+def preload_whisper_models(sizes=None, whisper_model_path: str | None = None,
+                           device: str | None = None) -> list[tuple]:
+    return WHISPER_POOL.preload(sizes, whisper_model_path, device)
+
+
+def whisper_pool_stats() -> dict[str, Any]:
+    return WHISPER_POOL.stats()
+
+
+class whisperManager:
+    """Kept for callers that construct it directly; the model comes from
+    WHISPER_POOL.get(), unleased, so it's for single-threaded use only."""
+
     def __init__(
         self,
         module_size: str = "base",
         whisper_model_path: str | None = None,
     ):
-        current_module_size = getattr(self, "module_size", None)
-        current_model_path = getattr(self, "whisper_model_path", None)
-
-        next_model_path = whisper_model_path or DEFAULT_WHISPER_MODEL_PATH
-
-        should_load = (
-            not getattr(self, "initialized", False)
-            or current_module_size != module_size
-            or current_model_path != next_model_path
-        )
-
-        if should_load:
-            self.whisper_model_path = next_model_path
-            self.module_size = module_size
-            self.whisper_model = get_whisper().load_model(
-                self.module_size,
-                download_root=self.whisper_model_path,
-            )
-            self.initialized = True
+        self.module_size = module_size
+        self.whisper_model_path = whisper_model_path or DEFAULT_WHISPER_MODEL_PATH
+        self.whisper_model = WHISPER_POOL.get(module_size, self.whisper_model_path)
+        self.initialized = True
+
 
 def get_whisper_model(
     module_size: str = "base",
     whisper_model_path: str | None = None,
+    device: str | None = None,
 ):
-    whisper_mgr = whisperManager(
-        module_size=module_size,
-        whisper_model_path=whisper_model_path,
-    )
-    return whisper_mgr.whisper_model
+    """Unleased (see WhisperModelPool.get); concurrent callers use WHISPER_POOL.lease()."""
+    return WHISPER_POOL.get(module_size, whisper_model_path, device)
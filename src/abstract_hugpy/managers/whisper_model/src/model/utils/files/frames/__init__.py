@@ -1,3 +1,3 @@
 from .utils import get_segment_frame_times
-from .extract import extract_frame_ffmpeg,extract_context_frames_from_whisper
+from .extract import extract_frame_ffmpeg,extract_frames_ffmpeg,extract_context_frames_from_whisper
 
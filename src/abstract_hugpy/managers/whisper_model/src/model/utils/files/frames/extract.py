@@ -1,4 +1,20 @@
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
 from .utils import *
+
+# Frames per ffmpeg invocation. Each is its own "-ss t -i video" input, so
+# this bounds open demuxers (and fds) per process, not decode work.
+DEFAULT_FRAME_BATCH_SIZE = 32
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name) or default))
+    except ValueError:
+        return default
+
+
 def extract_frame_ffmpeg(
     video_path: str,
     timestamp: float,
@@ -38,6 +54,72 @@ def extract_frame_ffmpeg(
     return output_path
 
 
+def extract_frames_ffmpeg(
+    video_path: str,
+    jobs: list[tuple[float, str]],
+    quality: int = 2,
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> list[str]:
+    """Extract many (timestamp, output_path) frames with few ffmpeg launches.
+
+    Jobs are sorted by timestamp and cut into contiguous runs of
+    ``batch_size`` (HUGPY_FRAME_BATCH_SIZE, default 32). Each run is one
+    ffmpeg process with one input-seeked "-ss t -i video" per frame mapped
+    to its own one-frame output: the same seek extract_frame_ffmpeg does,
+    so the same pixels, without a process launch per frame. Runs go
+    through a pool of ``workers`` (HUGPY_FRAME_WORKERS, default cpu count);
+    the pool only waits on ffmpeg, so threads are enough. A run that fails
+    is redone frame by frame, which gets the per-frame error message.
+    """
+    if not jobs:
+        return []
+    batch_size = batch_size or _env_int("HUGPY_FRAME_BATCH_SIZE", DEFAULT_FRAME_BATCH_SIZE)
+    ordered = sorted(jobs, key=lambda job: job[0])
+    runs = [ordered[i:i + batch_size] for i in range(0, len(ordered), batch_size)]
+    workers = workers or _env_int("HUGPY_FRAME_WORKERS", os.cpu_count() or 1)
+
+    for _, output_path in ordered:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    def _run(run: list[tuple[float, str]]) -> None:
+        if len(run) == 1:
+            extract_frame_ffmpeg(video_path, run[0][0], run[0][1], quality)
+            return
+        command = ["ffmpeg", "-y", "-nostdin", "-loglevel", "error"]
+        for timestamp, _ in run:
+            command += ["-ss", f"{timestamp:.3f}", "-i", video_path]
+        for index, (_, output_path) in enumerate(run):
+            command += ["-map", f"{index}:v:0", "-frames:v", "1",
+                        "-q:v", str(quality), output_path]
+        result = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if result.returncode != 0 or not all(os.path.isfile(p) for _, p in run):
+            logger.warning(
+                "batched ffmpeg extract failed (%d frames, %.3fs-%.3fs); "
+                "retrying one at a time: %s",
+                len(run), run[0][0], run[-1][0], result.stderr.strip()[-500:],
+            )
+            for timestamp, output_path in run:
+                extract_frame_ffmpeg(video_path, timestamp, output_path, quality)
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(runs))) as pool:
+        list(pool.map(_run, runs))
+    return [output_path for _, output_path in jobs]
+
+
+def _safe_dhash(frame_path: str) -> Optional[str]:
+    try:
+        return format_dhash(frame_dhash(frame_path))
+    except Exception as exc:
+        logger.warning("dhash failed for %s: %s", frame_path, exc)
+        return None
+
+
 def extract_context_frames_from_whisper(
     video_path: str,
     whisper_result: dict[str, Any],
@@ -53,22 +135,23 @@ def extract_context_frames_from_whisper(
         long_segment_seconds=long_segment_seconds,
     )
 
-    extracted: list[dict[str, Any]] = []
-
-    for item_index, candidate in enumerate(candidates):
-        frame_name = (
+    frame_paths = [
+        os.path.join(
+            output_dir,
             f"frame_{item_index:04d}_"
             f"seg_{candidate.segment_index:04d}_"
-            f"{candidate.timestamp:.3f}s.jpg"
+            f"{candidate.timestamp:.3f}s.jpg",
         )
-        frame_path = os.path.join(output_dir, frame_name)
+        for item_index, candidate in enumerate(candidates)
+    ]
+    extract_frames_ffmpeg(
+        video_path=video_path,
+        jobs=[(c.timestamp, p) for c, p in zip(candidates, frame_paths)],
+    )
 
-        extract_frame_ffmpeg(
-            video_path=video_path,
-            timestamp=candidate.timestamp,
-            output_path=frame_path,
-        )
+    extracted: list[dict[str, Any]] = []
 
+    for candidate, frame_path in zip(candidates, frame_paths):
         extracted.append(
             {
                 "frame_path": frame_path,
@@ -76,6 +159,9 @@ def extract_context_frames_from_whisper(
                 "reason": candidate.reason,
                 "segment_index": candidate.segment_index,
                 "text": candidate.text,
+                # Perceptual hash; analyze_video clusters on it so
+                # near-identical frames are analyzed once.
+                "dhash": _safe_dhash(frame_path),
             }
         )
 
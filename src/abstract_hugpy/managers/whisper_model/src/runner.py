@@ -10,16 +10,17 @@ class WhisperRunner:
     def __init__(self, cfg):
         self.model_key = cfg.model_key
 
-    async def run(self, req: TranscribeRequest) -> TranscribeResult:
+    @staticmethod
+    def _check_file(req: TranscribeRequest) -> None:
         if not req.file_path:
             raise ValueError("must provide file_path")
 
         if not os.path.isfile(req.file_path):
             raise FileNotFoundError(f"Media file does not exist: {req.file_path}")
 
-      
-        result = await asyncio.to_thread(
-            transcribe_file_with_workspace,
+    @staticmethod
+    def _workspace_kwargs(req: TranscribeRequest) -> dict[str, Any]:
+        return dict(
             file_path=req.file_path,
             model_size=req.model_size,
             language=req.language,
@@ -31,6 +32,17 @@ class WhisperRunner:
             capture_frames=req.capture_frames,
             min_gap_seconds=req.min_gap_seconds,
             long_segment_seconds=req.long_segment_seconds,
+            long_form=req.long_form,
+            long_form_window_s=req.long_form_window_s,
+            long_form_overlap_s=req.long_form_overlap_s,
+            long_form_workers=req.long_form_workers,
+        )
+
+    async def run(self, req: TranscribeRequest) -> TranscribeResult:
+        self._check_file(req)
+
+        result = await asyncio.to_thread(
+            transcribe_file_with_workspace, **self._workspace_kwargs(req),
         )
 
         whisper_result = result.get("whisper_result", {})
@@ -79,6 +91,96 @@ class WhisperRunner:
 ##                raw={"error_type": type(exc).__name__},
 ##            )
 
+    async def stream(self, req: TranscribeRequest, cancel_event=None):
+        """Transcript as it's produced, one audio window at a time.
+
+        Per window (in order): a ProgressEvent with stage "window", the
+        window's text and ``data={"start", "end", "segments"}`` (segments as
+        TranscribeSegment dicts, absolute timestamps), then the same text as
+        a TokenEvent so token-only clients see the transcript grow. After
+        the workspace is written: a ProgressEvent with stage "workspace"
+        carrying its paths, then DoneEvent. ``cancel_event`` is checked
+        between windows; windows not yet started are dropped and the stream
+        ends with finish_reason "cancelled".
+        """
+        try:
+            self._check_file(req)
+        except Exception as exc:
+            yield ErrorEvent(request_id=req.request_id, message=f"{type(exc).__name__}: {exc}")
+            return
+
+        kwargs = self._workspace_kwargs(req)
+        if kwargs["long_form"] is None:
+            kwargs["long_form"] = True      # windows are what we stream
+
+        def produce(emit, should_stop):
+            def on_window(index, total, window, segments):
+                emit(("window", index, total, window, segments))
+
+            result = transcribe_file_with_workspace(
+                **kwargs, on_window=on_window, should_stop=should_stop,
+            )
+            emit(("workspace", result))
+
+        windows = 0
+        try:
+            async for item in iter_in_thread(
+                produce, cancel_event=cancel_event, name=f"whisper-{self.model_key}",
+            ):
+                if item[0] == "window":
+                    _, index, total, window, segments = item
+                    windows = total
+                    segs = [self._segment_from_dict(seg) for seg in segments]
+                    text = "".join(seg.text for seg in segs)
+                    yield ProgressEvent(
+                        request_id=req.request_id, stage="window",
+                        index=index + 1, total=total, text=text,
+                        data={
+                            "start": window["keep_from"],
+                            "end": window["keep_to"],
+                            "segments": [seg.model_dump() for seg in segs],
+                        },
+                    )
+                    if text:
+                        yield TokenEvent(request_id=req.request_id, text=text)
+                    continue
+
+                result = item[1]
+                whisper_result = result.get("whisper_result", {})
+                yield ProgressEvent(
+                    request_id=req.request_id, stage="workspace",
+                    index=1, total=1,
+                    data={
+                        "language": whisper_result.get("language", req.language),
+                        "duration": whisper_result.get("duration"),
+                        "audio_path": result.get("audio_path"),
+                        "workspace_dir": result.get("workspace_dir"),
+                        "transcript_json_path": result.get("transcript_json_path"),
+                        "transcript_text_path": result.get("transcript_text_path"),
+                        "manifest_path": result.get("manifest_path"),
+                        "frames": len(result.get("frames", [])),
+                    },
+                )
+                yield DoneEvent(
+                    request_id=req.request_id, input_tokens=0,
+                    output_chunks=max(1, windows), finish_reason="stop",
+                )
+                return
+        except TranscriptionCancelled:
+            pass
+        except Exception as exc:
+            logger.exception(
+                "WhisperRunner.stream failed: model=%s req=%s",
+                self.model_key, req.request_id,
+            )
+            yield ErrorEvent(request_id=req.request_id, message=f"{type(exc).__name__}: {exc}")
+            return
+        # Producer ended without a workspace result: it was told to stop.
+        yield DoneEvent(
+            request_id=req.request_id, input_tokens=0,
+            output_chunks=windows, finish_reason="cancelled",
+        )
+
     @staticmethod
     def _segment_from_dict(segment: dict[str, Any]) -> TranscribeSegment:
         words = [
@@ -1,5 +1,9 @@
+import subprocess
+import threading
+
 from .imports import *
 from .model import *
+from .model.longform import OnWindow, transcribe_pcm_stream
 def extension_from_content_type(content_type: str) -> str:
     content_type = (content_type or "").lower().split(";")[0].strip()
 
@@ -17,6 +21,12 @@ def extension_from_content_type(content_type: str) -> str:
 
     return mapping.get(content_type, ".media")
 
+def _session_for_url(url: str) -> requests.Session:
+    user_agent,headers,session,source_code = derive_approved_headers_user_agent_session_for_url(url)
+    session.headers.update(headers)
+    return session
+
+
 def stream_url_to_temp_file(
     url: str,
     session: Optional[requests.Session] = None,
@@ -50,8 +60,7 @@ def stream_url_to_temp_file(
 
     owns_session = session is None
     if not session:
-        user_agent,headers,session,source_code = derive_approved_headers_user_agent_session_for_url(url)
-        session.header.update(headers)
+        session = _session_for_url(url)
     downloaded = 0
     temp_path = None
 
@@ -98,6 +107,175 @@ def stream_url_to_temp_file(
         if owns_session:
             session.close()
 
+# Bytes of s16le PCM read from ffmpeg per block: 2 s of 16 kHz mono.
+PCM_BLOCK_BYTES = 2 * 16000 * 2
+
+
+class PipeIngestError(RuntimeError):
+    """ffmpeg couldn't decode the piped body (e.g. an MP4 whose index is at
+    the end of the file, which needs seeking)."""
+
+    def __init__(self, message: str, samples: int):
+        super().__init__(message)
+        self.samples = samples
+
+
+def iter_url_pcm(
+    url: str,
+    session: Optional[requests.Session] = None,
+    timeout: int = 30,
+    chunk_size: int = 64 * 1024,
+    max_bytes: Optional[int] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Iterator[Any]:
+    """
+    Yield a media URL's audio as float32 16 kHz mono numpy blocks, decoded
+    while it downloads.
+
+        HTTP body --(feeder thread)--> ffmpeg stdin
+        ffmpeg stdout (s16le, 16 kHz, mono) --> blocks of PCM_BLOCK_BYTES
+
+    Nothing touches the disk. Stopping early (break, should_stop, an
+    exception) kills ffmpeg and closes the response. Raises
+    PipeIngestError if ffmpeg exits non-zero.
+    """
+    import numpy as np
+
+    owns_session = session is None
+    if not session:
+        session = _session_for_url(url)
+
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-vn", "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", "16000",
+        "pipe:1",
+    ]
+    response = session.get(url, stream=True, timeout=timeout)
+    proc = None
+    feeder_error: list[BaseException] = []
+    stderr_tail: list[bytes] = []
+    samples = 0
+    try:
+        response.raise_for_status()
+        proc = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+
+        def feed():
+            downloaded = 0
+            try:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if not chunk:
+                        continue
+                    downloaded += len(chunk)
+                    if max_bytes is not None and downloaded > max_bytes:
+                        raise ValueError(f"Download exceeded max_bytes limit: {max_bytes}")
+                    proc.stdin.write(chunk)
+            except BrokenPipeError:
+                pass              # ffmpeg exited (or was killed); it says why
+            except BaseException as exc:
+                feeder_error.append(exc)
+                proc.kill()
+            finally:
+                try:
+                    proc.stdin.close()
+                except OSError:
+                    pass
+
+        def drain_stderr():
+            for line in proc.stderr:
+                stderr_tail.append(line)
+                del stderr_tail[:-50]
+
+        threads = [
+            threading.Thread(target=feed, name="url-pcm-feed", daemon=True),
+            threading.Thread(target=drain_stderr, name="url-pcm-stderr", daemon=True),
+        ]
+        for t in threads:
+            t.start()
+
+        carry = b""
+        while True:
+            if should_stop is not None and should_stop():
+                return
+            data = proc.stdout.read(PCM_BLOCK_BYTES)
+            if not data:
+                break
+            data = carry + data
+            usable = len(data) - (len(data) % 2)
+            carry = data[usable:]
+            if usable:
+                block = np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+                samples += len(block)
+                yield block
+
+        returncode = proc.wait()
+        for t in threads:
+            t.join(timeout=5.0)
+        if feeder_error:
+            raise feeder_error[0]
+        if returncode != 0:
+            raise PipeIngestError(
+                f"ffmpeg failed to decode piped media from {url} (exit {returncode}):\n"
+                + b"".join(stderr_tail).decode("utf-8", "replace"),
+                samples,
+            )
+    finally:
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        response.close()
+        if owns_session:
+            session.close()
+
+
+def whisper_transcribe_url_pcm(
+    url: str,
+    model_size: str = "small",
+    language: Optional[str] = "english",
+    task: Optional[str] = None,
+    whisper_model_path: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    timeout: int = 30,
+    max_bytes: Optional[int] = None,
+    window_s: Optional[float] = None,
+    overlap_s: Optional[float] = None,
+    workers: Optional[int] = None,
+    on_window: Optional[OnWindow] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Transcribe a media URL while it downloads: iter_url_pcm() feeding
+    transcribe_pcm_stream(). The first window is transcribed as soon as
+    it has arrived; no intermediate file is written.
+    """
+    options: Dict[str, Any] = {}
+    if language:
+        options["language"] = language
+    if task:
+        options["task"] = task
+
+    blocks = iter_url_pcm(url, session=session, timeout=timeout,
+                          max_bytes=max_bytes, should_stop=should_stop)
+    try:
+        result = transcribe_pcm_stream(
+            blocks,
+            model_size=model_size,
+            options=options,
+            whisper_model_path=whisper_model_path,
+            window_s=window_s,
+            overlap_s=overlap_s,
+            workers=workers,
+            on_window=on_window,
+            should_stop=should_stop,
+        )
+    finally:
+        blocks.close()      # kills ffmpeg / closes the response if we stopped early
+    result["source_url"] = url
+    return result
+
+
 def whisper_transcribe_url_stream(
     url: str,
     model_size: str = "small",
@@ -109,9 +287,17 @@ def whisper_transcribe_url_stream(
     chunk_size: int = 1024 * 1024,
     keep_temp: bool = False,
     max_bytes: Optional[int] = None,
+    ingest: str = "pipe",
 ) -> Dict[str, Any]:
     """
-    Stream a media URL with requests, save it temporarily, then transcribe it.
+    Stream a media URL and transcribe it.
+
+    ingest="pipe" (default) decodes the body through ffmpeg as it downloads
+    and transcribes window by window (whisper_transcribe_url_pcm); media
+    ffmpeg can't read from a pipe — typically an MP4 with its index at the
+    end — falls back to the temp-file path. ingest="temp_file" (or
+    keep_temp=True) saves the download to a temporary file first, then
+    transcribes it.
 
     This works best for direct URLs like:
         .mp3
@@ -123,6 +309,27 @@ def whisper_transcribe_url_stream(
     It will not reliably work for YouTube page URLs unless the URL is already
     a direct media stream.
     """
+    if ingest not in {"pipe", "temp_file"}:
+        raise ValueError(f"Unsupported ingest mode: {ingest}")
+
+    if ingest == "pipe" and not keep_temp:
+        try:
+            result = whisper_transcribe_url_pcm(
+                url,
+                model_size=model_size,
+                language=language,
+                task=task,
+                whisper_model_path=whisper_model_path,
+                session=session,
+                timeout=timeout,
+                max_bytes=max_bytes,
+            )
+            result["temp_path"] = None
+            return result
+        except PipeIngestError as exc:
+            if exc.samples:
+                raise
+            logger.warning("pipe ingest failed before any audio; retrying via temp file: %s", exc)
 
     temp_path = stream_url_to_temp_file(
         url=url,
@@ -133,11 +340,6 @@ def whisper_transcribe_url_stream(
     )
 
     try:
-        model = get_whisper_model(
-            module_size=model_size,
-            whisper_model_path=whisper_model_path,
-        )
-
         options: Dict[str, Any] = {
             "language": language,
         }
@@ -145,7 +347,8 @@ def whisper_transcribe_url_stream(
         if task:
             options["task"] = task
 
-        result = model.transcribe(temp_path, **options)
+        with WHISPER_POOL.lease(model_size, whisper_model_path) as model:
+            result = model.transcribe(temp_path, **options)
 
         result["source_url"] = url
         result["temp_path"] = temp_path if keep_temp else None
@@ -3,6 +3,12 @@ import logging
 logging.basicConfig(level=logging.WARNING)
 logging.getLogger("pdfminer").setLevel(logging.WARNING)
 logging.getLogger("pdfplumber").setLevel(logging.WARNING)
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
 import pdfplumber
 from PyPDF2 import PdfReader
 
@@ -43,50 +49,49 @@ def normalize_text(text: str) -> str:
 # -------------------------
 # EXTRACTION METHODS (generators)
 # -------------------------
+def _page_range(total_pages: int, first_page: int = None, last_page: int = None) -> range:
+    # `is None`, not `or`: page 0 is a real page (last_page=0 used to mean "all").
+    start = 0 if first_page is None else first_page
+    end = total_pages - 1 if last_page is None else last_page
+    return range(max(start, 0), min(end + 1, total_pages))
+
+
+def _plumber_page(page, i: int) -> dict:
+    try:
+        text = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
+    except Exception:
+        text = ""
+    text = normalize_text(text)
+    return {"page_index": i, "text": text, "score": score_text_quality(text), "method": "pdfplumber"}
+
+
+def _pypdf2_page(page, i: int) -> dict:
+    try:
+        text = page.extract_text() or ""
+    except Exception:
+        text = ""
+    text = normalize_text(text)
+    return {"page_index": i, "text": text, "score": score_text_quality(text), "method": "pypdf2"}
+
+
+def _best_of(pa, pb):
+    if pa and pb:
+        return pa if pa["score"] >= pb["score"] else pb
+    return pa or pb
+
+
 def extract_with_pdfplumber(pdf_path: str, first_page: int = None, last_page: int = None):
     """Extract text from PDF using pdfplumber, yield page by page."""
     with pdfplumber.open(pdf_path) as pdf:
-        total_pages = len(pdf.pages)
-        start = first_page or 0
-        end = (last_page or total_pages - 1) + 1
-        
-        for i in range(start, min(end, total_pages)):
-            page = pdf.pages[i]
-            try:
-                text = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
-            except Exception:
-                text = ""
-            text = normalize_text(text)
-            score = score_text_quality(text)
-            yield {
-                "page_index": i,
-                "text": text,
-                "score": score,
-                "method": "pdfplumber"
-            }
+        for i in _page_range(len(pdf.pages), first_page, last_page):
+            yield _plumber_page(pdf.pages[i], i)
 
 
 def extract_with_pypdf2(pdf_path: str, first_page: int = None, last_page: int = None):
     """Extract text from PDF using PyPDF2, yield page by page."""
     reader = PdfReader(pdf_path)
-    total_pages = len(reader.pages)
-    start = first_page or 0
-    end = (last_page or total_pages - 1) + 1
-    
-    for i in range(start, min(end, total_pages)):
-        page = reader.pages[i]
-        try:
-            text = page.extract_text() or ""
-        except Exception:
-            text = ""
-        text = normalize_text(text)
-        score = score_text_quality(text)
-        yield {
-            "page_index": i,
-            "text": text,
-            "score": score,
-            "method": "pypdf2"
-        }
+    for i in _page_range(len(reader.pages), first_page, last_page):
+        yield _pypdf2_page(reader.pages[i], i)
 
 
 # -------------------------
@@ -94,17 +99,173 @@ def extract_with_pypdf2(pdf_path: str, first_page: int = None, last_page: int =
 # -------------------------
 def merge_page_results(pages_a_gen, pages_b_gen):
     """Merge two page generators, yield best of each pair."""
-    pages_a = list(pages_a_gen)
-    pages_b = list(pages_b_gen)
-    
-    for i in range(max(len(pages_a), len(pages_b))):
-        pa = pages_a[i] if i < len(pages_a) else None
-        pb = pages_b[i] if i < len(pages_b) else None
-        if pa and pb:
-            best = pa if pa["score"] >= pb["score"] else pb
-        else:
-            best = pa or pb
-        yield best
+    for pa, pb in zip_longest(pages_a_gen, pages_b_gen):
+        yield _best_of(pa, pb)
+
+
+# -------------------------
+# DOCUMENT-LEVEL EXTRACTOR
+#
+# One open per backend for the whole document; both backends walk the pages
+# in lockstep and the better page wins. Big files fan contiguous page blocks
+# out over a process pool (each worker opens the file once for its block).
+# Every page lands in a process-wide cache keyed by (path, mtime, page), so
+# the SEO report, the LLM page analysis and full-text extraction of the same
+# file share one extraction.
+#
+#   HUGPY_PDF_WORKERS             processes for big files (default min(cpus, 8); 1 = off)
+#   HUGPY_PDF_PARALLEL_MIN_PAGES  pages before the pool is used (default 32)
+#   HUGPY_PDF_PAGE_CACHE          pages kept in the cache (default 4096; 0 = off)
+# -------------------------
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+_PAGE_CACHE: "OrderedDict[tuple, dict]" = OrderedDict()
+_PAGE_COUNTS: dict = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _doc_key(pdf_path: str) -> tuple:
+    path = os.path.abspath(pdf_path)
+    st = os.stat(path)
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def _cache_get(doc_key: tuple, page_index: int):
+    with _CACHE_LOCK:
+        page = _PAGE_CACHE.get(doc_key + (page_index,))
+        if page is not None:
+            _PAGE_CACHE.move_to_end(doc_key + (page_index,))
+            return dict(page)
+    return None
+
+
+def _cache_put(doc_key: tuple, page: dict) -> None:
+    limit = _env_int("HUGPY_PDF_PAGE_CACHE", 4096)
+    if limit <= 0:
+        return
+    with _CACHE_LOCK:
+        _PAGE_CACHE[doc_key + (page["page_index"],)] = dict(page)
+        while len(_PAGE_CACHE) > limit:
+            _PAGE_CACHE.popitem(last=False)
+
+
+def clear_pdf_page_cache() -> None:
+    with _CACHE_LOCK:
+        _PAGE_CACHE.clear()
+        _PAGE_COUNTS.clear()
+
+
+def _cached_page_count(doc_key: tuple):
+    with _CACHE_LOCK:
+        return _PAGE_COUNTS.get(doc_key)
+
+
+def get_pdf_page_count(pdf_path: str, reader: PdfReader = None) -> int:
+    """Page count, remembered per (path, mtime). Pass ``reader`` to count
+    from a PdfReader that's already open rather than opening another."""
+    key = _doc_key(pdf_path)
+    count = _cached_page_count(key)
+    if count is not None:
+        return count
+    count = len((reader or PdfReader(pdf_path)).pages)
+    with _CACHE_LOCK:
+        _PAGE_COUNTS[key] = count
+    return count
+
+
+def _extract_page_block(pdf_path: str, indices: list) -> list:
+    """Best-of-both-backends pages for `indices`, opening each backend once.
+
+    Module-level so the process pool can pickle it.
+    """
+    out = []
+    reader = PdfReader(pdf_path)
+    with pdfplumber.open(pdf_path) as pdf:
+        for i in indices:
+            page = pdf.pages[i]
+            out.append(_best_of(_plumber_page(page, i), _pypdf2_page(reader.pages[i], i)))
+            close = getattr(page, "close", None)    # drop pdfplumber's per-page object cache
+            if close:
+                close()
+    return out
+
+
+def _iter_page_block(pdf_path: str, indices: list, reader: PdfReader = None):
+    """Streaming twin of _extract_page_block for the in-process path."""
+    reader = reader or PdfReader(pdf_path)
+    with pdfplumber.open(pdf_path) as pdf:
+        for i in indices:
+            page = pdf.pages[i]
+            yield _best_of(_plumber_page(page, i), _pypdf2_page(reader.pages[i], i))
+            close = getattr(page, "close", None)
+            if close:
+                close()
+
+
+def iter_pdf_pages(
+    pdf_path: str,
+    first_page: int = None,
+    last_page: int = None,
+    workers: int = None,
+):
+    """Yield merged page dicts (page_index, text, score, method) in page order.
+
+    Cached pages come straight from the cache; the rest are extracted with
+    one open per backend, in-process for small jobs and over a process
+    pool for big ones.
+    """
+    doc_key = _doc_key(pdf_path)
+    # An uncached count needs the file open anyway; the in-process path
+    # extracts from that same reader.
+    reader = PdfReader(pdf_path) if _cached_page_count(doc_key) is None else None
+    pages = _page_range(get_pdf_page_count(pdf_path, reader), first_page, last_page)
+    cached = {i: p for i in pages if (p := _cache_get(doc_key, i)) is not None}
+    missing = [i for i in pages if i not in cached]
+
+    if workers is None:
+        workers = _env_int("HUGPY_PDF_WORKERS", min(os.cpu_count() or 1, 8))
+    parallel = workers > 1 and len(missing) >= _env_int("HUGPY_PDF_PARALLEL_MIN_PAGES", 32)
+
+    if not missing:
+        fresh = iter(())
+    elif parallel:
+        fresh = _iter_pool(pdf_path, missing, workers)
+    else:
+        fresh = _iter_page_block(pdf_path, missing, reader)
+
+    for i in pages:
+        page = cached.get(i)
+        if page is None:
+            page = next(fresh)
+            _cache_put(doc_key, page)
+        yield page
+
+
+def _iter_pool(pdf_path: str, indices: list, workers: int):
+    # A few blocks per worker keeps the pool busy when pages differ in cost,
+    # while each block still pays for its file opens only once.
+    n_blocks = min(len(indices), workers * 4)
+    size = -(-len(indices) // n_blocks)
+    blocks = [indices[k:k + size] for k in range(0, len(indices), size)]
+    # spawn, not fork: callers are threaded (Flask, the worker agent) and may
+    # have CUDA up, and a forked child can deadlock on a lock held mid-copy.
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(blocks)),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        for block in pool.map(_extract_page_block, [pdf_path] * len(blocks), blocks):
+            yield from block
+
+
+def iter_pdf_page_texts(pdf_path: str, **kwargs):
+    """(page_index, text) for every page; see iter_pdf_pages."""
+    for page in iter_pdf_pages(pdf_path, **kwargs):
+        yield page["page_index"], page["text"]
 
 
 # -------------------------
@@ -130,12 +291,7 @@ def extract_pdf_pre_ocr(
     Returns:
         Dict with merged pages, scores, OCR needs
     """
-    # Dual extraction with page range
-    pages_plumber = extract_with_pdfplumber(pdf_path, first_page, last_page)
-    pages_pypdf2 = extract_with_pypdf2(pdf_path, first_page, last_page)
-    
-    # Merge and collect
-    merged_pages = list(merge_page_results(pages_plumber, pages_pypdf2))
+    merged_pages = list(iter_pdf_pages(pdf_path, first_page, last_page))
     
     # Compute document score
     scores = [p["score"] for p in merged_pages if p["text"].strip()]
@@ -161,6 +317,6 @@ def extract_pdf_pre_ocr(
 # CONVENIENCE: Extract single page
 # -------------------------
 def extract_single_pdf_page_text(pdf_path: str, page_index: int):
-    """Extract a specific page only."""
-    result = extract_pdf_pre_ocr(pdf_path, first_page=page_index, last_page=page_index)
-    return next((item.get('text') for item in result["pages"] if item), None)
+    """Extract a specific page only (served from the page cache when warm)."""
+    page = next(iter_pdf_pages(pdf_path, page_index, page_index, workers=1), None)
+    return page.get("text") if page else None
@@ -17,6 +17,7 @@ from typing import List, Optional
 
 from .imports import (
     refine_keywords,
+    refine_keywords_batch,
     RefinedResult,
     KeywordPreset,
     register_preset as register_keyword_preset,
@@ -164,12 +165,16 @@ def _analyze(
     *,
     summary_preset: str = "article",
     keyword_preset: str = "seo",
-    input_policy:str="allow"
+    input_policy:str="allow",
+    keywords: Optional[RefinedResult] = None,
 ) -> PDFSeoResult:
-    """Run summary + keywords on a single block of text."""
+    """Run summary + keywords on a single block of text.
+
+    Pass ``keywords`` when they were already extracted in a batch.
+    """
     result = PDFSeoResult(scope=scope, text=text)
     result.summary = summarize_t5(text, preset=summary_preset)
-    result.keywords = refine_keywords(text, preset=keyword_preset)
+    result.keywords = keywords or refine_keywords(text, preset=keyword_preset)
     return result
 
 
@@ -217,13 +222,16 @@ def analyze_pdf(pdf_dir: str) -> PDFSeoReport:
     report.full = analyze_full(pdf_dir)
 
     page_texts = load_all_texts(pdf_dir)
-    for i, text in enumerate(page_texts):
+    # Keywords for every page in one spaCy stream + one encode call.
+    page_keywords = refine_keywords_batch(page_texts, preset="page_seo")
+    for i, (text, keywords) in enumerate(zip(page_texts, page_keywords)):
         report.pages.append(
             _analyze(
                 text,
                 scope=f"page:{i}",
                 summary_preset="brief",
                 keyword_preset="page_seo",
+                keywords=keywords,
             )
         )
 
@@ -1,3 +1,4 @@
+import asyncio
 import os.path as osp
 from dataclasses import dataclass, field, asdict
 from typing import Callable, Optional, List, Dict, Any
@@ -9,8 +10,7 @@ from typing import Literal
 from pydantic import BaseModel
 
 def get_num_pdf_pages(pdf_path):
-    reader = PdfReader(pdf_path)
-    return len(reader.pages)
+    return get_pdf_page_count(pdf_path)
 # ---- schemas ---------------------------------------------------------------
 
 
@@ -72,10 +72,7 @@ def _website_body_text(url: str) -> str:
 
 def _pdf_full_text(path: str) -> str:
     """Whole-PDF text. The page-level SEO report is a separate operation."""
-    parts = []
-    for page_num in range(get_num_pdf_pages(path)):
-        parts.append(extract_single_pdf_page_text(pdf_path=path, page_index=page_num))
-    return "\n\n".join(parts)
+    return "\n\n".join(text for _, text in iter_pdf_page_texts(path))
 
 register_extractor("pdf", _pdf_full_text)
 
@@ -133,57 +130,176 @@ async def analyze(
 def summarize_pdf_by_page(path: str) -> dict:
     """PDF gets its own per-page summary because PDFSeoReport is page-structured."""
     report = PDFSeoReport()
-    for page_num in range(get_num_pdf_pages(path)):
-        text = extract_single_pdf_page_text(pdf_path=path, page_index=page_num)
+    pages = list(iter_pdf_page_texts(path))
+    # Keywords for every page in one spaCy stream + one encode call.
+    keywords = refine_keywords_batch([text for _, text in pages], preset="long_tail")
+    for (page_num, text), page_keywords in zip(pages, keywords):
         report.pages.append(
             _analyze(
                 text,
                 scope=f"page:{page_num}",
                 summary_preset="brief",
                 keyword_preset="long_tail",
+                keywords=page_keywords,
             )
         )
     return report.to_dict()
 
 
-async def analyze_pdf_by_page(
-    path: str,
-    prompt: str = "Please analyze this PDF page",
-    params: GenParams | None = None,
-    model_key: str = 'DeepCoder-14B',
-) -> List[Any]:
-    """Generate one analysis per page. Returns a list, indexed by page number."""
-    results: List[Any] = []
-    for page_num in range(get_num_pdf_pages(path)):
-        text = extract_single_pdf_page_text(pdf_path=path, page_index=page_num)
-        page_prompt = f"{prompt} (page {page_num})\n\n{text}"
-        params = params.model_copy(update={
-            "messages": [{"role": "user", "content": page_prompt}]
-        })
-
-        # GenParams carries some fields ChatRequest doesn't know about
-        # (use_chat_template is a runner-internal toggle). Strip them here.
-        payload = params.model_dump(exclude={"use_chat_template"})
-
-        req = ChatRequest(model_key=model_key, **payload)
-        runner = runner_for(model_key) 
-        res = await runner.run(req)
-        results.append(res.text)
-    prompt = f"please provide a full analysis of the following sumaries:\n{results}"
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+# Page analyses in flight at once. Only pays off when the model can serve
+# several requests at a time (llama-server slots, the batching scheduler,
+# a worker pool); against a single serialized runner it's harmless.
+DEFAULT_PDF_ANALYZE_CONCURRENCY = _env_int("HUGPY_PDF_ANALYZE_CONCURRENCY", 4)
+
+# Rough token budget for the page analyses packed into one reduce prompt.
+# Kept well under typical n_ctx so prompt + answer fit.
+DEFAULT_REDUCE_BUDGET_TOKENS = _env_int("HUGPY_PDF_REDUCE_BUDGET_TOKENS", 3000)
+
+REDUCE_PROMPT = "please provide a full analysis of the following sumaries:\n"
+
 
+def _approx_tokens(text: str) -> int:
+    try:
+        return count_tokens(text, get_encoder())
+    except Exception:
+        return len(text) // 4 + 1
+
+
+async def _chat_once(runner, params: GenParams, model_key: str, content: str) -> str:
     params = params.model_copy(update={
-        "messages": [{"role": "user", "content": prompt}]
+        "messages": [{"role": "user", "content": content}]
     })
-
     # GenParams carries some fields ChatRequest doesn't know about
     # (use_chat_template is a runner-internal toggle). Strip them here.
     payload = params.model_dump(exclude={"use_chat_template"})
-
     req = ChatRequest(model_key=model_key, **payload)
     res = await runner.run(req)
     return res.text
 
 
+async def iter_pdf_page_analyses(
+    path: str,
+    prompt: str = "Please analyze this PDF page",
+    params: GenParams | None = None,
+    model_key: str = 'DeepCoder-14B',
+    concurrency: int | None = None,
+):
+    """Yield (page_num, analysis) as each page finishes — not in page order.
+
+    At most `concurrency` page requests are in flight; pages are extracted
+    on a worker thread (one page ahead) and dispatched while earlier ones
+    are still generating. Closing the generator cancels what's in flight.
+    """
+    params = params or GenParams()
+    runner = runner_for(model_key)
+    sem = asyncio.Semaphore(max(1, concurrency or DEFAULT_PDF_ANALYZE_CONCURRENCY))
+
+    async def one(page_num: int, text: str):
+        try:
+            return page_num, await _chat_once(
+                runner, params, model_key, f"{prompt} (page {page_num})\n\n{text}",
+            )
+        finally:
+            sem.release()
+
+    def extract(emit, should_stop) -> None:
+        for item in iter_pdf_page_texts(path):
+            if should_stop() or not emit(item):
+                return
+
+    pending = set()
+    try:
+        async for page_num, text in iter_in_thread(extract, maxsize=1,
+                                                   name="pdf-page-extract"):
+            await sem.acquire()
+            pending.add(asyncio.ensure_future(one(page_num, text)))
+            await asyncio.sleep(0)      # let it dispatch before the next page
+            done = {t for t in pending if t.done()}
+            pending -= done
+            for task in done:
+                yield task.result()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def reduce_analyses(
+    analyses: List[str],
+    params: GenParams | None = None,
+    model_key: str = 'DeepCoder-14B',
+    concurrency: int | None = None,
+    budget_tokens: int | None = None,
+) -> str:
+    """Tree-reduce analyses to one: pack them into groups that fit the budget,
+    consolidate every group concurrently, repeat on the results until one is
+    left. No single prompt ever carries more than ~budget_tokens of input."""
+    params = params or GenParams()
+    budget = budget_tokens or DEFAULT_REDUCE_BUDGET_TOKENS
+    runner = runner_for(model_key)
+    sem = asyncio.Semaphore(max(1, concurrency or DEFAULT_PDF_ANALYZE_CONCURRENCY))
+
+    async def consolidate(group: List[str]) -> str:
+        async with sem:
+            return await _chat_once(runner, params, model_key, f"{REDUCE_PROMPT}{group}")
+
+    level = [a for a in analyses if a]
+    while True:
+        groups: List[List[str]] = [[]]
+        used = 0
+        for item in level:
+            n = _approx_tokens(item)
+            if groups[-1] and used + n > budget:
+                groups.append([])
+                used = 0
+            groups[-1].append(item)
+            used += n
+        if len(groups) == 1:
+            # Final pass always runs, even for a single analysis, so callers
+            # get the same consolidated shape as before.
+            return await consolidate(groups[0])
+        if len(groups) == len(level):
+            # Every item is over budget on its own: pair them up so the tree
+            # still shrinks instead of looping forever.
+            groups = [level[i:i + 2] for i in range(0, len(level), 2)]
+        level = await asyncio.gather(*(consolidate(g) for g in groups))
+
+
+async def analyze_pdf_by_page(
+    path: str,
+    prompt: str = "Please analyze this PDF page",
+    params: GenParams | None = None,
+    model_key: str = 'DeepCoder-14B',
+    concurrency: int | None = None,
+    on_page: Callable[[int, str], Any] | None = None,
+) -> str:
+    """Analyze every page (up to `concurrency` at once), then tree-reduce the
+    page analyses into one. `on_page(page_num, text)` sees each page result
+    as soon as it completes."""
+    params = params or GenParams()
+    results: Dict[int, str] = {}
+    async for page_num, text in iter_pdf_page_analyses(
+        path, prompt=prompt, params=params, model_key=model_key, concurrency=concurrency,
+    ):
+        results[page_num] = text
+        if on_page is not None:
+            on_page(page_num, text)
+    ordered = [results[i] for i in sorted(results)]
+    return await reduce_analyses(
+        ordered, params=params, model_key=model_key, concurrency=concurrency,
+    )
+
+
 
 # ---- image analysis: doesn't go through text, separate path ----------------
 
@@ -206,10 +322,7 @@ def summarize_text(path=None, prompt="Please summarize the text",
                    params=GenParams(**_filter_gen_kw(kw)))
 
 def get_pdf_text(path):
-    return [
-        {"page_num": i, "text": extract_single_pdf_page_text(pdf_path=path, page_index=i)}
-        for i in range(get_num_pdf_pages(path))
-    ]
+    return [{"page_num": i, "text": text} for i, text in iter_pdf_page_texts(path)]
 
 def summarize_pdf(path):       return summarize_pdf_by_page(path)
 def analyze_pdf(path=None, prompt="Please summarize the pdf component",
@@ -9,7 +9,7 @@ donate that GPU's compute to the central console. The agent:
     3. Serves inference over HTTP for the models the central node assigns to it:
            GET  /health
            POST /infer          {model_key, messages|prompt, ...} -> {text, finish_reason}
-           POST /infer/stream   -> SSE token/done/error events
+           POST /infer/stream   -> SSE token/progress/done/error events
        Inference runs through ``abstract_hugpy.managers.dispatch`` exactly like
        the central node, so the worker loads/serves the model on its own GPU.
     4. Heartbeats every ``--heartbeat`` seconds, reporting live GPU stats and
@@ -390,7 +390,13 @@ def _cleanup_file(path: str | None) -> None:
             pass
 
 
-def _run_once(payload: dict) -> dict:
+# Array-valued result fields (EmbedResult) passed through /infer as JSON.
+_ARRAY_FIELDS = ("embeddings", "similarities", "top_k_indices", "top_k_scores")
+
+
+def _run_once(payload: dict) -> dict | list[bytes]:
+    """Run one request. Returns a JSON-able dict, or framed body chunks when
+    the result carries binary arrays (result_format "binary"/"npy")."""
     from abstract_hugpy.managers.dispatch import execute_prompt
 
     tmp = _materialize_file(payload)
@@ -399,12 +405,21 @@ def _run_once(payload: dict) -> dict:
         if asyncio.iscoroutine(result):
             result = asyncio.run(result)
 
+        if getattr(result, "arrays", None):
+            from abstract_hugpy.imports import pack_embed_result
+
+            return pack_embed_result(result)
         if getattr(result, "ok", True):
-            return {
+            out = {
                 "ok": True,
-                "text": getattr(result, "text", None) or str(result),
                 "finish_reason": getattr(result, "finish_reason", None) or "stop",
             }
+            arrays = {f: getattr(result, f) for f in _ARRAY_FIELDS
+                      if getattr(result, f, None) is not None}
+            out.update(arrays)
+            # Array results carry no text; str(result) would repeat every float.
+            out["text"] = "" if arrays else getattr(result, "text", None) or str(result)
+            return out
         return {"ok": False, "error": getattr(result, "error", None) or "run failed"}
     finally:
         _cleanup_file(tmp)
@@ -472,7 +487,7 @@ def _overlap_len(prev_tail: str, seg: str) -> int:
 def _run_one_pass(loop, payload: dict, cancel_event=None):
     """Run a single execute_prompt_stream pass.
 
-    Yields ('token', text) tuples and finishes by setting the returned dict's
+    Yields ('token', text) / ('progress', event dict) tuples and finishes by setting the returned dict's
     'finish_reason' + accumulated 'text'. Generator returns the result dict.
     ``cancel_event`` lets the request be stopped mid-stream.
     """
@@ -489,6 +504,8 @@ def _run_one_pass(loop, payload: dict, cancel_event=None):
             etype = getattr(event, "type", None)
             if etype == "token":
                 yield ("token", getattr(event, "text", ""))
+            elif etype == "progress":
+                yield ("progress", event.model_dump(exclude={"request_id"}))
             elif etype == "done":
                 finish = getattr(event, "finish_reason", None) or "stop"
                 break
@@ -593,6 +610,10 @@ def _stream_sync(payload: dict, request_id: str | None = None):
                             ev = _emit(data)
                             if ev:
                                 yield ev
+                    elif kind == "progress":
+                        # Partial work (e.g. one chunk's summary). Not part of
+                        # full_text: the final answer still arrives as tokens.
+                        yield _sse(data)
                     elif kind == "error":
                         yield _sse({"type": "error", "message": data})
                         errored = True
@@ -662,6 +683,76 @@ def _spill_describe() -> dict:
         return {}
 
 
+def _llama_stats() -> list[dict]:
+    """Per-model slots / queue depth / tokens-per-sec of in-process GGUF runners."""
+    try:
+        from abstract_hugpy.managers.llama.runners.get import llama_runner_stats
+
+        return llama_runner_stats()
+    except Exception:
+        return []
+
+
+def _residency() -> dict:
+    """Which models are loaded here, their footprints, and eviction counters."""
+    try:
+        from abstract_hugpy.managers.residency import RESIDENCY
+
+        return RESIDENCY.snapshot()
+    except Exception:
+        return {}
+
+
+def _embed_batching() -> list[dict]:
+    """Per-model embedding micro-batch sizes, queue wait and texts/sec."""
+    try:
+        from abstract_hugpy.managers.embed.embed_runner import FeatureExtractionRunner
+
+        return FeatureExtractionRunner.batching_stats()
+    except Exception:
+        return []
+
+
+def _embed_cache() -> list[dict]:
+    """Hit rate and occupancy of the persistent embedding stores."""
+    try:
+        from abstract_hugpy.managers.embed.embed_runner import FeatureExtractionRunner
+
+        return FeatureExtractionRunner.cache_stats()
+    except Exception:
+        return []
+
+
+def _summary_cache() -> dict | None:
+    """Hit rate and size of the summary result cache (None until first use)."""
+    try:
+        from abstract_hugpy.managers.summarizers.summary_cache import summary_cache_stats
+
+        return summary_cache_stats()
+    except Exception:
+        return None
+
+
+def _whisper_pool() -> dict | None:
+    """Loaded whisper models plus load/hit/eviction counters."""
+    try:
+        from abstract_hugpy.managers.whisper_model.src.model.model import whisper_pool_stats
+
+        return whisper_pool_stats()
+    except Exception:
+        return None
+
+
+def _warmup() -> dict:
+    """Which startup preloads (HUGPY_WARMUP) are ready, loading or failed."""
+    try:
+        from abstract_hugpy.managers.warmup import warmup_status
+
+        return warmup_status()
+    except Exception:
+        return {}
+
+
 # ---------------------------------------------------------------------------
 # HTTP server
 # ---------------------------------------------------------------------------
@@ -682,6 +773,13 @@ def build_app(state: "WorkerState") -> Flask:
                 "provisioning": sorted(state._provisioning),
                 "loaded_models": loaded_model_keys(),
                 "spill": _spill_describe(),
+                "llama_runners": _llama_stats(),
+                "residency": _residency(),
+                "embed_batching": _embed_batching(),
+                "embed_cache": _embed_cache(),
+                "summary_cache": _summary_cache(),
+                "whisper_pool": _whisper_pool(),
+                "warmup": _warmup(),
             }
         )
 
@@ -690,7 +788,12 @@ def build_app(state: "WorkerState") -> Flask:
         payload = request.get_json(silent=True) or {}
         _apply_spill(payload.pop("spill", None))
         _ensure_present(payload, state.central_url)
-        return jsonify(_run_once(payload))
+        out = _run_once(payload)
+        if isinstance(out, list):
+            from abstract_hugpy.imports import ARRAYS_MIMETYPE
+
+            return Response(out, mimetype=ARRAYS_MIMETYPE)
+        return jsonify(out)
 
     @app.route("/infer/stream", methods=["POST"])
     def infer_stream():
@@ -1037,6 +1140,15 @@ def main(argv: list[str] | None = None) -> int:
     hb = threading.Thread(target=_heartbeat_loop, args=(client, state, args), daemon=True)
     hb.start()
 
+    # Preload shared models (spaCy, KeyBERT, ...) in the background so the
+    # first request after a restart doesn't pay for them. /health shows progress.
+    try:
+        from abstract_hugpy.managers.warmup import start_warmup
+
+        start_warmup()
+    except Exception as exc:
+        logger.warning("warm-up not started: %s", exc)
+
     logger.info("worker inference server listening on %s (advertising %s)",
                 f"{args.host}:{args.port}", state.url)
     build_app(state).run(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,106 @@
+"""Benchmark: single-pass chunk_text vs the old recursive_chunk.
+
+    python tests/bench_chunking.py [path/to/document.txt] [--tokens 450] [--overlap 30]
+
+Without a path it synthesizes a ~300-page document. Reports wall time,
+tokenizer calls, chunk count and the largest chunk (in tokens) for each.
+"""
+import argparse
+import random
+import re
+import time
+
+from abstract_hugpy.imports.src.chunking import chunk_text, count_tokens, get_encoder
+
+
+def legacy_recursive_chunk(text, desired_tokens, encoder, separators=None, overlap=0):
+    """The pre-rewrite implementation. Only change: the encoder is passed in
+    (it used to call get_encoder() per recursion) so calls can be counted."""
+    if separators is None:
+        separators = ["\n\n", "\n", r"(?<=[\.\?\!])\s", ", ", " "]
+    if count_tokens(text, encoder) <= desired_tokens:
+        return [text]
+    for sep in separators:
+        parts = re.split(sep, text) if sep.startswith("(?") else text.split(sep)
+        if len(parts) > 1:
+            chunks, current, current_tokens = [], "", 0
+            for part in parts:
+                part = part.strip()
+                if not part:
+                    continue
+                part_tokens = count_tokens(part, encoder)
+                if part_tokens > desired_tokens:
+                    if current:
+                        chunks.extend(legacy_recursive_chunk(
+                            current, desired_tokens, encoder, separators[1:], overlap))
+                        current, current_tokens = "", 0
+                    chunks.extend(legacy_recursive_chunk(
+                        part, desired_tokens, encoder, separators[1:], overlap))
+                elif current_tokens + part_tokens <= desired_tokens:
+                    current = sep.join([current, part]) if current else part
+                    current_tokens += part_tokens
+                else:
+                    chunks.append(current)
+                    current, current_tokens = part, part_tokens
+            if current:
+                chunks.append(current)
+            return chunks
+    tokens = encoder.encode(text)
+    stride = desired_tokens - overlap
+    return [encoder.decode(tokens[i:i + desired_tokens]) for i in range(0, len(tokens), stride)]
+
+
+def synthetic_document(pages=300, seed=7):
+    rng = random.Random(seed)
+    words = ("model token chunk summary paragraph sentence document page "
+             "analysis result overlap boundary encoder context window").split()
+    paras = []
+    for _ in range(pages * 4):
+        sentences = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(6, 24))).capitalize() + "."
+            for _ in range(rng.randint(2, 8))
+        ]
+        paras.append(" ".join(sentences))
+    return "\n\n".join(paras)
+
+
+class CountingEncoder:
+    def __init__(self, inner):
+        self.inner, self.calls = inner, 0
+
+    def encode(self, text, *a, **kw):
+        self.calls += 1
+        return self.inner.encode(text, *a, **kw)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("path", nargs="?")
+    ap.add_argument("--tokens", type=int, default=450)
+    ap.add_argument("--overlap", type=int, default=30)
+    args = ap.parse_args()
+
+    text = open(args.path, encoding="utf-8").read() if args.path else synthetic_document()
+    real = get_encoder("gpt-4")
+    print(f"document: {len(text):,} chars, {len(real.encode(text)):,} tokens")
+
+    for name, run in (
+        ("legacy recursive_chunk", lambda enc: legacy_recursive_chunk(
+            text, args.tokens, enc, overlap=args.overlap)),
+        ("chunk_text", lambda enc: [c.text for c in chunk_text(
+            text, args.tokens, overlap=args.overlap, encoder=enc)]),
+    ):
+        counter = CountingEncoder(real)
+        t0 = time.perf_counter()
+        chunks = run(counter)
+        elapsed = time.perf_counter() - t0
+        largest = max(len(real.encode(c)) for c in chunks)
+        print(f"{name:24s} {elapsed:8.3f}s  encode calls={counter.calls:7d}  "
+              f"chunks={len(chunks):5d}  largest={largest}")
+
+
+if __name__ == "__main__":
+    main()
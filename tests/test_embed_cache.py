@@ -0,0 +1,95 @@
+"""EmbeddingStore eviction: oversized batches and on-disk key/vector order."""
+import pytest
+
+np = pytest.importorskip("numpy")
+embed_cache = pytest.importorskip("abstract_hugpy.managers.embed.embed_cache")
+EmbeddingStore = embed_cache.EmbeddingStore
+text_key = embed_cache.text_key
+
+
+def _store(path, capacity=4, dim=3):
+    return EmbeddingStore(str(path), dim=dim, dtype="float32", capacity=capacity)
+
+
+def _vectors(n, dim=3, offset=0):
+    return np.arange(offset, offset + n * dim, dtype=np.float32).reshape(n, dim)
+
+
+def _assert_consistent(store, texts, vectors):
+    keys = [text_key(t) for t in texts]
+    hits, _ = store.get_many(keys)
+    for pos, vec in hits.items():
+        np.testing.assert_array_equal(vec, vectors[pos])
+    for key, row in store._index.items():
+        assert bytes(store._keys[row]) == key
+    assert len(set(store._index.values())) == len(store._index)
+
+
+def test_batch_larger_than_capacity_keeps_first_rows(tmp_path):
+    store = _store(tmp_path, capacity=4)
+    texts = [f"t{i}" for i in range(10)]
+    vecs = _vectors(10)
+    store.put_many([text_key(t) for t in texts], vecs)
+
+    hits, misses = store.get_many([text_key(t) for t in texts])
+    assert sorted(hits) == [0, 1, 2, 3]
+    assert misses == list(range(4, 10))
+    _assert_consistent(store, texts, vecs)
+
+
+def test_oversized_batch_on_full_store_evicts_each_row_once(tmp_path):
+    store = _store(tmp_path, capacity=4)
+    old = [f"old{i}" for i in range(4)]
+    store.put_many([text_key(t) for t in old], _vectors(4))
+
+    new = [f"new{i}" for i in range(7)]
+    vecs = _vectors(7, offset=100)
+    store.put_many([text_key(t) for t in new], vecs)
+
+    assert store.stats()["evictions"] == 4
+    hits, _ = store.get_many([text_key(t) for t in old])
+    assert hits == {}
+    hits, misses = store.get_many([text_key(t) for t in new])
+    assert sorted(hits) == [0, 1, 2, 3]
+    assert misses == [4, 5, 6]
+    _assert_consistent(store, new, vecs)
+
+
+def test_eviction_flushes_cleared_key_before_vector(tmp_path, monkeypatch):
+    store = _store(tmp_path, capacity=2)
+    store.put_many([text_key("a"), text_key("b")], _vectors(2))
+
+    flushes = []
+    for name in ("_keys", "_vectors"):
+        arr = getattr(store, name)
+        real = arr.flush
+
+        def flush(name=name, real=real):
+            keys = {bytes(k) for k in store._keys if k.any()}
+            flushes.append((name, keys))
+            real()
+
+        monkeypatch.setattr(arr, "flush", flush)
+    store.put_many([text_key("c")], _vectors(1, offset=50))
+
+    # The evicted key reaches disk as empty before the new vector does.
+    assert flushes == [
+        ("_keys", {text_key("b")}),
+        ("_vectors", {text_key("b")}),
+        ("_keys", {text_key("b"), text_key("c")}),
+    ]
+
+
+def test_reopen_rebuilds_index(tmp_path):
+    store = _store(tmp_path, capacity=3)
+    texts = ["x", "y", "z", "w"]
+    vecs = _vectors(4)
+    store.put_many([text_key(t) for t in texts[:3]], vecs[:3])
+    store.put_many([text_key("w")], vecs[3:])
+    store._lock_fh.close()      # drop the flock so the store can reopen
+
+    again = _store(tmp_path, capacity=3)
+    hits, misses = again.get_many([text_key(t) for t in texts])
+    assert misses == [0]
+    for pos in (1, 2, 3):
+        np.testing.assert_array_equal(hits[pos], vecs[pos])
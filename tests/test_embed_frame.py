@@ -0,0 +1,51 @@
+"""pack_embed_result / unpack_embed_result round-trips for binary and npy arrays."""
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pydantic")
+schemas = pytest.importorskip("abstract_hugpy.imports.src.schemas.embeded_schemas")
+ArrayPayload = schemas.ArrayPayload
+EmbedResult = schemas.EmbedResult
+
+
+def _result(fmt):
+    emb = np.arange(12, dtype=np.float32).reshape(3, 4) / 7
+    idx = np.array([[2, 0], [1, 2], [0, 1]], dtype=np.int64)
+    scores = np.linspace(0, 1, 6, dtype=np.float64).reshape(3, 2)
+    arrays = {"embeddings": emb, "top_k_indices": idx, "top_k_scores": scores}
+    result = EmbedResult(
+        request_id="r1", model_key="m", ok=True,
+        arrays={k: ArrayPayload.from_numpy(v, fmt) for k, v in arrays.items()},
+    )
+    return result, arrays
+
+
+@pytest.mark.parametrize("fmt", ["binary", "npy"])
+def test_pack_unpack_round_trip(fmt):
+    result, arrays = _result(fmt)
+    body = b"".join(schemas.pack_embed_result(result))
+
+    header, out = schemas.unpack_embed_result(body)
+    assert header["request_id"] == "r1" and header["ok"] is True
+    assert list(out) == list(arrays)
+    for name, want in arrays.items():
+        assert header["arrays"][name]["format"] == fmt
+        np.testing.assert_array_equal(out[name], want.astype(out[name].dtype))
+        assert out[name].shape == want.shape
+
+
+@pytest.mark.parametrize("fmt", ["binary", "npy"])
+def test_embed_result_from_frame(fmt):
+    result, _ = _result(fmt)
+    body = b"".join(schemas.pack_embed_result(result))
+
+    again = schemas.embed_result_from_frame(body)
+    assert again.request_id == result.request_id
+    for name, payload in result.arrays.items():
+        assert again.arrays[name].format == fmt
+        np.testing.assert_array_equal(again.arrays[name].to_numpy(), payload.to_numpy())
+
+
+def test_unpack_rejects_other_bodies():
+    with pytest.raises(ValueError):
+        schemas.unpack_embed_result(b'{"ok": true}')
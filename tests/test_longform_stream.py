@@ -0,0 +1,117 @@
+"""PcmRing addressing and the streamed transcriber's window cuts."""
+import pytest
+
+np = pytest.importorskip("numpy")
+longform = pytest.importorskip("abstract_hugpy.managers.whisper_model.src.model.longform")
+PcmRing = longform.PcmRing
+SR = longform.SAMPLE_RATE
+
+
+def _ramp(a, b):
+    return np.arange(a, b, dtype=np.float32)
+
+
+def test_ring_wraps_and_keeps_absolute_indices():
+    ring = PcmRing(10)
+    ring.write(_ramp(0, 8))
+    ring.discard_before(6)
+    ring.write(_ramp(8, 15))            # wraps past the end of the buffer
+
+    assert ring.capacity == 10
+    assert (ring.start, ring.end) == (6, 15)
+    np.testing.assert_array_equal(ring.read(6, 15), _ramp(6, 15))
+    np.testing.assert_array_equal(ring.read(9, 12), _ramp(9, 12))
+    # Clipped to what's held.
+    np.testing.assert_array_equal(ring.read(0, 8), _ramp(6, 8))
+    assert len(ring.read(15, 20)) == 0
+
+
+def test_ring_grows_when_overfilled():
+    ring = PcmRing(8)
+    ring.write(_ramp(0, 6))
+    ring.discard_before(3)
+    ring.write(_ramp(6, 20))            # 17 held > 8: must grow, not overwrite
+
+    assert ring.capacity >= 17
+    assert (ring.start, ring.end) == (3, 20)
+    np.testing.assert_array_equal(ring.read(3, 20), _ramp(3, 20))
+
+    ring.discard_before(15)
+    ring.write(_ramp(20, 40))
+    np.testing.assert_array_equal(ring.read(15, 40), _ramp(15, 40))
+
+
+def test_discard_never_passes_end():
+    ring = PcmRing(4)
+    ring.write(_ramp(0, 3))
+    ring.discard_before(10)
+    assert (ring.start, ring.end) == (3, 3)
+    assert len(ring) == 0
+
+
+def _speech_with_pause(seconds, pause_at, pause_s=0.5, seed=0):
+    rng = np.random.default_rng(seed)
+    audio = (rng.standard_normal(int(seconds * SR)) * 0.1).astype(np.float32)
+    a = int(pause_at * SR)
+    audio[a:a + int(pause_s * SR)] = 0.0
+    return audio
+
+
+def test_next_cut_waits_for_search_zone():
+    window_s, overlap_s = 8.0, 0.5
+    ring = PcmRing(int(20 * SR))
+    # Needs window + 25% search + overlap past the window start.
+    ring.write(_speech_with_pause(10.4, pause_at=7.0))
+    assert longform._next_cut(ring, 0, window_s, overlap_s) is None
+
+
+def test_next_cut_lands_in_the_pause():
+    window_s, overlap_s = 8.0, 0.5
+    audio = _speech_with_pause(12.0, pause_at=7.0)
+    ring = PcmRing(int(20 * SR))
+    ring.write(audio)
+
+    cut = longform._next_cut(ring, 0, window_s, overlap_s)
+    assert cut is not None
+    assert 7.0 * SR <= cut <= 7.5 * SR
+
+
+def test_next_cut_not_pulled_to_search_zone_edges():
+    window_s, overlap_s = 8.0, 0.5
+    # Steady sound that dips gently (to 70%) at 8.5 s, inside the 6-10 s zone.
+    t = np.arange(int(12 * SR)) / SR
+    envelope = 0.1 * (1 - 0.3 * np.clip(1 - np.abs(t - 8.5) / 1.5, 0, 1))
+    sign = np.where((np.arange(len(t)) // 8) % 2, 1.0, -1.0)
+    ring = PcmRing(int(20 * SR))
+    ring.write((envelope * sign).astype(np.float32))
+
+    cut = longform._next_cut(ring, 0, window_s, overlap_s)
+    assert cut is not None
+    assert abs(cut / SR - 8.5) < 0.3
+
+
+def test_stream_cuts_match_planned_windows():
+    window_s, overlap_s = 8.0, 0.5
+    audio = np.concatenate([
+        _speech_with_pause(10.0, pause_at=7.5, seed=1),
+        _speech_with_pause(10.0, pause_at=5.5, seed=2),
+        _speech_with_pause(10.0, pause_at=4.0, seed=3),
+    ])
+    planned = longform.plan_windows(audio, window_s, overlap_s)
+    expected = [w["keep_to"] for w in planned[:-1]]
+    assert len(expected) == 3
+
+    ring = PcmRing(int((window_s * 1.5 + 2 * overlap_s + 10.0) * SR))
+    cuts, prev = [], 0
+    for start in range(0, len(audio), 4000):
+        ring.write(audio[start:start + 4000])
+        while (cut := longform._next_cut(ring, prev, window_s, overlap_s)) is not None:
+            cuts.append(cut / SR)
+            prev = cut
+            ring.discard_before(cut - int(overlap_s * SR))
+
+    # Each search zone holds one pause; streamed and planned cuts find it.
+    assert len(cuts) == len(expected)
+    for got, want in zip(cuts, expected):
+        assert abs(got - want) < 0.1
+    assert len(ring) < len(audio) // 2